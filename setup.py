@@ -29,6 +29,8 @@ setup(
     python_requires=">=3.8",
     install_requires=[],
     extras_require={
+        # In-database KNN search for the vector store (falls back to NumPy without it)
+        "vec": ["sqlite-vec>=0.1.6"],
         "dev": [
             "pytest>=7.0.0",
             "pytest-cov>=4.0.0",
@@ -19,7 +19,8 @@ All chunks preserve timestamps.
 from __future__ import annotations
 
 from dataclasses import dataclass, asdict
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
 import re
 import math
 
@@ -55,19 +56,27 @@ class Chunk:
 # ----------------------------
 
 def format_ts(seconds: float) -> str:
-    seconds = max(0, int(seconds))
+    return _format_whole_seconds(max(0, int(seconds)))
+
+
+# Chunk start/end times recur across chunk ids, chat sources and context formatting.
+# Keyed on whole seconds so float timestamps within the same second share an entry.
+@lru_cache(maxsize=8192)
+def _format_whole_seconds(seconds: int) -> str:
     h = seconds // 3600
     m = (seconds % 3600) // 60
     s = seconds % 60
     return f"{h:02d}:{m:02d}:{s:02d}"
 
 
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]", flags=re.UNICODE)
+
+
 def simple_token_count(text: str) -> int:
     """
     Approximate token count without external dependencies.
     """
-    parts = re.findall(r"\w+|[^\w\s]", text, flags=re.UNICODE)
-    return len(parts)
+    return sum(1 for _ in _TOKEN_RE.finditer(text))
 
 
 # Common discourse / transition cues
@@ -138,15 +147,28 @@ def boundary_score(prev_seg: Segment, next_seg: Segment) -> float:
     return score
 
 
+def compute_boundary_scores(segs: List[Segment]) -> List[float]:
+    """
+    Score every potential cut in one pass.
+    scores[i] is the score for cutting between segs[i - 1] and segs[i] (scores[0] is unused).
+    """
+    scores = [0.0] * len(segs)
+    for i in range(1, len(segs)):
+        scores[i] = boundary_score(segs[i - 1], segs[i])
+    return scores
+
+
 def find_best_cut_index(
     segs: List[Segment],
     start_idx: int,
     hard_end_idx: int,
     lookback_frac: float,
+    cut_scores: Optional[List[float]] = None,
 ) -> int:
     """
     Choose best boundary near the hard_end_idx.
     Returns index where chunk should end (exclusive).
+    Uses precomputed cut_scores (from compute_boundary_scores) when given.
     """
     if hard_end_idx <= start_idx + 1:
         return hard_end_idx
@@ -159,7 +181,10 @@ def find_best_cut_index(
     best_score = -1e9
 
     for i in range(scan_from, hard_end_idx):
-        score = boundary_score(segs[i - 1], segs[i])
+        if cut_scores is not None:
+            score = cut_scores[i]
+        else:
+            score = boundary_score(segs[i - 1], segs[i])
 
         # Prefer cuts closer to hard_end_idx
         closeness = (i - scan_from) / max(1, (hard_end_idx - scan_from))
@@ -183,6 +208,8 @@ def build_chunks(
     overlap_frac: float,
     min_tokens: int,
     lookback_frac: float,
+    seg_tokens: Optional[List[int]] = None,
+    cut_scores: Optional[List[float]] = None,
 ) -> List[Chunk]:
     assert 0.0 <= overlap_frac < 1.0
     assert tier in ("fine", "coarse")
@@ -194,18 +221,24 @@ def build_chunks(
 
     idx = 0
     chunk_num = 0
-    seg_tokens = [simple_token_count(s.text) for s in segs]
+    if seg_tokens is None:
+        seg_tokens = [simple_token_count(s.text) for s in segs]
+    if cut_scores is None:
+        cut_scores = compute_boundary_scores(segs)
+
+    # prefix[i] = tokens in segs[:i], so any range sum is O(1)
+    prefix = [0] * (n + 1)
+    for i, t in enumerate(seg_tokens):
+        prefix[i + 1] = prefix[i] + t
 
     while idx < n:
-        tok_sum = 0
         end_idx = idx
 
-        while end_idx < n and tok_sum < target_tokens:
-            tok_sum += seg_tokens[end_idx]
+        while end_idx < n and prefix[end_idx] - prefix[idx] < target_tokens:
             end_idx += 1
 
         # Avoid tiny final chunk
-        remaining = sum(seg_tokens[end_idx:]) if end_idx < n else 0
+        remaining = prefix[n] - prefix[end_idx]
         if remaining < min_tokens and end_idx < n:
             end_idx = n
 
@@ -214,6 +247,7 @@ def build_chunks(
             start_idx=idx,
             hard_end_idx=end_idx,
             lookback_frac=lookback_frac,
+            cut_scores=cut_scores,
         )
 
         if cut_idx <= idx:
@@ -258,6 +292,9 @@ def chunk_transcript_two_tier(
     coarse_overlap: float = 0.12,
 ) -> Dict[str, List[Dict[str, Any]]]:
     segs = normalize_segments(raw_segments)
+    # Token counts and boundary scores are shared by both tiers, so compute once
+    seg_tokens = [simple_token_count(s.text) for s in segs]
+    cut_scores = compute_boundary_scores(segs)
 
     fine = build_chunks(
         segs,
@@ -266,6 +303,8 @@ def chunk_transcript_two_tier(
         overlap_frac=fine_overlap,
         min_tokens=140,
         lookback_frac=0.25,
+        seg_tokens=seg_tokens,
+        cut_scores=cut_scores,
     )
 
     coarse = build_chunks(
@@ -275,6 +314,8 @@ def chunk_transcript_two_tier(
         overlap_frac=coarse_overlap,
         min_tokens=240,
         lookback_frac=0.20,
+        seg_tokens=seg_tokens,
+        cut_scores=cut_scores,
     )
 
     return {
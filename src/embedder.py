@@ -6,20 +6,141 @@ Generates embeddings for text chunks to enable semantic search.
 
 from __future__ import annotations
 
+import asyncio
+import base64
+import functools
+import hashlib
 import os
-import time
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
-from openai import BadRequestError
+import queue
+import sqlite3
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Optional, Tuple
+import numpy as np
+import httpx
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
+from openai import BadRequestError, RateLimitError
+from chunk import simple_token_count
+from rate_limiter import RateLimiter
+
+# Try to import tiktoken for accurate token counting
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# Try to import h2 so the OpenAI clients can use HTTP/2
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Persistent content-addressed cache shared across indexing runs
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "pod2chat", "embeddings.sqlite")
+
+# Attempts per batch before giving up on rate-limit errors
+MAX_RETRY_ATTEMPTS = 6
+
+# Per-request token budget for a batch (API limit is 300k tokens per embeddings call)
+MAX_BATCH_TOKENS = 280_000
+
+# Query embeddings kept in memory (LRU) in front of the on-disk cache
+QUERY_CACHE_SIZE = 10_000
+
+# Keep-alive pool shared by the embedding, summary and chat requests
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60)
+
+
+@functools.lru_cache(maxsize=4)
+def get_client(api_key: str) -> OpenAI:
+    """
+    Get the shared synchronous OpenAI client for an API key.
+    
+    Reusing one client keeps its HTTP connection pool (and TLS sessions) warm
+    across the embedder, summariser and chat.
+    
+    Args:
+        api_key: OpenAI API key
+        
+    Returns:
+        OpenAI client
+    """
+    return OpenAI(
+        api_key=api_key,
+        http_client=DefaultHttpxClient(http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS),
+    )
+
+
+def new_async_client(api_key: str) -> AsyncOpenAI:
+    """
+    Create an async OpenAI client.
+    
+    Unlike get_client this is not shared: an async client's connections belong to the
+    event loop that opened them, so each event loop needs its own.
+    
+    Args:
+        api_key: OpenAI API key
+        
+    Returns:
+        AsyncOpenAI client
+    """
+    return AsyncOpenAI(
+        api_key=api_key,
+        http_client=DefaultAsyncHttpxClient(http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS),
+    )
+
+
+def decode_embedding(values: Any) -> np.ndarray:
+    """
+    Decode an embedding returned by the API into a float32 array.
+    
+    Args:
+        values: Base64-encoded float32 bytes (encoding_format="base64") or a list of floats
+        
+    Returns:
+        float32 vector
+    """
+    if isinstance(values, str):
+        return np.frombuffer(base64.b64decode(values), dtype=np.float32)
+    return np.asarray(values, dtype=np.float32)
+
+
+def normalize_embedding(values: Any) -> np.ndarray:
+    """
+    Cast an embedding to a float32 array and L2-normalize it.
+    
+    Args:
+        values: Embedding values (list of floats, array, or base64 string)
+        
+    Returns:
+        Unit-length float32 vector (zero vectors are returned unchanged)
+    """
+    vec = decode_embedding(values)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm > 0 else vec
 
 
 class Embedder:
     """Embedding generation service with OpenAI API."""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+        max_concurrency: int = 8,
+    ):
         """
         Initialize embedder with OpenAI API key.
         If not provided, will try to get from OPENAI_API_KEY environment variable.
+        
+        Args:
+            api_key: OpenAI API key (optional)
+            cache_path: Path to the SQLite embedding cache (None disables caching)
+            max_concurrency: Maximum number of embedding batches in flight at once
         """
         api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not api_key:
@@ -27,13 +148,140 @@ class Embedder:
                 "OpenAI API key required. Set OPENAI_API_KEY environment variable "
                 "or pass api_key parameter."
             )
-        self.client = OpenAI(api_key=api_key)
+        # Clients are created on first use so fully cached runs never construct them
+        self._api_key = api_key
+        self._client: Optional[OpenAI] = None
+        # Event loop -> async client; entries go away with their loop
+        self._aclients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI] = weakref.WeakKeyDictionary()
         self.model = "text-embedding-3-small"  # Cost-effective embedding model
+        self.max_concurrency = max_concurrency
+        self._tokenizer = None
+        if TIKTOKEN_AVAILABLE:
+            try:
+                self._tokenizer = tiktoken.encoding_for_model(self.model)
+            except Exception:
+                self._tokenizer = None
+        
+        # Rate limiting: 3,000 RPM, 1,000,000 TPM (use 95% safety margin)
+        self._limiter = RateLimiter(rpm=2_850, tpm=950_000)
         
         # Track token usage for embeddings (if needed for cost calculation)
         self._total_tokens = 0
 
-    def embed_text(self, text: str) -> List[float]:
+        self._cache = self._open_cache(cache_path) if cache_path else None
+        self._query_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+
+    @property
+    def client(self) -> OpenAI:
+        """Synchronous OpenAI client, created on first use."""
+        if self._client is None:
+            self._client = get_client(self._api_key)
+        return self._client
+
+    @property
+    def aclient(self) -> AsyncOpenAI:
+        """
+        Async OpenAI client for the running event loop, created on first use in that loop.
+        
+        A client can't be reused once its loop is closed (e.g. across asyncio.run calls),
+        so each loop gets its own. Must be accessed from inside a coroutine.
+        """
+        loop = asyncio.get_running_loop()
+        client = self._aclients.get(loop)
+        if client is None:
+            client = self._aclients[loop] = new_async_client(self._api_key)
+        return client
+
+    async def aclose(self) -> None:
+        """Close the running event loop's async client, if one was created."""
+        client = self._aclients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+    def _count_tokens(self, text: str) -> int:
+        """Count tokens using tiktoken (preferred) or fallback approximation."""
+        if self._tokenizer is not None:
+            try:
+                return len(self._tokenizer.encode(text))
+            except Exception:
+                pass
+        return simple_token_count(text)
+
+    def _count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Count tokens for many texts in one tiktoken call (multi-threaded, outside the GIL)."""
+        if self._tokenizer is not None:
+            try:
+                return [len(tokens) for tokens in self._tokenizer.encode_batch(texts, disallowed_special=())]
+            except Exception:
+                pass
+        return [simple_token_count(text) for text in texts]
+
+    # ----------------------------
+    # Embedding cache
+    # ----------------------------
+
+    def _open_cache(self, cache_path: str) -> Optional[sqlite3.Connection]:
+        """Open (or create) the SQLite embedding cache. Returns None if unavailable."""
+        try:
+            cache_dir = os.path.dirname(cache_path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            conn = sqlite3.connect(cache_path)
+            conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vec BLOB NOT NULL)")
+            conn.commit()
+            return conn
+        except (OSError, sqlite3.Error) as e:
+            print(f"    Warning: Embedding cache unavailable: {e}")
+            return None
+
+    def _cache_key(self, text: str) -> str:
+        """Content-addressed cache key; embeddings are deterministic per (model, text)."""
+        return hashlib.sha256((self.model + "\0" + text).encode("utf-8")).hexdigest()
+
+    def _cache_get(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up cached embeddings.
+        
+        Args:
+            keys: Cache keys to look up
+            
+        Returns:
+            Dictionary mapping each cached key to its embedding
+        """
+        if self._cache is None or not keys:
+            return {}
+        
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        # Stay well below SQLite's host-parameter limit
+        for i in range(0, len(unique_keys), 500):
+            batch_keys = unique_keys[i:i + 500]
+            placeholders = ",".join("?" * len(batch_keys))
+            try:
+                rows = self._cache.execute(
+                    f"SELECT key, vec FROM embeddings WHERE key IN ({placeholders})", batch_keys
+                ).fetchall()
+            except sqlite3.Error as e:
+                print(f"    Warning: Embedding cache lookup failed: {e}")
+                return found
+            for key, vec in rows:
+                found[key] = np.frombuffer(vec, dtype=np.float32)
+        return found
+
+    def _cache_put(self, entries: List[Tuple[str, np.ndarray]]) -> None:
+        """Store newly generated embeddings in the cache."""
+        if self._cache is None or not entries:
+            return
+        try:
+            self._cache.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vec) VALUES (?, ?)",
+                [(key, np.asarray(vec, dtype=np.float32).tobytes()) for key, vec in entries],
+            )
+            self._cache.commit()
+        except sqlite3.Error as e:
+            print(f"    Warning: Embedding cache write failed: {e}")
+
+    def embed_text(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text string.
         
@@ -41,32 +289,156 @@ class Embedder:
             text: Text to embed
             
         Returns:
-            List of floats representing the embedding vector
+            Unit-length float32 embedding vector (read-only; it is shared with the cache)
         """
+        key = self._cache_key(text)
+        embedding = self._lookup_query(key)
+        if embedding is not None:
+            return embedding
+
         try:
             response = self.client.embeddings.create(
                 model=self.model,
                 input=text,
+                encoding_format="base64",
             )
-            embedding = response.data[0].embedding
-            # Track usage if available
+            return self._store_query(key, response)
+        except Exception as e:
+            print(f"    Warning: Embedding generation failed: {e}")
+            raise
+
+    def embed_texts(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Generate embeddings for several short texts (e.g. queries) with one API call.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            One unit-length float32 embedding per text, in input order
+        """
+        keys = [self._cache_key(text) for text in texts]
+        embeddings: List[Optional[np.ndarray]] = [self._query_cache.get(key) for key in keys]
+
+        # Anything not in the in-memory LRU is looked up on disk in one query
+        on_disk = self._cache_get([key for key, embedding in zip(keys, embeddings) if embedding is None])
+        for key, vec in on_disk.items():
+            self._remember_query(key, vec)
+        for i, key in enumerate(keys):
+            if embeddings[i] is None:
+                embeddings[i] = on_disk.get(key)
+            else:
+                self._query_cache.move_to_end(key)
+
+        # Embed each distinct uncached text once
+        missing: Dict[str, str] = {}
+        for key, text, embedding in zip(keys, texts, embeddings):
+            if embedding is None:
+                missing.setdefault(key, text)
+        if missing:
+            try:
+                response = self.client.embeddings.create(
+                    model=self.model,
+                    input=list(missing.values()),
+                    encoding_format="base64",
+                )
+            except Exception as e:
+                print(f"    Warning: Embedding generation failed: {e}")
+                raise
             if hasattr(response, 'usage'):
                 self._total_tokens += response.usage.total_tokens
+            missing_keys = list(missing)
+            new_entries = []
+            fresh: Dict[str, np.ndarray] = {}
+            for item in response.data:
+                key = missing_keys[item.index]
+                vec = normalize_embedding(item.embedding)
+                new_entries.append((key, vec))
+                fresh[key] = vec
+                self._remember_query(key, vec)
+            self._cache_put(new_entries)
+            embeddings = [fresh[key] if embedding is None else embedding for key, embedding in zip(keys, embeddings)]
+
+        return embeddings
+
+    async def aembed_text(self, text: str) -> np.ndarray:
+        """
+        Async version of embed_text, using the AsyncOpenAI client.
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            Unit-length float32 embedding vector (read-only; it is shared with the cache)
+        """
+        key = self._cache_key(text)
+        embedding = self._lookup_query(key)
+        if embedding is not None:
             return embedding
+
+        try:
+            response = await self.aclient.embeddings.create(
+                model=self.model,
+                input=text,
+                encoding_format="base64",
+            )
+            return self._store_query(key, response)
         except Exception as e:
             print(f"    Warning: Embedding generation failed: {e}")
             raise
 
-    def embed_chunks(self, chunks: List[Dict[str, Any]], batch_size: int = 100) -> List[Dict[str, Any]]:
+    def _lookup_query(self, key: str) -> Optional[np.ndarray]:
+        """Find a query embedding in the in-memory LRU, then the on-disk cache."""
+        if key in self._query_cache:
+            self._query_cache.move_to_end(key)
+            return self._query_cache[key]
+
+        cached = self._cache_get([key])
+        if key in cached:
+            embedding = cached[key]
+            self._remember_query(key, embedding)
+            return embedding
+        return None
+
+    def _store_query(self, key: str, response: Any) -> np.ndarray:
+        """Decode a single-input embeddings response and cache the vector."""
+        vec = normalize_embedding(response.data[0].embedding)
+        # Track usage if available
+        if hasattr(response, 'usage'):
+            self._total_tokens += response.usage.total_tokens
+        self._cache_put([(key, vec)])
+        self._remember_query(key, vec)
+        return vec
+
+    def _remember_query(self, key: str, embedding: np.ndarray) -> None:
+        """Add a query embedding to the in-memory LRU, evicting the oldest entry when full."""
+        # Kept as float32 (6 KB per 1536-d vector rather than ~50 KB as a list of floats)
+        # and frozen, since callers receive the cached array itself
+        embedding.flags.writeable = False
+        self._query_cache[key] = embedding
+        if len(self._query_cache) > QUERY_CACHE_SIZE:
+            self._query_cache.popitem(last=False)
+
+    def embed_chunks(
+        self,
+        chunks: List[Dict[str, Any]],
+        batch_size: int = 512,
+        on_batch: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    ) -> List[Dict[str, Any]]:
         """
         Generate embeddings for a list of chunks using batch processing.
         
         Args:
             chunks: List of chunk dictionaries with 'text' key
-            batch_size: Number of texts to embed in each batch (OpenAI supports up to 2048)
+            batch_size: Maximum number of texts per batch (OpenAI supports up to 2048);
+                batches are also capped at MAX_BATCH_TOKENS tokens
+            on_batch: Optional callback receiving each group of finished chunks as soon as it
+                is ready (cache hits first, then each API batch as it completes), so consumers
+                such as the vector store can work while later batches are still in flight
             
         Returns:
-            List of chunks with 'embedding' key added
+            List of chunks with 'embedding' key added (unit-length float32 array,
+            or None if the chunk could not be embedded)
         """
         if not chunks:
             return []
@@ -75,58 +447,220 @@ class Embedder:
         
         # Prepare texts for embedding
         texts = [chunk.get("text", "") for chunk in chunks]
+        all_embeddings: List[Optional[np.ndarray]] = [None] * len(texts)
+        chunks_with_embeddings: List[Dict[str, Any]] = [{}] * len(chunks)
         
-        # Process in batches
-        all_embeddings = []
-        total_batches = (len(texts) + batch_size - 1) // batch_size
+        def emit(indices: List[int]) -> None:
+            """Attach embeddings to the given chunks and hand them to on_batch."""
+            batch = []
+            for idx in indices:
+                chunk_copy = chunks[idx].copy()
+                chunk_copy["embedding"] = all_embeddings[idx]
+                chunks_with_embeddings[idx] = chunk_copy
+                batch.append(chunk_copy)
+            if on_batch and batch:
+                on_batch(batch)
         
-        for i in range(0, len(texts), batch_size):
-            batch_num = (i // batch_size) + 1
-            batch_texts = texts[i:i + batch_size]
-            
-            try:
-                response = self.client.embeddings.create(
-                    model=self.model,
-                    input=batch_texts,
-                )
-                
-                # Extract embeddings
-                batch_embeddings = [item.embedding for item in response.data]
-                all_embeddings.extend(batch_embeddings)
+        # Consult the cache first so only misses are sent to the API
+        keys = [self._cache_key(text) for text in texts]
+        cached = self._cache_get(keys)
+        
+        # Group misses by content so each unique text is embedded once
+        owners: Dict[str, List[int]] = {}
+        hit_idx = []
+        for idx, key in enumerate(keys):
+            if key in cached:
+                all_embeddings[idx] = cached[key]
+                hit_idx.append(idx)
+            else:
+                owners.setdefault(key, []).append(idx)
+        miss_keys = list(owners)
+        if cached:
+            print(f"      Cache hit for {len(hit_idx)}/{len(texts)} chunks")
+        emit(hit_idx)
+        
+        # Fast path: everything was cached, so no API client is ever needed
+        if not owners:
+            print(f"    Embedding complete: {len(chunks)} chunks embedded (all cached)")
+            return chunks_with_embeddings
+        
+        # Process unique misses in batches, with up to max_concurrency batches in flight
+        miss_texts = [texts[owners[key][0]] for key in miss_keys]
+        batches = self._pack_batches(miss_texts, batch_size)
+        new_entries = []
+        
+        # on_batch may touch objects bound to this thread (e.g. the vector store's SQLite
+        # connection), so results finished on _run_async's worker thread are handed back here
+        caller = threading.get_ident()
+        handoff: queue.SimpleQueue = queue.SimpleQueue()
+        
+        def handle_result(batch_num: int, response: Any) -> None:
+            """Scatter one finished batch back to its chunks."""
+            batch_keys = [miss_keys[j] for j in batches[batch_num - 1][0]]
+            if isinstance(response, Exception):
+                # Failed batch keeps no embeddings
+                print(f"    Warning: Batch {batch_num} failed: {response}")
+            else:
+                # Scatter embeddings back to every chunk sharing the text, matched by the response's
+                # own index so a reordered or short response can't attach them to the wrong text
+                for item in response.data:
+                    if not 0 <= item.index < len(batch_keys):
+                        continue
+                    key = batch_keys[item.index]
+                    embedding = normalize_embedding(item.embedding)
+                    for idx in owners[key]:
+                        all_embeddings[idx] = embedding
+                    new_entries.append((key, embedding))
+                if len(response.data) < len(batch_keys):
+                    print(f"    Warning: Batch {batch_num} returned {len(response.data)}/{len(batch_keys)} embeddings")
                 
                 # Track usage
                 if hasattr(response, 'usage'):
                     self._total_tokens += response.usage.total_tokens
                 
-                print(f"      Embedded batch {batch_num}/{total_batches} ({len(batch_texts)} chunks)")
-                
-                # Small delay between batches to avoid rate limits (embeddings have higher limits)
-                if i + batch_size < len(texts):
-                    time.sleep(0.1)
-                    
-            except BadRequestError as e:
-                if "rate_limit_exceeded" in str(e).lower():
-                    print(f"      Rate limit exceeded, waiting 1 second...")
-                    time.sleep(1.0)
-                    # Retry this batch
-                    i -= batch_size
-                    continue
-                else:
-                    print(f"    Warning: Batch {batch_num} failed: {e}")
-                    # Fill with empty embeddings for failed batch
-                    all_embeddings.extend([[]] * len(batch_texts))
-            except Exception as e:
-                print(f"    Warning: Batch {batch_num} failed: {e}")
-                # Fill with empty embeddings for failed batch
-                all_embeddings.extend([[]] * len(batch_texts))
+                print(f"      Embedded batch {batch_num}/{len(batches)} ({len(batch_keys)} unique texts)")
+            indices = [idx for key in batch_keys for idx in owners[key]]
+            if threading.get_ident() == caller:
+                emit(indices)
+            else:
+                handoff.put(functools.partial(emit, indices))
+        
+        self._run_async(
+            self._embed_batches(
+                [([miss_texts[j] for j in batch_idx], tokens) for batch_idx, tokens in batches],
+                handle_result,
+            ),
+            handoff,
+        )
         
-        # Add embeddings to chunks
-        chunks_with_embeddings = []
-        for chunk, embedding in zip(chunks, all_embeddings):
-            chunk_copy = chunk.copy()
-            chunk_copy["embedding"] = embedding
-            chunks_with_embeddings.append(chunk_copy)
+        self._cache_put(new_entries)
         
-        print(f"    Embedding complete: {len([c for c in chunks_with_embeddings if c.get('embedding')])} chunks embedded")
+        print(f"    Embedding complete: {sum(1 for e in all_embeddings if e is not None)} chunks embedded")
         
         return chunks_with_embeddings
+
+    def _run_async(self, coro: Any, handoff: Optional[queue.SimpleQueue] = None) -> Any:
+        """
+        Run a coroutine to completion from synchronous code and close its async client.
+        
+        If this thread already runs an event loop (e.g. a notebook or async caller),
+        the coroutine runs on a fresh loop in a worker thread instead; while waiting,
+        this thread runs the callables the coroutine puts on handoff.
+        
+        Args:
+            coro: Coroutine to run
+            handoff: Optional queue of zero-argument callables to run on the calling thread
+            
+        Returns:
+            The coroutine's result
+        """
+        async def run_and_close() -> Any:
+            try:
+                return await coro
+            finally:
+                await self.aclose()
+        
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(run_and_close())
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            future = pool.submit(asyncio.run, run_and_close())
+            while handoff is not None and not future.done():
+                try:
+                    handoff.get(timeout=0.05)()
+                except queue.Empty:
+                    pass
+            while handoff is not None and not handoff.empty():
+                handoff.get()()
+            return future.result()
+
+    def _pack_batches(self, texts: List[str], batch_size: int) -> List[Tuple[List[int], int]]:
+        """
+        Pack texts into batches bounded by both item count and token budget.
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Maximum number of texts per batch
+            
+        Returns:
+            List of (text indices, token count) per batch
+        """
+        batches = []
+        current: List[int] = []
+        current_tokens = 0
+        
+        for idx, text_tokens in enumerate(self._count_tokens_batch(texts)):
+            if current and (current_tokens + text_tokens > MAX_BATCH_TOKENS or len(current) >= batch_size):
+                batches.append((current, current_tokens))
+                current = []
+                current_tokens = 0
+            current.append(idx)
+            current_tokens += text_tokens
+        
+        if current:
+            batches.append((current, current_tokens))
+        
+        return batches
+
+    async def _embed_batches(
+        self,
+        batches: List[Tuple[List[str], int]],
+        on_result: Callable[[int, Any], None],
+    ) -> None:
+        """
+        Embed batches concurrently, bounded by max_concurrency.
+        
+        Finished batches pass through a bounded queue to a single consumer, which calls
+        on_result(batch_num, response) while other batches are still in flight.
+        
+        Args:
+            batches: List of (texts, token count) batches
+            on_result: Called once per batch with its 1-based number and its response
+                (or the exception that made it fail)
+        """
+        sem = asyncio.Semaphore(self.max_concurrency)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrency)
+        
+        async def produce(batch_num: int, batch_texts: List[str], tokens: int) -> None:
+            try:
+                response = await self._embed_batch(sem, batch_texts, tokens)
+            except Exception as e:
+                response = e
+            await queue.put((batch_num, response))
+        
+        async def consume() -> None:
+            for _ in range(len(batches)):
+                batch_num, response = await queue.get()
+                on_result(batch_num, response)
+        
+        await asyncio.gather(
+            consume(),
+            *(produce(i, batch_texts, tokens) for i, (batch_texts, tokens) in enumerate(batches, start=1)),
+        )
+
+    async def _embed_batch(self, sem: asyncio.Semaphore, batch_texts: List[str], tokens: int) -> Any:
+        """
+        Embed a single batch, retrying with exponential backoff if the rate limit is hit.
+        
+        Raises the last error after MAX_RETRY_ATTEMPTS, so the caller leaves the batch un-embedded.
+        """
+        async with sem:
+            attempt = 0
+            while True:
+                await self._limiter.await_capacity(tokens)
+                try:
+                    return await self.aclient.embeddings.create(
+                        model=self.model,
+                        input=batch_texts,
+                        encoding_format="base64",
+                    )
+                except (RateLimitError, BadRequestError) as e:
+                    if isinstance(e, BadRequestError) and "rate_limit_exceeded" not in str(e).lower():
+                        raise
+                    attempt += 1
+                    if attempt >= MAX_RETRY_ATTEMPTS:
+                        raise
+                    wait_time = min(30, 2 ** attempt)
+                    print(f"      Rate limit exceeded, retrying in {wait_time}s (attempt {attempt}/{MAX_RETRY_ATTEMPTS})...")
+                    await asyncio.sleep(wait_time)
@@ -1,30 +1,99 @@
 """Main entry point for the application."""
 
-from youtube_client import YoutubeClient
-from chunk import chunk_transcript_two_tier
-from summariser import Summariser
-from embedder import Embedder
-from vector_store import VectorStore
-from rag_chat import RAGChat
+# Pipeline modules (and the OpenAI SDK, numpy, tiktoken behind them) are imported
+# inside the commands that use them, so `--help` and each subcommand start fast
 import sys
 import json
 import os
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+import re
+from urllib.parse import urlparse
 from dotenv import load_dotenv
 
+# Try to import orjson for faster JSON encoding
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 load_dotenv()
 
+# Watch, short-link, Shorts and embed URLs all carry the 11-character video ID after one of these markers
+_VIDEO_ID_RE = re.compile(r"(?:v=|youtu\.be/|shorts/|embed/)([A-Za-z0-9_-]{11})")
+
 
 def extract_video_id(url: str) -> str:
     """Extract video ID from YouTube URL."""
-    if "v=" in url:
-        return url.split("v=")[1].split("&")[0]
-    # Handle short URLs or other formats
-    return url.split("/")[-1].split("?")[0]
+    match = _VIDEO_ID_RE.search(url)
+    if match:
+        return match.group(1)
+    # Handle other formats (or a bare video ID)
+    return urlparse(url).path.rsplit("/", 1)[-1]
+
+
+def dump_json(obj) -> bytes:
+    """Encode an object as UTF-8 JSON bytes (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def embed_and_store(chunks: dict, video_id: str, url: str, output_folder: str, verbose: bool = False) -> None:
+    """
+    Embed fine and coarse chunks and store them in the video's vector store.
+    
+    Embeddings are also written back onto the chunk dicts so the summariser can use them.
+    Failures are reported and swallowed so indexing can continue without embeddings.
+    """
+    from embedder import Embedder
+    from vector_store import VectorStore
+
+    if verbose:
+        print("  Step 5: Generating embeddings for chunks...")
+    print("Generating embeddings and storing in vector store...")
+    try:
+        # Initialize embedder
+        embedder = Embedder()
+        
+        # Combine fine and coarse chunks for embedding
+        all_chunks = []
+        for tier in ["fine", "coarse"]:
+            tier_chunks = chunks.get(tier, [])
+            for chunk in tier_chunks:
+                chunk["tier"] = tier
+            all_chunks.extend(tier_chunks)
+        
+        # Generate embeddings for all chunks, storing each batch in the vector store
+        # (with URL) as soon as it is embedded
+        db_path = f"{output_folder}/chunks.db"
+        if verbose:
+            print("  Step 6: Storing chunks in vector database as batches complete...")
+        with VectorStore(db_path) as store:
+            chunks_with_embeddings = embedder.embed_chunks(
+                all_chunks,
+                on_batch=lambda batch: store.insert_chunks(batch, video_id, url),
+            )
+        # Keep embeddings on the original chunks so the summariser can select diverse chunks
+        for chunk, embedded in zip(all_chunks, chunks_with_embeddings):
+            chunk["embedding"] = embedded["embedding"]
+        if verbose:
+            print(f"  ✓ Generated embeddings for {len(chunks_with_embeddings)} chunks")
+            print(f"  ✓ Vector store created with {len(chunks_with_embeddings)} chunks")
+        
+        print(f"Vector store saved to {db_path}")
+    except Exception as e:
+        print(f"Warning: Embedding/vector store generation failed: {e}")
+        print("Continuing without embeddings...")
 
 
 def index_video(url: str, verbose: bool = False) -> None:
     """Index a video: fetch transcript, chunk, embed, and store."""
+    from youtube_client import YoutubeClient
+    from chunk import chunk_transcript_two_tier
+    from summariser import Summariser
+
     print("Welcome to Pod2Chat!")
     print(f"Indexing video: {url}")
 
@@ -36,6 +105,11 @@ def index_video(url: str, verbose: bool = False) -> None:
         print("  Step 1: Fetching transcript from YouTube...")
     client = YoutubeClient()
 
+    # Fetch metadata in the background; it's only needed for the summary
+    metadata_pool = ThreadPoolExecutor(max_workers=1)
+    metadata_future = metadata_pool.submit(client.get_video_metadata, video_id, url)
+    metadata_pool.shutdown(wait=False)
+
     try:
         transcript = client.get_transcript(video_id)
         if verbose:
@@ -44,32 +118,29 @@ def index_video(url: str, verbose: bool = False) -> None:
         print("Could not fetch transcript for your video. Please check the video id and try again.")
         return
 
-    # 3. parse transcript
+    # 3. Create output folder
     if verbose:
-        print("  Step 2: Parsing transcript segments...")
-    jsonl_text = ""
+        print("  Step 2: Creating output directory...")
+    output_folder = f"output_{video_id}"
+    os.makedirs(output_folder, exist_ok=True)
+
+    # 4. Parse transcript, streaming each segment to disk as it is parsed
+    if verbose:
+        print("  Step 3: Parsing transcript segments...")
     raw_segments = []
-    for entry in transcript:
-        entry_dict = {
-            "start": entry.start,
-            "text": entry.text,
-            "duration": entry.duration,
-            "end": entry.start + entry.duration,
-        }
-        jsonl_text += json.dumps(entry_dict) + "\n"
-        raw_segments.append(entry_dict)
+    with open(f"{output_folder}/transcript.jsonl", "wb") as f:
+        for entry in transcript:
+            entry_dict = {
+                "start": entry.start,
+                "text": entry.text,
+                "duration": entry.duration,
+                "end": entry.start + entry.duration,
+            }
+            f.write(dump_json(entry_dict) + b"\n")
+            raw_segments.append(entry_dict)
     if verbose:
         print(f"  ✓ Parsed {len(raw_segments)} segments")
 
-    # 4. Create output folder and write transcript
-    if verbose:
-        print("  Step 3: Creating output directory...")
-    output_folder = f"output_{video_id}"
-    os.makedirs(output_folder, exist_ok=True)
-    
-    with open(f"{output_folder}/transcript.jsonl", "w") as f:
-        f.write(jsonl_text)
-
     print(f"Transcript saved to {output_folder}/transcript.jsonl")
 
     # 5. chunk transcript
@@ -82,78 +153,52 @@ def index_video(url: str, verbose: bool = False) -> None:
         coarse_count = len(chunks.get("coarse", []))
         print(f"  ✓ Created {fine_count} fine chunks and {coarse_count} coarse chunks")
     print(f"Chunks saved to {output_folder}/chunks.jsonl")
-    with open(f"{output_folder}/chunks.jsonl", "w") as f:
-        json.dump(chunks, f)
+    with open(f"{output_folder}/chunks.jsonl", "wb") as f:
+        f.write(dump_json(chunks))
     
-    # 6. Generate embeddings and store in vector store
-    if verbose:
-        print("  Step 5: Generating embeddings for chunks...")
-    print("Generating embeddings and storing in vector store...")
-    try:
-        # Initialize embedder
-        embedder = Embedder()
-        
-        # Combine fine and coarse chunks for embedding
-        all_chunks = []
-        for tier in ["fine", "coarse"]:
-            tier_chunks = chunks.get(tier, [])
-            for chunk in tier_chunks:
-                chunk["tier"] = tier
-            all_chunks.extend(tier_chunks)
-        
-        # Generate embeddings for all chunks
-        chunks_with_embeddings = embedder.embed_chunks(all_chunks)
-        if verbose:
-            print(f"  ✓ Generated embeddings for {len(chunks_with_embeddings)} chunks")
-        
-        # Store in vector store (with URL)
-        db_path = f"{output_folder}/chunks.db"
-        if verbose:
-            print("  Step 6: Storing chunks in vector database...")
-        with VectorStore(db_path) as store:
-            store.insert_chunks(chunks_with_embeddings, video_id, url)
-        if verbose:
-            print(f"  ✓ Vector store created with {len(chunks_with_embeddings)} chunks")
-        
-        print(f"Vector store saved to {db_path}")
-    except Exception as e:
-        print(f"Warning: Embedding/vector store generation failed: {e}")
-        print("Continuing without embeddings...")
+    # 6. Generate embeddings (in the background) and the markdown summary concurrently.
+    # Both wait on the OpenAI API; the summariser only needs the embeddings after topic extraction.
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        embedding_done = pool.submit(embed_and_store, chunks, video_id, url, output_folder, verbose)
 
-    # 7. Generate markdown summary
-    if verbose:
-        print("  Step 7: Generating markdown summary...")
-    print("Generating markdown summary...")
-    try:
-        # Get video metadata
+        # 7. Generate markdown summary
         if verbose:
-            print("    Fetching video metadata...")
-        metadata = client.get_video_metadata(video_id, url)
-        if verbose:
-            print(f"    Title: {metadata.get('title', 'N/A')}")
-            print(f"    Channel: {metadata.get('channel', 'N/A')}")
+            print("  Step 7: Generating markdown summary...")
+        print("Generating markdown summary...")
+        try:
+            # Get video metadata (prefetched while the transcript was processed)
+            if verbose:
+                print("    Fetching video metadata...")
+            metadata = metadata_future.result()
+            if verbose:
+                print(f"    Title: {metadata.get('title', 'N/A')}")
+                print(f"    Channel: {metadata.get('channel', 'N/A')}")
         
-        # Initialize summarizer
-        summariser = Summariser(verbose=verbose)
+            # Initialize summarizer
+            summariser = Summariser(verbose=verbose)
         
-        # Generate summary
-        summary_markdown = summariser.generate_summary(chunks, metadata, raw_segments)
+            # Generate summary
+            summary_markdown = summariser.generate_summary(
+                chunks, metadata, raw_segments, wait_for_embeddings=embedding_done.result
+            )
         
-        # Write summary to file
-        summary_path = f"{output_folder}/summary.md"
-        with open(summary_path, "w", encoding="utf-8") as f:
-            f.write(summary_markdown)
+            # Write summary to file
+            summary_path = f"{output_folder}/summary.md"
+            with open(summary_path, "w", encoding="utf-8") as f:
+                f.write(summary_markdown)
         
-        print(f"Summary saved to {summary_path}")
-    except Exception as e:
-        print(f"Warning: Summary generation failed: {e}")
-        print("Continuing without summary...")
-    
+            print(f"Summary saved to {summary_path}")
+        except Exception as e:
+            print(f"Warning: Summary generation failed: {e}")
+            print("Continuing without summary...")
+
     print(f"\nVideo indexed successfully! You can now chat about it using: pod2chat chat {url}")
 
 
 def chat_video(url: str, verbose: bool = False) -> None:
     """Start interactive chat about a video."""
+    from rag_chat import RAGChat
+
     if verbose:
         print("Initializing chat session...")
     video_id = extract_video_id(url)
@@ -212,10 +257,12 @@ def chat_video(url: str, verbose: bool = False) -> None:
             try:
                 if verbose:
                     print(f"\n  Processing query: '{query}'...")
-                result = rag_chat.chat(query)
-                
-                # Display response
-                print(f"\nAssistant: {result['response']}")
+                # Display the response as it streams in
+                print("\nAssistant: ", end="", flush=True)
+                for piece in rag_chat.chat_stream(query):
+                    print(piece, end="", flush=True)
+                print()
+                result = rag_chat.last_result
                 
                 # Display sources
                 if result['sources']:
@@ -278,3 +278,17 @@ Batch summaries to merge:
 {combined_summaries}
 
 Provide the merged summary:"""
+
+# ============================================================================
+# Packed Request Prompts
+# ============================================================================
+
+BATCH_CHAT_SYSTEM_SUFFIX = """
+
+You will be given several independent tasks in one message. Answer each task separately, exactly as you would if it had been sent on its own, and return only valid JSON."""
+
+BATCH_CHAT_PROMPT_TEMPLATE = """Complete each of the following {count} independent tasks. Do not let content from one task leak into another.
+
+{tasks}
+
+Return ONLY a JSON array of exactly {count} strings, where element i is your complete answer to TASK i+1 (markdown formatting inside the strings is fine). No extra text."""
@@ -7,20 +7,83 @@ the retrieved context, with no external knowledge.
 
 from __future__ import annotations
 
+import asyncio
+import json
 import os
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
+import re
+import threading
+import weakref
+from typing import List, Dict, Any, Iterator, Optional
+import numpy as np
+from openai import AsyncOpenAI
 from openai import BadRequestError
 from vector_store import VectorStore
-from embedder import Embedder
+from embedder import Embedder, get_client, new_async_client
+from ttl_cache import TTLCache
 from chunk import format_ts
 from prompts import RAG_CHAT_SYSTEM_MESSAGE, RAG_CHAT_USER_MESSAGE_TEMPLATE
 
+# Try to import orjson for faster batch file encoding/decoding
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Repeated queries within this window are answered from memory
+CACHE_TTL_SECONDS = 900
+
+# gpt-5-nano pricing per 1M tokens; prompt-cached input is billed at a discount
+INPUT_COST_PER_M = 0.05
+CACHED_INPUT_COST_PER_M = 0.005
+OUTPUT_COST_PER_M = 0.40
+# Requests run through the Batch API are billed at half price
+BATCH_DISCOUNT = 0.5
+
+# The user message template pre-split around its placeholders, so building a prompt
+# is plain concatenation rather than str.format over a multi-KB context
+_USER_PREFIX, _rest = RAG_CHAT_USER_MESSAGE_TEMPLATE.split("{context}", 1)
+_USER_MIDDLE, _USER_SUFFIX = _rest.split("{query}", 1)
+del _rest
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _append_overlapping(text: str, following: str) -> str:
+    """
+    Append the text of a chunk that overlaps the end of `text`, without repeating the shared part.
+    
+    Neighbouring chunks share whole transcript segments, so the overlap is a suffix of
+    `text` that is also a prefix of `following`.
+    """
+    if following in text:
+        return text
+    probe = following[:32]
+    idx = text.find(probe)
+    while idx != -1:
+        if following.startswith(text[idx:]):
+            return text + following[len(text) - idx:]
+        idx = text.find(probe, idx + 1)
+    return f"{text} {following}"
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for when the API reports no usage."""
+    return len(text) // 4
+
 
 class RAGChat:
     """RAG-based chat service with retrieval and response generation."""
 
-    def __init__(self, db_path: str, video_url: str, api_key: Optional[str] = None, verbose: bool = False):
+    def __init__(
+        self,
+        db_path: str,
+        video_url: str,
+        api_key: Optional[str] = None,
+        verbose: bool = False,
+        rerank_pool_size: Optional[int] = None,
+    ):
         """
         Initialize RAG chat service.
         
@@ -29,11 +92,13 @@ class RAGChat:
             video_url: Video URL to filter chunks
             api_key: OpenAI API key (optional, uses env var if not provided)
             verbose: Enable verbose output for debugging
+            rerank_pool_size: Candidates fetched for keyword re-ranking (default: 3 x max_chunks)
         """
         self.db_path = db_path
         self.video_url = video_url
         self.verbose = verbose
-        self.store = VectorStore(db_path)
+        self.rerank_pool_size = rerank_pool_size
+        self.store = VectorStore.shared(db_path)
         self.embedder = Embedder(api_key)
         
         api_key = api_key or os.getenv("OPENAI_API_KEY")
@@ -42,8 +107,45 @@ class RAGChat:
                 "OpenAI API key required. Set OPENAI_API_KEY environment variable "
                 "or pass api_key parameter."
             )
-        self.client = OpenAI(api_key=api_key)
+        self._api_key = api_key
+        self.client = get_client(api_key)
+        # Event loop -> async client for completions; entries go away with their loop
+        self._aclients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI] = weakref.WeakKeyDictionary()
         self.model = "gpt-5-nano"
+        
+        # Open the HTTPS connection to OpenAI while the search index loads, so the
+        # first question doesn't pay for the TLS handshake
+        threading.Thread(target=self._warm_up, daemon=True).start()
+        
+        # Load the search index for this video now rather than on the first question
+        self.store.preload(video_url, tiers=("coarse", "fine"))
+        
+        self._retrieval_cache = TTLCache(max_items=4096, ttl_sec=CACHE_TTL_SECONDS)
+        self._answer_cache = TTLCache(max_items=1024, ttl_sec=CACHE_TTL_SECONDS)
+        
+        # Result of the last chat_stream() call, set once its stream is exhausted
+        self.last_result: Optional[Dict[str, Any]] = None
+
+    @property
+    def aclient(self) -> AsyncOpenAI:
+        """
+        Async OpenAI client for the running event loop, created on first use in that loop.
+        
+        Not shared with the embedder: each owner closes its own clients in aclose().
+        """
+        loop = asyncio.get_running_loop()
+        client = self._aclients.get(loop)
+        if client is None:
+            client = self._aclients[loop] = new_async_client(self._api_key)
+        return client
+
+    def _warm_up(self) -> None:
+        """Make a cheap request to establish a keep-alive connection; failures are ignored."""
+        try:
+            self.client.models.list()
+        except Exception as e:
+            if self.verbose:
+                print(f"  Warning: connection warm-up failed: {e}")
 
     def chat(self, query: str, max_chunks: int = 10) -> Dict[str, Any]:
         """
@@ -52,65 +154,412 @@ class RAGChat:
         Args:
             query: User's question
             max_chunks: Maximum number of chunks to use for context
-            
+        
         Returns:
             Dictionary with response, chunks used, sources, and token usage
         """
+        answer_key, cached = self._cached_answer(query, max_chunks)
+        if cached is not None:
+            return cached
+        
         if self.verbose:
             print(f"  Step 1: Retrieving relevant chunks for query...")
         # Retrieve relevant chunks
         chunks = self._retrieve_chunks(query, max_chunks)
         
         if not chunks:
+            return self._no_chunks_result()
+        
+        context, sources = self._build_context(chunks)
+        
+        # Generate response
+        if self.verbose:
+            print("  Step 3: Generating response using LLM...")
+        response_text, input_tokens, cached_tokens, output_tokens = self._generate_response(query, context)
+        
+        return self._build_result(answer_key, chunks, sources, response_text, input_tokens, cached_tokens, output_tokens)
+
+    def chat_stream(self, query: str, max_chunks: int = 10) -> Iterator[str]:
+        """
+        Streaming version of chat(): yields the response text as it is generated.
+        
+        Once the stream is exhausted, the full result (sources, token usage and cost)
+        is available as self.last_result.
+        
+        Args:
+            query: User's question
+            max_chunks: Maximum number of chunks to use for context
+        
+        Yields:
+            Pieces of the response text
+        """
+        self.last_result = None
+        answer_key, cached = self._cached_answer(query, max_chunks)
+        if cached is not None:
+            self.last_result = cached
+            yield cached["response"]
+            return
+        
+        if self.verbose:
+            print(f"  Step 1: Retrieving relevant chunks for query...")
+        chunks = self._retrieve_chunks(query, max_chunks)
+        
+        if not chunks:
+            self.last_result = self._no_chunks_result()
+            yield self.last_result["response"]
+            return
+        
+        context, sources = self._build_context(chunks)
+        
+        if self.verbose:
+            print("  Step 3: Generating response using LLM...")
+        messages = self._build_messages(query, context)
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True},
+                extra_body={"prompt_cache_key": f"pod2chat:{self.video_url}"},
+            )
+        except BadRequestError as e:
+            raise Exception(f"API error: {e}")
+        except Exception as e:
+            raise Exception(f"Failed to generate response: {e}")
+        
+        parts: List[str] = []
+        usage = None
+        for event in stream:
+            if event.choices:
+                delta = event.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+            if getattr(event, "usage", None):
+                usage = event.usage
+        
+        response_text = "".join(parts).strip()
+        cached_tokens = 0
+        if usage:
+            input_tokens = usage.prompt_tokens
+            output_tokens = usage.completion_tokens
+            details = getattr(usage, "prompt_tokens_details", None)
+            cached_tokens = getattr(details, "cached_tokens", 0) or 0
+        else:
+            # Fallback: estimate tokens
+            input_tokens = sum(_estimate_tokens(message["content"]) for message in messages)
+            output_tokens = _estimate_tokens(response_text)
+        
+        self.last_result = self._build_result(answer_key, chunks, sources, response_text, input_tokens, cached_tokens, output_tokens)
+
+    async def achat(self, query: str, max_chunks: int = 10) -> Dict[str, Any]:
+        """
+        Async version of chat(): the query embedding and completion calls don't block the event loop.
+        
+        Each event loop gets its own async clients, so achat can be driven from successive
+        asyncio.run calls; call aclose() before a loop ends to release its connections.
+        
+        Args:
+            query: User's question
+            max_chunks: Maximum number of chunks to use for context
+        
+        Returns:
+            Dictionary with response, chunks used, sources, and token usage
+        """
+        answer_key, cached = self._cached_answer(query, max_chunks)
+        if cached is not None:
+            return cached
+        
+        if self.verbose:
+            print(f"  Step 1: Retrieving relevant chunks for query...")
+        chunks = await self._aretrieve_chunks(query, max_chunks)
+        
+        if not chunks:
+            return self._no_chunks_result()
+        
+        context, sources = self._build_context(chunks)
+        
+        if self.verbose:
+            print("  Step 3: Generating response using LLM...")
+        response_text, input_tokens, cached_tokens, output_tokens = await self._agenerate_response(query, context)
+        
+        return self._build_result(answer_key, chunks, sources, response_text, input_tokens, cached_tokens, output_tokens)
+
+    async def chat_batch(self, queries: List[str], max_chunks: int = 10, concurrency: int = 8) -> List[Dict[str, Any]]:
+        """
+        Answer many queries concurrently.
+        
+        Args:
+            queries: User questions
+            max_chunks: Maximum number of chunks to use for context per query
+            concurrency: Maximum number of queries in flight at once
+        
+        Returns:
+            One result dictionary per query, in input order
+        """
+        sem = asyncio.Semaphore(concurrency)
+
+        async def answer(query: str) -> Dict[str, Any]:
+            async with sem:
+                return await self.achat(query, max_chunks)
+        
+        return await asyncio.gather(*[answer(query) for query in queries])
+
+    def chat_many(self, queries: List[str], max_chunks: int = 10) -> List[Dict[str, Any]]:
+        """
+        Answer several queries, embedding all of them in a single API call.
+        
+        Args:
+            queries: User questions
+            max_chunks: Maximum number of chunks to use for context per query
+            
+        Returns:
+            One result dictionary per query, in input order
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(queries)
+        answer_keys: List[Optional[tuple]] = [None] * len(queries)
+        pending: List[int] = []
+        for i, query in enumerate(queries):
+            answer_keys[i], results[i] = self._cached_answer(query, max_chunks)
+            if results[i] is None:
+                pending.append(i)
+        
+        retrieved = self._retrieve_many([queries[i] for i in pending], max_chunks)
+        for i, chunks in zip(pending, retrieved):
+            if not chunks:
+                results[i] = self._no_chunks_result()
+                continue
+            context, sources = self._build_context(chunks)
+            response_text, input_tokens, cached_tokens, output_tokens = self._generate_response(queries[i], context)
+            results[i] = self._build_result(answer_keys[i], chunks, sources, response_text, input_tokens, cached_tokens, output_tokens)
+        
+        return results
+
+    def build_batch_jsonl(self, queries: List[str], out_path: str, max_chunks: int = 10) -> List[List[Dict[str, Any]]]:
+        """
+        Write a Batch API input file with one grounded chat completion request per query.
+        
+        Retrieval runs now (with all query embeddings in one API call); only the
+        completions are deferred to the batch. Request custom_ids are "q<index>".
+        
+        Args:
+            queries: User questions
+            out_path: Path of the JSONL file to write
+            max_chunks: Maximum number of chunks to use for context per query
+        
+        Returns:
+            Retrieved chunks per query, in input order (empty for queries with no relevant chunks)
+        """
+        retrieved = self._retrieve_many(queries, max_chunks)
+        dumps = orjson.dumps if ORJSON_AVAILABLE else (lambda obj: json.dumps(obj).encode("utf-8"))
+        with open(out_path, "wb") as f:
+            for i, (query, chunks) in enumerate(zip(queries, retrieved)):
+                if not chunks:
+                    continue
+                context, _ = self._build_context(chunks)
+                request = {
+                    "custom_id": f"q{i}",
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": self.model,
+                        "messages": self._build_messages(query, context),
+                        "prompt_cache_key": f"pod2chat:{self.video_url}",
+                    },
+                }
+                f.write(dumps(request) + b"\n")
+        return retrieved
+
+    def submit_batch(self, jsonl_path: str) -> str:
+        """
+        Upload a file written by build_batch_jsonl and start a Batch API job.
+        
+        Args:
+            jsonl_path: Path of the batch input file
+        
+        Returns:
+            The batch ID
+        """
+        with open(jsonl_path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        if self.verbose:
+            print(f"  ✓ Submitted batch {batch.id}")
+        return batch.id
+
+    def retrieve_batch(self, batch_id: str) -> Optional[Dict[int, Dict[str, Any]]]:
+        """
+        Fetch the answers of a finished batch job.
+        
+        Args:
+            batch_id: ID returned by submit_batch
+        
+        Returns:
+            Mapping of query index to result (response, token usage and batch-priced cost),
+            or None if the batch has not finished yet
+        """
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status != "completed":
             if self.verbose:
-                print("  ✗ No relevant chunks found")
-            return {
-                "response": "I couldn't find relevant information in the transcript to answer your question.",
-                "chunks_used": [],
-                "sources": [],
-                "input_tokens": 0,
-                "output_tokens": 0,
-                "input_cost": 0.0,
-                "output_cost": 0.0,
-                "total_cost": 0.0,
+                print(f"  Batch {batch_id} is {batch.status}")
+            return None
+        if not batch.output_file_id:
+            return {}
+        
+        results: Dict[int, Dict[str, Any]] = {}
+        loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+        for line in self.client.files.content(batch.output_file_id).content.splitlines():
+            if not line.strip():
+                continue
+            item = loads(line)
+            response = item.get("response") or {}
+            if item.get("error") or response.get("status_code") != 200:
+                if self.verbose:
+                    print(f"  Warning: batch request {item.get('custom_id')} failed: {item.get('error') or response.get('status_code')}")
+                continue
+            body = response["body"]
+            usage = body.get("usage") or {}
+            input_tokens = usage.get("prompt_tokens", 0)
+            cached_tokens = (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0) or 0
+            output_tokens = usage.get("completion_tokens", 0)
+            input_cost, output_cost = self._token_costs(input_tokens, cached_tokens, output_tokens)
+            results[int(item["custom_id"][1:])] = {
+                "response": body["choices"][0]["message"]["content"].strip(),
+                "input_tokens": input_tokens,
+                "cached_tokens": cached_tokens,
+                "output_tokens": output_tokens,
+                "input_cost": input_cost * BATCH_DISCOUNT,
+                "output_cost": output_cost * BATCH_DISCOUNT,
+                "total_cost": (input_cost + output_cost) * BATCH_DISCOUNT,
             }
+        return results
+
+    def _cached_answer(self, query: str, max_chunks: int) -> tuple[Optional[tuple], Optional[Dict[str, Any]]]:
+        """
+        Look up a previous answer for the query.
         
+        Returns:
+            Tuple of (cache key, cached result); the key is None for queries that are never cached
+        """
+        # Slash-prefixed input is reserved for commands and never answered from cache
+        if query.startswith("/"):
+            return None, None
+        # The model is part of the key so switching models never serves a stale answer
+        answer_key = (self.model,) + self._cache_key(query, max_chunks)
+        cached = self._answer_cache.get(answer_key)
+        if cached is not None and self.verbose:
+            print("  ✓ Answered from cache")
+        return answer_key, cached
+
+    def _cache_key(self, query: str, max_chunks: int) -> tuple:
+        """Cache key for a query: case and runs of whitespace don't change the answer."""
+        return (self.video_url, " ".join(query.lower().split()), max_chunks)
+
+    def _no_chunks_result(self) -> Dict[str, Any]:
+        """Result returned when retrieval finds nothing to answer from."""
         if self.verbose:
-            print(f"  ✓ Retrieved {len(chunks)} relevant chunks")
+            print("  ✗ No relevant chunks found")
+        return {
+            "response": "I couldn't find relevant information in the transcript to answer your question.",
+            "chunks_used": [],
+            "sources": [],
+            "input_tokens": 0,
+            "cached_tokens": 0,
+            "output_tokens": 0,
+            "input_cost": 0.0,
+            "output_cost": 0.0,
+            "total_cost": 0.0,
+        }
+
+    def _build_context(self, chunks: List[Dict[str, Any]]) -> tuple[str, List[str]]:
+        """
+        Format retrieved chunks into the prompt context.
         
-        # Format context
+        Returns:
+            Tuple of (context, sources), where sources are the chunk start timestamps in retrieval order
+        """
         if self.verbose:
+            print(f"  ✓ Retrieved {len(chunks)} relevant chunks")
             print("  Step 2: Formatting context from chunks...")
-        context = self._format_context(chunks)
+        # Each start timestamp is formatted once and shared by the context and the sources
+        ts = format_ts
+        sources = [ts(chunk["start"]) for chunk in chunks]
+        # Chronological order keeps the prompt prefix stable when follow-up questions
+        # retrieve overlapping chunks, so OpenAI's automatic prompt caching can reuse it
+        order = sorted(range(len(chunks)), key=lambda i: chunks[i]["start"])
+        context = self._format_context([chunks[i] for i in order], [sources[i] for i in order])
         if self.verbose:
             context_length = len(context)
             print(f"  ✓ Formatted context ({context_length:,} characters)")
-        
-        # Generate response
-        if self.verbose:
-            print("  Step 3: Generating response using LLM...")
-        response_text, input_tokens, output_tokens = self._generate_response(query, context)
+        return context, sources
+
+    def _build_result(
+        self,
+        answer_key: Optional[tuple],
+        chunks: List[Dict[str, Any]],
+        sources: List[str],
+        response_text: str,
+        input_tokens: int,
+        cached_tokens: int,
+        output_tokens: int,
+    ) -> Dict[str, Any]:
+        """Assemble (and cache) the chat result with sources and costs."""
         if self.verbose:
-            print(f"  ✓ Response generated ({input_tokens:,} input, {output_tokens:,} output tokens)")
+            print(f"  ✓ Response generated ({input_tokens:,} input ({cached_tokens:,} cached), {output_tokens:,} output tokens)")
         
         # Calculate costs
-        input_cost = (input_tokens / 1_000_000) * 0.05
-        output_cost = (output_tokens / 1_000_000) * 0.40
+        input_cost, output_cost = self._token_costs(input_tokens, cached_tokens, output_tokens)
         total_cost = input_cost + output_cost
         
-        # Extract sources (timestamps)
-        sources = [format_ts(chunk["start"]) for chunk in chunks]
-        
-        return {
+        result = {
             "response": response_text,
             "chunks_used": chunks,
             "sources": sources,
             "input_tokens": input_tokens,
+            "cached_tokens": cached_tokens,
             "output_tokens": output_tokens,
             "input_cost": input_cost,
             "output_cost": output_cost,
             "total_cost": total_cost,
         }
+        if answer_key is not None:
+            self._answer_cache.set(answer_key, result)
+        return result
+
+    def _token_costs(self, input_tokens: int, cached_tokens: int, output_tokens: int) -> tuple[float, float]:
+        """Return (input_cost, output_cost) in dollars for a completion's token usage."""
+        input_cost = (
+            ((input_tokens - cached_tokens) / 1_000_000) * INPUT_COST_PER_M
+            + (cached_tokens / 1_000_000) * CACHED_INPUT_COST_PER_M
+        )
+        output_cost = (output_tokens / 1_000_000) * OUTPUT_COST_PER_M
+        return input_cost, output_cost
+
+    def _retrieve_many(self, queries: List[str], max_chunks: int) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve chunks for several queries, embedding all uncached queries in a single API call.
+        
+        Returns:
+            Retrieved chunks per query, in input order
+        """
+        retrieved: List[Optional[List[Dict[str, Any]]]] = [None] * len(queries)
+        to_embed: List[int] = []
+        for i, query in enumerate(queries):
+            retrieved[i] = self._cached_retrieval(query, max_chunks)
+            if retrieved[i] is None:
+                to_embed.append(i)
+        
+        if to_embed:
+            if self.verbose:
+                print(f"  Embedding {len(to_embed)} queries in one request...")
+            embeddings = self.embedder.embed_texts([" ".join(queries[i].split()) for i in to_embed])
+            for i, query_embedding in zip(to_embed, embeddings):
+                retrieved[i] = self._retrieve_with_embedding(queries[i], query_embedding, max_chunks)
+        return retrieved
 
     def _retrieve_chunks(self, query: str, max_chunks: int) -> List[Dict[str, Any]]:
         """
@@ -119,29 +568,71 @@ class RAGChat:
         Args:
             query: User's query
             max_chunks: Maximum number of chunks to return
-            
+        
         Returns:
             List of relevant chunks
         """
+        cached = self._cached_retrieval(query, max_chunks)
+        if cached is not None:
+            return cached
+        
         # Embed query
         if self.verbose:
             print(f"    Embedding query: '{query[:50]}{'...' if len(query) > 50 else ''}'")
-        query_embedding = self.embedder.embed_text(query)
+        # Whitespace-normalized text so trivially different queries share a cached embedding
+        query_embedding = self.embedder.embed_text(" ".join(query.split()))
+        return self._retrieve_with_embedding(query, query_embedding, max_chunks)
+
+    async def _aretrieve_chunks(self, query: str, max_chunks: int) -> List[Dict[str, Any]]:
+        """Async version of _retrieve_chunks (only the query embedding call is awaited)."""
+        cached = self._cached_retrieval(query, max_chunks)
+        if cached is not None:
+            return cached
+        
+        if self.verbose:
+            print(f"    Embedding query: '{query[:50]}{'...' if len(query) > 50 else ''}'")
+        query_embedding = await self.embedder.aembed_text(" ".join(query.split()))
+        return self._retrieve_with_embedding(query, query_embedding, max_chunks)
+
+    def _cached_retrieval(self, query: str, max_chunks: int) -> Optional[List[Dict[str, Any]]]:
+        """Look up previously retrieved chunks for the query."""
+        cached = self._retrieval_cache.get(self._cache_key(query, max_chunks))
+        if cached is not None and self.verbose:
+            print(f"    ✓ Using cached retrieval ({len(cached)} chunks)")
+        return cached
+
+    def _retrieve_with_embedding(self, query: str, query_embedding: np.ndarray, max_chunks: int) -> List[Dict[str, Any]]:
+        """
+        Search and re-rank chunks for an already embedded query.
+        
+        Args:
+            query: User's query (used for keyword re-ranking)
+            query_embedding: Embedding of the query
+            max_chunks: Maximum number of chunks to return
+        
+        Returns:
+            List of relevant chunks
+        """
         if self.verbose:
             print(f"    ✓ Query embedded ({len(query_embedding)} dimensions)")
         
-        # Step 1: Retrieve top chunks using cosine similarity (get more than needed for re-ranking)
+        # Step 1: Retrieve top chunks using cosine similarity (get more than needed for re-ranking).
+        # Coarse chunks are scored first; only fine chunks inside the best coarse windows are scored.
+        pool_size = self.rerank_pool_size or 3 * max_chunks
         if self.verbose:
-            print(f"    Searching vector store for similar chunks (top 30 candidates)...")
-        similar_chunks = self.store.search_similar(
-            query_embedding, 
-            video_url=self.video_url, 
-            limit=30  # Get top 30 for re-ranking
+            print(f"    Searching vector store for similar chunks (top {pool_size} candidates)...")
+        similar_chunks = self.store.search_two_tier(
+            query_embedding,
+            video_url=self.video_url,
+            coarse_limit=8,
+            limit=pool_size
         )
         
         if not similar_chunks:
             if self.verbose:
                 print("    ✗ No similar chunks found in vector store")
+            # Cache the empty verdict too, so repeated off-topic queries skip embedding and search
+            self._retrieval_cache.set(self._cache_key(query, max_chunks), [])
             return []
         
         if self.verbose:
@@ -159,79 +650,131 @@ class RAGChat:
         if self.verbose:
             print(f"    ✓ Re-ranked to {len(reranked_chunks)} chunks")
         
+        self._retrieval_cache.set(self._cache_key(query, max_chunks), reranked_chunks)
         return reranked_chunks
 
-    def _format_context(self, chunks: List[Dict[str, Any]]) -> str:
+    def _format_context(self, chunks: List[Dict[str, Any]], starts: Optional[List[str]] = None) -> str:
         """
         Format chunks as context for LLM.
         
         Args:
-            chunks: List of chunk dictionaries
-            
+            chunks: List of chunk dictionaries, in chronological order
+            starts: Already formatted start timestamps for the chunks (optional)
+        
         Returns:
             Formatted context string
         """
-        context_parts = []
-        for i, chunk in enumerate(chunks):
-            start_ts = format_ts(chunk["start"])
-            end_ts = format_ts(chunk["end"])
-            text = chunk["text"]
-            context_parts.append(f"[{start_ts}-{end_ts}] {text}")
-            if self.verbose:
-                print(f"      Chunk {i+1}: [{start_ts}-{end_ts}] ({len(text)} chars)")
+        fmt, ts = "[{}-{}] {}".format, format_ts
+        if starts is None:
+            starts = [ts(c["start"]) for c in chunks]
+        if self.verbose:
+            print("\n".join(
+                f"      Chunk {i+1}: [{start}-{ts(c['end'])}] ({len(c['text'])} chars)"
+                for i, (start, c) in enumerate(zip(starts, chunks))
+            ))
+        
+        # Chunks that overlap or touch in time are merged into one block so the shared
+        # transcript text (fine chunks overlap by ~20%) is only sent once
+        blocks: List[list] = []  # [formatted start, end seconds, text]
+        for start, c in zip(starts, chunks):
+            text = _WHITESPACE_RE.sub(" ", c["text"]).strip()
+            if blocks and c["start"] <= blocks[-1][1]:
+                block = blocks[-1]
+                block[1] = max(block[1], c["end"])
+                block[2] = _append_overlapping(block[2], text)
+            else:
+                blocks.append([start, c["end"], text])
         
-        return "\n\n".join(context_parts)
+        return "\n\n".join(fmt(start, ts(end), text) for start, end, text in blocks)
 
-    def _generate_response(self, query: str, context: str) -> tuple[str, int, int]:
+    def _generate_response(self, query: str, context: str) -> tuple[str, int, int, int]:
         """
         Generate LLM response with strict grounding.
         
         Args:
             query: User's question
             context: Formatted context from retrieved chunks
-            
+        
         Returns:
-            Tuple of (response_text, input_tokens, output_tokens)
+            Tuple of (response_text, input_tokens, cached_input_tokens, output_tokens)
         """
-        system_message = RAG_CHAT_SYSTEM_MESSAGE
-        user_message = RAG_CHAT_USER_MESSAGE_TEMPLATE.format(context=context, query=query)
-
-        messages = [
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": user_message},
-        ]
-        
-        if self.verbose:
-            prompt_tokens_est = len(system_message.split()) + len(user_message.split())
-            print(f"    Sending request to {self.model} (estimated {prompt_tokens_est:,} prompt tokens)...")
-        
+        messages = self._build_messages(query, context)
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=messages,
+                # Route this video's requests to the same prompt cache (sent raw for older SDKs)
+                extra_body={"prompt_cache_key": f"pod2chat:{self.video_url}"},
             )
-            
-            response_text = response.choices[0].message.content.strip()
-            
-            # Extract token usage
-            if hasattr(response, 'usage') and response.usage:
-                input_tokens = response.usage.prompt_tokens
-                output_tokens = response.usage.completion_tokens
-            else:
-                # Fallback: estimate tokens
-                input_tokens = len(system_message.split()) + len(user_message.split())
-                output_tokens = len(response_text.split())
-            
-            if self.verbose:
-                print(f"    ✓ Received response ({len(response_text)} characters)")
-            
-            return response_text, input_tokens, output_tokens
-            
+            return self._parse_response(response, messages)
+        except BadRequestError as e:
+            raise Exception(f"API error: {e}")
+        except Exception as e:
+            raise Exception(f"Failed to generate response: {e}")
+
+    async def _agenerate_response(self, query: str, context: str) -> tuple[str, int, int, int]:
+        """Async version of _generate_response, using the AsyncOpenAI client."""
+        messages = self._build_messages(query, context)
+        try:
+            response = await self.aclient.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                extra_body={"prompt_cache_key": f"pod2chat:{self.video_url}"},
+            )
+            return self._parse_response(response, messages)
         except BadRequestError as e:
             raise Exception(f"API error: {e}")
         except Exception as e:
             raise Exception(f"Failed to generate response: {e}")
 
+    def _build_messages(self, query: str, context: str) -> List[Dict[str, str]]:
+        """Build the grounded chat messages for a query and its context."""
+        system_message = RAG_CHAT_SYSTEM_MESSAGE
+        user_message = "".join((_USER_PREFIX, context, _USER_MIDDLE, query, _USER_SUFFIX))
+        
+        messages = [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": user_message},
+        ]
+        
+        if self.verbose:
+            prompt_tokens_est = _estimate_tokens(system_message) + _estimate_tokens(user_message)
+            print(f"    Sending request to {self.model} (estimated {prompt_tokens_est:,} prompt tokens)...")
+        return messages
+
+    def _parse_response(self, response: Any, messages: List[Dict[str, str]]) -> tuple[str, int, int, int]:
+        """
+        Extract the reply text and token usage from a chat completion.
+        
+        Returns:
+            Tuple of (response_text, input_tokens, cached_input_tokens, output_tokens)
+        """
+        response_text = response.choices[0].message.content.strip()
+        
+        # Extract token usage
+        cached_tokens = 0
+        if hasattr(response, 'usage') and response.usage:
+            input_tokens = response.usage.prompt_tokens
+            output_tokens = response.usage.completion_tokens
+            details = getattr(response.usage, 'prompt_tokens_details', None)
+            cached_tokens = getattr(details, 'cached_tokens', 0) or 0
+        else:
+            # Fallback: estimate tokens
+            input_tokens = sum(_estimate_tokens(message["content"]) for message in messages)
+            output_tokens = _estimate_tokens(response_text)
+        
+        if self.verbose:
+            print(f"    ✓ Received response ({len(response_text)} characters)")
+        
+        return response_text, input_tokens, cached_tokens, output_tokens
+
+    async def aclose(self) -> None:
+        """Close the async clients opened in the running event loop."""
+        client = self._aclients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+        await self.embedder.aclose()
+
     def close(self) -> None:
         """Close database connection."""
         if self.store:
@@ -0,0 +1,114 @@
+"""
+Proactive token-bucket rate limiting for OpenAI API calls.
+
+Tracks requests-per-minute and tokens-per-minute budgets that refill at
+wall-clock rate, so calls wait for capacity up front instead of hitting 429s.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+
+class RateLimiter:
+    """Token bucket over both request count (RPM) and token count (TPM)."""
+
+    def __init__(self, rpm: int, tpm: int):
+        """
+        Initialize limiter with full buckets.
+
+        Args:
+            rpm: Maximum requests per minute
+            tpm: Maximum tokens per minute
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self.req_bucket = float(rpm)
+        self.tok_bucket = float(tpm)
+        self.ts = time.monotonic()
+        # Synchronous callers may share one limiter across worker threads
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """Refill both buckets in proportion to the time elapsed since the last call."""
+        now = time.monotonic()
+        dt = now - self.ts
+        self.ts = now
+        self.req_bucket = min(self.rpm, self.req_bucket + self.rpm * (dt / 60))
+        self.tok_bucket = min(self.tpm, self.tok_bucket + self.tpm * (dt / 60))
+
+    def _reserve(self, tokens: int) -> float:
+        """
+        Take capacity for one request if available.
+
+        Args:
+            tokens: Estimated tokens for the request
+
+        Returns:
+            0.0 if capacity was taken, otherwise seconds to wait before trying again
+        """
+        with self._lock:
+            return self._reserve_locked(tokens)
+
+    def _reserve_locked(self, tokens: int) -> float:
+        """Body of _reserve; caller holds the lock."""
+        self._refill()
+        # A request larger than the whole bucket can never fit; cap it so it waits for a full bucket
+        tokens = min(tokens, self.tpm)
+
+        if self.req_bucket >= 1 and self.tok_bucket >= tokens:
+            self.req_bucket -= 1
+            self.tok_bucket -= tokens
+            return 0.0
+
+        req_wait = (1 - self.req_bucket) * 60 / self.rpm if self.req_bucket < 1 else 0.0
+        tok_wait = (tokens - self.tok_bucket) * 60 / self.tpm if self.tok_bucket < tokens else 0.0
+        return max(req_wait, tok_wait)
+
+    async def await_capacity(self, tokens: int) -> None:
+        """
+        Wait (without blocking the event loop) until the request fits in both buckets.
+
+        Args:
+            tokens: Estimated tokens for the upcoming request
+        """
+        while True:
+            wait_time = self._reserve(tokens)
+            if wait_time <= 0:
+                return
+            await asyncio.sleep(wait_time)
+
+    def wait_for_capacity(self, tokens: int) -> float:
+        """
+        Block the calling thread until the request fits in both buckets.
+
+        Args:
+            tokens: Estimated tokens for the upcoming request
+
+        Returns:
+            Total seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            wait_time = self._reserve(tokens)
+            if wait_time <= 0:
+                return waited
+            time.sleep(wait_time)
+            waited += wait_time
+
+    def consume(self, tokens: int) -> None:
+        """
+        Charge tokens used beyond what was reserved (e.g. completion tokens).
+
+        The token bucket may go negative; later requests then wait for it to refill.
+
+        Args:
+            tokens: Additional tokens to take from the TPM budget
+        """
+        if tokens <= 0:
+            return
+        with self._lock:
+            self._refill()
+            self.tok_bucket -= tokens
@@ -7,19 +7,24 @@ All summaries include timestamps and are verified against the transcript.
 
 from __future__ import annotations
 
+import bisect
+import functools
+import hashlib
 import json
 import os
+import re
+import sqlite3
+import threading
 import time
-import math
-from collections import deque
-from typing import List, Dict, Any, Optional, Tuple
-from openai import OpenAI
+from itertools import accumulate, islice
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Optional, Tuple
+import numpy as np
 from openai import BadRequestError
 from chunk import format_ts, simple_token_count
-from embedder import Embedder
+from embedder import Embedder, get_client
+from rate_limiter import RateLimiter
 from prompts import (
-    TOPIC_EXTRACTION_SYSTEM_MESSAGE,
-    TOPIC_EXTRACTION_BASE_PROMPT,
     EXECUTIVE_SYNOPSIS_SYSTEM_MESSAGE,
     EXECUTIVE_SYNOPSIS_BASE_PROMPT,
     DEEP_DIVE_SYSTEM_MESSAGE,
@@ -30,6 +35,8 @@ from prompts import (
     HIERARCHICAL_MERGE_BASE_PROMPT,
     TOPIC_STREAM_SYSTEM_MESSAGE,
     TOPIC_STREAM_PROMPT,
+    BATCH_CHAT_SYSTEM_SUFFIX,
+    BATCH_CHAT_PROMPT_TEMPLATE,
 )
 
 # Try to import tiktoken for accurate token counting
@@ -39,11 +46,92 @@ try:
 except ImportError:
     TIKTOKEN_AVAILABLE = False
 
+# Try to import orjson for faster parsing of the model's JSON replies
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+
+# Texts up to this length (chunk texts, base prompts) have their token counts memoized;
+# longer ones are whole assembled prompts that are rarely counted twice
+TOKEN_COUNT_CACHE_MAX_CHARS = 20_000
+
+
+@functools.lru_cache(maxsize=8192)
+def _cached_token_count(encoding_name: Optional[str], text: str) -> int:
+    """Token count of text under a tiktoken encoding (None = word-based approximation), memoized across passes."""
+    if encoding_name is None:
+        return simple_token_count(text)
+    return len(tiktoken.get_encoding(encoding_name).encode(text))
+
+
+# Above this many sections, selective merge avoids building the full pairwise similarity matrix
+DEDUP_FULL_MATRIX_MAX = 2048
+
+# Batch requests of one batched summary that may be in flight at once
+MAX_PARALLEL_BATCHES = 5
+
+# Deep-dive topics written concurrently (each may fan out into its own batches)
+MAX_PARALLEL_TOPICS = 4
+
+# Deep-dive topics whose prompts fit together under this many tokens share one request (saves RPM)
+DEEP_DIVE_PACK_MAX_TOKENS = 24_000
+
+# Coarse chunks classified concurrently by streaming topic extraction (decisions are still applied in order)
+TOPIC_CLASSIFY_CONCURRENCY = 8
+
+# Per-request bounds so one hung connection or runaway generation can't stall a summary.
+# gpt-5 models count reasoning tokens against max_completion_tokens, so the caps are generous.
+REQUEST_TIMEOUT_SECONDS = 180
+REQUEST_MAX_RETRIES = 3
+TOPIC_CLASSIFY_MAX_COMPLETION_TOKENS = 2_000
+SECTION_MAX_COMPLETION_TOKENS = 16_000
+
+# Persistent cache of chat completions keyed on (model, exact messages)
+DEFAULT_COMPLETION_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "pod2chat", "completions.sqlite")
+# Cached completions older than this are ignored and pruned (prompts and models drift)
+COMPLETION_CACHE_TTL_SECONDS = 30 * 24 * 3600
+
+# Any of these (as substrings, case-insensitive) marks a coarse chunk as a framework candidate;
+# one compiled alternation scans each chunk once without lowercasing a copy
+FRAMEWORK_KEYWORDS = ["step", "framework", "checklist", "process", "method", "how to", "first", "second", "third"]
+_FRAMEWORK_KEYWORD_RE = re.compile("|".join(map(re.escape, FRAMEWORK_KEYWORDS)), re.IGNORECASE)
+
+# Deep dive section used when a topic's generation fails
+_DEEP_DIVE_FALLBACK_TEMPLATE = """### {topic}
+
+**Key Claims + Reasoning:**
+- [{ts}] {text}...
+
+**Examples/Stories:**
+- (Content extraction failed)
+
+**Counterpoints / Nuance:**
+- (Content extraction failed)
+
+**Practical Takeaways:**
+- (Content extraction failed)"""
+
+# [HH:MM:SS] timestamp references in generated sections
+_TIMESTAMP_RE = re.compile(r"\[(\d{2}):(\d{2}):(\d{2})\]")
+
+# Leading ```lang / trailing ``` fence around a model reply
+_CODE_FENCE_RE = re.compile(r"^```[a-zA-Z]*\n?|\n?```$")
+
 
 class Summariser:
     """Multi-pass summarisation engine with OpenAI API."""
 
-    def __init__(self, api_key: Optional[str] = None, verbose: bool = False):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        verbose: bool = False,
+        cache_path: Optional[str] = DEFAULT_COMPLETION_CACHE_PATH,
+    ):
         """
         Initialize summarizer with OpenAI API key.
         If not provided, will try to get from OPENAI_API_KEY environment variable.
@@ -51,6 +139,7 @@ class Summariser:
         Args:
             api_key: OpenAI API key (optional)
             verbose: Enable verbose output for debugging
+            cache_path: Path to the SQLite completion cache (None disables caching)
         """
         api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not api_key:
@@ -58,31 +147,52 @@ class Summariser:
                 "OpenAI API key required. Set OPENAI_API_KEY environment variable "
                 "or pass api_key parameter."
             )
-        self.client = OpenAI(api_key=api_key)
+        self._api_key = api_key
+        self.client = get_client(api_key).with_options(timeout=REQUEST_TIMEOUT_SECONDS, max_retries=REQUEST_MAX_RETRIES)
         self.model = "gpt-5-nano"  # Cost-effective model
         self.verbose = verbose
+        self._context_limit: Optional[int] = None
+        # (raw_segments, length, sorted start times) for timestamp verification
+        self._segment_starts: Optional[Tuple[List[Dict[str, Any]], int, List[float]]] = None
+        # chunk_id -> (rendered prompt line, token cost) for the current summary; kept off the
+        # chunk dicts, which the embedding thread is updating at the same time
+        self._prepared: Dict[str, Tuple[str, int]] = {}
         self._tokenizer = None
         if TIKTOKEN_AVAILABLE:
             try:
-                # gpt-5-nano uses the same encoding as gpt-4
-                self._tokenizer = tiktoken.encoding_for_model("gpt-4")
+                # Count with the model's own BPE so budgets match what the API bills
+                self._tokenizer = tiktoken.encoding_for_model(self.model)
+            except KeyError:
+                # Older tiktoken releases don't know this model; fall back to the gpt-4 encoding
+                try:
+                    self._tokenizer = tiktoken.encoding_for_model("gpt-4")
+                except Exception:
+                    self._tokenizer = None
             except Exception:
                 self._tokenizer = None
         
         # Rate limiting: 200,000 TPM, 500 RPM (use 95% safety margin)
-        self._max_tpm = 190_000  # 95% of 200,000
-        self._max_rpm = 475  # 95% of 500
-        self._window_seconds = 60
-        # Store (timestamp, tokens) tuples for sliding window
-        self._token_history: deque = deque()
-        self._request_history: deque = deque()
+        self._limiter = RateLimiter(rpm=475, tpm=190_000)
+        # Summary passes run on worker threads and share the usage counters (the limiter has its own lock)
+        self._usage_lock = threading.Lock()
         
         # Token usage tracking for cost calculation
         self._total_input_tokens = 0
         self._total_output_tokens = 0
+        
+        # Re-summarising the same video sends identical prompts; serve those from disk
+        self._cache_lock = threading.Lock()
+        self._cache = self._open_cache(cache_path) if cache_path else None
+        
+        # Embedders for selective merge, one per worker thread (an Embedder's SQLite cache is thread-bound)
+        self._embedders = threading.local()
 
     def generate_summary(
-        self, chunks: Dict[str, List[Dict[str, Any]]], metadata: Dict[str, Any], raw_segments: List[Dict[str, Any]]
+        self,
+        chunks: Dict[str, List[Dict[str, Any]]],
+        metadata: Dict[str, Any],
+        raw_segments: List[Dict[str, Any]],
+        wait_for_embeddings: Optional[Callable[[], Any]] = None,
     ) -> str:
         """
         Main orchestrator for multi-pass summary generation.
@@ -91,6 +201,9 @@ class Summariser:
             chunks: Dictionary with 'fine' and 'coarse' chunk lists
             metadata: Video metadata (title, channel, duration, url)
             raw_segments: Original transcript segments
+            wait_for_embeddings: Optional callable that blocks until chunk embeddings being
+                generated concurrently are attached; called before any pass that may
+                select chunks by embedding (topic extraction doesn't wait for it)
             
         Returns:
             Complete markdown summary as string
@@ -101,51 +214,68 @@ class Summariser:
         
         coarse_chunks = chunks.get("coarse", [])
         fine_chunks = chunks.get("fine", [])
+        self._prepare_chunks(coarse_chunks + fine_chunks)
+
+        def after_embeddings(build: Callable[..., str], *args: Any) -> str:
+            # Later passes may select chunks by embedding, so they must be in place first
+            if wait_for_embeddings is not None:
+                wait_for_embeddings()
+            return build(*args)
+
+        # The executive synopsis and framework extraction don't depend on the topics,
+        # so they run on worker threads while topics are extracted and the deep dive is written
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            # Pass 2 (executive synopsis) and framework extraction
+            print("  Pass 2: Generating executive synopsis and extracting frameworks (in parallel)...")
+            if self.verbose:
+                print(f"    Generating synopsis from {len(coarse_chunks)} coarse chunks...")
+                print("    Searching for actionable frameworks and checklists...")
+            synopsis_future = pool.submit(after_embeddings, self._build_executive_synopsis, coarse_chunks, raw_segments)
+            frameworks_future = pool.submit(after_embeddings, self._build_frameworks, coarse_chunks, fine_chunks, raw_segments)
 
-        # Pass 1: Extract topics from coarse chunks
-        print("  Pass 1: Extracting topics...")
-        if self.verbose:
-            print(f"    Analyzing {len(coarse_chunks)} coarse chunks for topic extraction...")
-        topics, chunk_to_topic = self._extract_topics(coarse_chunks, metadata)
-        if self.verbose:
-            print(f"    ✓ Extracted {len(topics)} topics: {', '.join(topics[:5])}{'...' if len(topics) > 5 else ''}")
-
-        # Build markdown sections
-        markdown_parts = []
+            # Pass 1: Extract topics from coarse chunks
+            print("  Pass 1: Extracting topics...")
+            if self.verbose:
+                print(f"    Analyzing {len(coarse_chunks)} coarse chunks for topic extraction...")
+            topics, chunk_to_topic = self._extract_topics(coarse_chunks, metadata)
+            if self.verbose:
+                print(f"    ✓ Extracted {len(topics)} topics: {', '.join(topics[:5])}{'...' if len(topics) > 5 else ''}")
 
-        # Header
-        markdown_parts.append(self._build_header(metadata))
+            if wait_for_embeddings is not None:
+                if self.verbose:
+                    print("    Waiting for chunk embeddings...")
+                wait_for_embeddings()
 
-        # Executive Synopsis
-        print("  Pass 2: Generating executive synopsis...")
-        if self.verbose:
-            print(f"    Generating synopsis from {len(coarse_chunks)} coarse chunks...")
-        markdown_parts.append(self._build_executive_synopsis(coarse_chunks, raw_segments))
-        if self.verbose:
-            print("    ✓ Executive synopsis generated")
+            # Topic Map
+            if self.verbose:
+                print("  Building topic map...")
+            topic_map = self._build_topic_map(coarse_chunks, topics, chunk_to_topic)
+            if self.verbose:
+                print("    ✓ Topic map generated")
 
-        # Topic Map
-        if self.verbose:
-            print("  Building topic map...")
-        markdown_parts.append(self._build_topic_map(coarse_chunks, topics, chunk_to_topic))
-        if self.verbose:
-            print("    ✓ Topic map generated")
+            # Deep Dive
+            print("  Pass 3: Generating deep dive notes...")
+            if self.verbose:
+                print(f"    Processing {len(topics)} topics with {len(fine_chunks)} fine chunks...")
+            deep_dive = self._build_deep_dive(topics, coarse_chunks, chunk_to_topic, fine_chunks, raw_segments)
+            if self.verbose:
+                print("    ✓ Deep dive notes generated")
 
-        # Deep Dive
-        print("  Pass 3: Generating deep dive notes...")
-        if self.verbose:
-            print(f"    Processing {len(topics)} topics with {len(fine_chunks)} fine chunks...")
-        markdown_parts.append(self._build_deep_dive(topics, coarse_chunks, chunk_to_topic, fine_chunks, raw_segments))
-        if self.verbose:
-            print("    ✓ Deep dive notes generated")
+            synopsis = synopsis_future.result()
+            if self.verbose:
+                print("    ✓ Executive synopsis generated")
+            frameworks = frameworks_future.result()
+            if self.verbose:
+                print("    ✓ Framework extraction completed")
 
-        # Frameworks
-        print("  Extracting frameworks...")
-        if self.verbose:
-            print("    Searching for actionable frameworks and checklists...")
-        markdown_parts.append(self._build_frameworks(coarse_chunks, fine_chunks, raw_segments))
-        if self.verbose:
-            print("    ✓ Framework extraction completed")
+        # Build markdown sections
+        markdown_parts = [
+            self._build_header(metadata),
+            synopsis,
+            topic_map,
+            deep_dive,
+            frameworks,
+        ]
 
         # Quotes
         # if self.verbose:
@@ -190,24 +320,98 @@ class Summariser:
         Returns:
             Approximate token count
         """
-        if self._tokenizer is not None:
-            try:
+        encoding_name = self._tokenizer.name if self._tokenizer is not None else None
+        try:
+            # The same chunk texts are counted by chunk selection, fit checks and batch packing
+            if len(text) <= TOKEN_COUNT_CACHE_MAX_CHARS:
+                return _cached_token_count(encoding_name, text)
+            if self._tokenizer is not None:
                 return len(self._tokenizer.encode(text))
-            except Exception:
-                pass
+        except Exception:
+            pass
         
         # Fallback to word-based approximation (from chunk.py)
         return simple_token_count(text)
 
+    def _count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """
+        Count tokens for many texts in one tiktoken call (multi-threaded, outside the GIL).
+        
+        Args:
+            texts: Texts to count tokens for
+            
+        Returns:
+            Token count per text, in input order
+        """
+        if self._tokenizer is not None and len(texts) > 1:
+            try:
+                return [len(tokens) for tokens in self._tokenizer.encode_batch(texts, disallowed_special=())]
+            except Exception:
+                pass
+        return [self._count_tokens(text) for text in texts]
+
+    def _prepare_chunks(self, chunks: List[Dict[str, Any]]) -> None:
+        """
+        Render and count chunks once per summary, keyed by chunk_id.
+        
+        Every pass formats and counts the same chunks; the prepared entries let them
+        reuse that work instead of repeating it. The chunk dicts themselves are not touched.
+        
+        Args:
+            chunks: Chunk dictionaries to prepare
+        """
+        self._prepared = {}
+        token_counts = self._count_tokens_batch([chunk.get("text", "") for chunk in chunks])
+        for chunk, tokens in zip(chunks, token_counts):
+            chunk_id = chunk.get("chunk_id")
+            if chunk_id is None:
+                continue
+            rendered = f"[{format_ts(chunk['start'])}]-[{format_ts(chunk['end'])}] {chunk['text']}"
+            # Format overhead + text
+            self._prepared[chunk_id] = (rendered, 20 + tokens)
+
+    def _render_chunk(self, chunk: Dict[str, Any]) -> str:
+        """Prompt line for a chunk: "[HH:MM:SS]-[HH:MM:SS] text"."""
+        prepared = self._prepared.get(chunk.get("chunk_id"))
+        if prepared is not None:
+            return prepared[0]
+        return f"[{format_ts(chunk['start'])}]-[{format_ts(chunk['end'])}] {chunk['text']}"
+
+    def _chunk_token_costs(self, chunks: List[Dict[str, Any]]) -> List[int]:
+        """
+        Token cost of each chunk (format overhead + text), using prepared counts when present.
+        
+        Args:
+            chunks: Chunk dictionaries
+            
+        Returns:
+            Token cost per chunk, in input order
+        """
+        costs = []
+        for chunk in chunks:
+            prepared = self._prepared.get(chunk.get("chunk_id"))
+            costs.append(prepared[1] if prepared is not None else None)
+        missing = [i for i, cost in enumerate(costs) if cost is None]
+        if missing:
+            counts = self._count_tokens_batch([chunks[i].get("text", "") for i in missing])
+            for i, tokens in zip(missing, counts):
+                costs[i] = 20 + tokens
+        return costs
+
     def _count_message_tokens(self, messages: List[Dict[str, str]]) -> int:
         """
-        Count tokens in OpenAI message format (system + user + formatting overhead).
+        Estimate tokens in OpenAI message format (system + user + formatting overhead).
+        
+        Used for rate limiting only (billing uses the usage the API reports), so the
+        varying user content is estimated at ~4 characters per token instead of being
+        tokenized before every request; system messages are static and counted exactly
+        (memoized by _count_tokens).
         
         Args:
             messages: List of message dictionaries with 'role' and 'content'
             
         Returns:
-            Total token count including formatting overhead
+            Total token estimate including formatting overhead
         """
         total = 0
         
@@ -217,8 +421,11 @@ class Summariser:
         for message in messages:
             role = message.get("role", "")
             content = message.get("content", "")
-            # Role takes ~1-2 tokens, content uses normal counting
-            total += 2 + self._count_tokens(content)
+            # Role takes ~1-2 tokens
+            if role == "system":
+                total += 2 + self._count_tokens(content)
+            else:
+                total += 2 + len(content) // 4
         
         return total
 
@@ -236,15 +443,19 @@ class Summariser:
         total = self._count_tokens(base_prompt)
         
         # Add tokens for each chunk (text + formatting overhead)
-        for chunk in chunks:
-            chunk_text = chunk.get("text", "")
-            # Format: "[HH:MM:SS-HH:MM:SS] text" = ~20 tokens overhead + text tokens
-            total += 20 + self._count_tokens(chunk_text)
+        # Format: "[HH:MM:SS-HH:MM:SS] text" = ~20 tokens overhead + text tokens
+        total += sum(self._chunk_token_costs(chunks))
         
         return total
 
     def _get_model_context_limit(self) -> int:
-        """Return context window size for current model."""
+        """Return context window size for current model (computed once per instance)."""
+        if self._context_limit is None:
+            self._context_limit = self._compute_context_limit()
+        return self._context_limit
+
+    def _compute_context_limit(self) -> int:
+        """Look up the context window size for current model."""
         # gpt-5-nano has 400k context window
         if "gpt-5-nano" in self.model or "gpt-5" in self.model or "gpt-4" in self.model:
             return 400_000
@@ -269,28 +480,91 @@ class Summariser:
         Returns:
             List of chunks that fit within limit
         """
+        base_overhead = self._count_tokens(base_prompt) + 100  # Base + system overhead
         if max_input_tokens is None:
-            context_limit = self._get_model_context_limit()
             # Reserve: system message (100), base prompt, response buffer (8000)
-            base_tokens = self._count_tokens(base_prompt) + 100
             response_buffer = 8000
-            max_input_tokens = context_limit - base_tokens - response_buffer
+            max_input_tokens = self._get_model_context_limit() - base_overhead - response_buffer
+        
+        # Format overhead + text
+        chunk_tokens = self._chunk_token_costs(chunks)
+        
+        if base_overhead + sum(chunk_tokens) <= max_input_tokens:
+            return list(chunks)
+        
+        # Over budget: prefer a diverse subset across the whole video when embeddings are available
+        if chunks and all(chunk.get("embedding") is not None for chunk in chunks):
+            selected_idx = self._select_diverse_chunks(chunks, chunk_tokens, max_input_tokens - base_overhead)
+            return [chunks[i] for i in selected_idx]
         
+        # Otherwise keep chunks in order until the budget runs out
         selected = []
-        current_tokens = self._count_tokens(base_prompt) + 100  # Base + system overhead
+        current_tokens = base_overhead
         
-        for chunk in chunks:
-            chunk_text = chunk.get("text", "")
-            chunk_tokens = 20 + self._count_tokens(chunk_text)  # Format overhead + text
-            
-            if current_tokens + chunk_tokens > max_input_tokens:
+        for chunk, tokens in zip(chunks, chunk_tokens):
+            if current_tokens + tokens > max_input_tokens:
                 break
             
             selected.append(chunk)
-            current_tokens += chunk_tokens
+            current_tokens += tokens
         
         return selected
 
+    def _select_diverse_chunks(
+        self,
+        chunks: List[Dict[str, Any]],
+        chunk_tokens: List[int],
+        budget: int,
+        relevance_weight: float = 1.0,
+        redundancy_weight: float = 0.5,
+    ) -> List[int]:
+        """
+        Greedy redundancy-aware selection under a token budget.
+        
+        Each step picks the chunk maximising
+        relevance_weight * sim(chunk, centroid) - redundancy_weight * max sim(chunk, selected),
+        among chunks that still fit, so the selection covers the whole video rather than
+        just its opening.
+        
+        Args:
+            chunks: Chunks with an 'embedding' vector
+            chunk_tokens: Token cost of each chunk
+            budget: Tokens available for chunks
+            relevance_weight: Weight on similarity to the video centroid
+            redundancy_weight: Penalty on similarity to already selected chunks
+            
+        Returns:
+            Indices of selected chunks, in original (time) order
+        """
+        embeddings = np.stack([np.asarray(chunk["embedding"], dtype=np.float32) for chunk in chunks])
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.where(norms > 0, norms, 1.0)
+        
+        centroid = embeddings.mean(axis=0)
+        centroid_norm = np.linalg.norm(centroid)
+        if centroid_norm > 0:
+            centroid /= centroid_norm
+        relevance = relevance_weight * (embeddings @ centroid)
+        
+        costs = np.asarray(chunk_tokens)
+        redundancy = np.zeros(len(chunks), dtype=np.float32)
+        available = np.ones(len(chunks), dtype=bool)
+        selected = []
+        
+        while True:
+            candidates = available & (costs <= budget)
+            if not candidates.any():
+                break
+            gain = np.where(candidates, relevance - redundancy_weight * redundancy, -np.inf)
+            best = int(np.argmax(gain))
+            selected.append(best)
+            available[best] = False
+            budget -= int(costs[best])
+            # Track each chunk's highest similarity to anything selected so far
+            redundancy = np.maximum(redundancy, embeddings @ embeddings[best])
+        
+        return sorted(selected)
+
     def _can_fit_in_single_request(
         self, chunks: List[Dict[str, Any]], base_prompt: str, response_buffer: int = 8000
     ) -> bool:
@@ -315,32 +589,6 @@ class Summariser:
     # Rate Limiting
     # ----------------------------
 
-    def _clean_old_history(self, current_time: float) -> None:
-        """Remove entries older than window_seconds from history."""
-        cutoff_time = current_time - self._window_seconds
-        
-        # Clean token history
-        while self._token_history and self._token_history[0][0] < cutoff_time:
-            self._token_history.popleft()
-        
-        # Clean request history
-        while self._request_history and self._request_history[0] < cutoff_time:
-            self._request_history.popleft()
-
-    def _get_current_usage(self, current_time: float) -> tuple[int, int]:
-        """
-        Get current token and request usage in the sliding window.
-        
-        Returns:
-            (tokens_used, requests_count) in the last 60 seconds
-        """
-        self._clean_old_history(current_time)
-        
-        tokens_used = sum(tokens for _, tokens in self._token_history)
-        requests_count = len(self._request_history)
-        
-        return tokens_used, requests_count
-
     def _wait_if_needed(self, estimated_tokens: int) -> None:
         """
         Wait if necessary to respect rate limits before making a request.
@@ -348,45 +596,9 @@ class Summariser:
         Args:
             estimated_tokens: Estimated tokens for the upcoming request
         """
-        current_time = time.time()
-        tokens_used, requests_count = self._get_current_usage(current_time)
-        
-        # Calculate how many tokens/requests we'll have after this request
-        new_tokens = tokens_used + estimated_tokens
-        new_requests = requests_count + 1
-        
-        # Check if we'd exceed limits
-        tokens_exceeded = new_tokens > self._max_tpm
-        requests_exceeded = new_requests > self._max_rpm
-        
-        if tokens_exceeded or requests_exceeded:
-            # Calculate wait time - need to wait until oldest entry expires
-            if self._token_history:
-                oldest_token_time = self._token_history[0][0]
-                token_wait_time = (oldest_token_time + self._window_seconds) - current_time
-            else:
-                token_wait_time = 0
-            
-            if self._request_history:
-                oldest_request_time = self._request_history[0]
-                request_wait_time = (oldest_request_time + self._window_seconds) - current_time
-            else:
-                request_wait_time = 0
-            
-            # Wait for whichever limit would be hit first
-            wait_time = max(token_wait_time, request_wait_time)
-            
-            if wait_time > 0:
-                # Add small buffer to avoid edge cases
-                wait_time += 0.1
-                if self.verbose:
-                    print(f"    Rate limit: {tokens_used:,}/{self._max_tpm:,} tokens, {requests_count}/{self._max_rpm} requests")
-                print(f"    Rate limit approaching, waiting {wait_time:.1f}s...")
-                time.sleep(wait_time)
-                
-                # Recalculate after waiting
-                current_time = time.time()
-                self._clean_old_history(current_time)
+        waited = self._limiter.wait_for_capacity(estimated_tokens)
+        if waited > 0:
+            print(f"    Rate limit reached, waited {waited:.1f}s for capacity")
 
     def _record_request(self, input_tokens: int, output_tokens: int) -> None:
         """
@@ -396,20 +608,230 @@ class Summariser:
             input_tokens: Input/prompt tokens used for the request
             output_tokens: Output/completion tokens used for the request
         """
-        current_time = time.time()
-        total_tokens = input_tokens + output_tokens
+        # Prompt tokens were reserved up front; charge the completion against the TPM budget too
+        self._limiter.consume(output_tokens)
         
-        # Track for rate limiting (use total tokens)
-        self._token_history.append((current_time, total_tokens))
-        self._request_history.append(current_time)
+        with self._usage_lock:
+            # Track for cost calculation (separate input/output)
+            self._total_input_tokens += input_tokens
+            self._total_output_tokens += output_tokens
+
+    def _get_embedder(self) -> Embedder:
+        """Return this thread's Embedder, created on first use and reused across merges."""
+        embedder = getattr(self._embedders, "embedder", None)
+        if embedder is None:
+            embedder = Embedder(api_key=self._api_key)
+            self._embedders.embedder = embedder
+        return embedder
+
+    def _open_cache(self, cache_path: str) -> Optional[sqlite3.Connection]:
+        """Open (or create) the SQLite completion cache. Returns None if unavailable."""
+        try:
+            cache_dir = os.path.dirname(cache_path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            # Summary passes run on worker threads; access is serialised by _cache_lock
+            conn = sqlite3.connect(cache_path, check_same_thread=False)
+            # WAL lets concurrent summariser processes read while one writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions "
+                "(key TEXT PRIMARY KEY, content TEXT NOT NULL, created_at REAL NOT NULL DEFAULT 0)"
+            )
+            conn.execute("DELETE FROM completions WHERE created_at < ?", (time.time() - COMPLETION_CACHE_TTL_SECONDS,))
+            conn.commit()
+            return conn
+        except (OSError, sqlite3.Error) as e:
+            print(f"    Warning: Completion cache unavailable: {e}")
+            return None
+
+    def _cache_key(self, messages: List[Dict[str, str]]) -> str:
+        """Content-addressed cache key over the model and the exact request messages."""
+        payload = self.model + "\0" + json.dumps(messages, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _cache_get(self, messages: List[Dict[str, str]]) -> Optional[str]:
+        """Return the cached completion for these messages, if any."""
+        if self._cache is None:
+            return None
+        try:
+            with self._cache_lock:
+                row = self._cache.execute(
+                    "SELECT content FROM completions WHERE key = ? AND created_at >= ?",
+                    (self._cache_key(messages), time.time() - COMPLETION_CACHE_TTL_SECONDS),
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def _cache_put(self, messages: List[Dict[str, str]], content: str) -> None:
+        """Store a completion; empty replies are not cached so they get retried."""
+        if self._cache is None or not content:
+            return
+        try:
+            with self._cache_lock:
+                self._cache.execute(
+                    "INSERT OR REPLACE INTO completions (key, content, created_at) VALUES (?, ?, ?)",
+                    (self._cache_key(messages), content, time.time()),
+                )
+                self._cache.commit()
+        except sqlite3.Error as e:
+            if self.verbose:
+                print(f"    Warning: Could not write completion cache: {e}")
+
+    def _complete(
+        self,
+        messages: List[Dict[str, str]],
+        estimated_tokens: int,
+        max_tokens: int = SECTION_MAX_COMPLETION_TOKENS,
+    ) -> Tuple[str, int, int]:
+        """
+        Run a chat completion (rate limited) and record its token usage.
+
+        Cache hits skip the API call entirely and report zero tokens.
+
+        Args:
+            messages: Chat messages for the request
+            estimated_tokens: Prompt token estimate, used for rate limiting and if no usage is reported
+            max_tokens: Cap on completion tokens (reasoning included)
+
+        Returns:
+            Tuple of (content, input_tokens, output_tokens)
+        """
+        cached = self._cache_get(messages)
+        if cached is not None:
+            return cached, 0, 0
+
+        self._wait_if_needed(estimated_tokens)
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_completion_tokens=max_tokens,
+        )
+
+        # Record actual token usage
+        if hasattr(response, 'usage') and response.usage:
+            input_tokens = getattr(response.usage, 'prompt_tokens', estimated_tokens)
+            output_tokens = getattr(response.usage, 'completion_tokens', 0)
+        else:
+            # Fallback to estimate if usage info not available
+            input_tokens = estimated_tokens
+            output_tokens = 0
+        self._record_request(input_tokens, output_tokens)
+
+        content = response.choices[0].message.content or ""
+        if getattr(response.choices[0], "finish_reason", None) == "length":
+            # Truncated at max_tokens: don't cache it
+            print(f"    Warning: completion hit the {max_tokens:,} token limit and was truncated")
+        else:
+            self._cache_put(messages, content)
+        return content, input_tokens, output_tokens
+
+    def _stream_completion(
+        self,
+        messages: List[Dict[str, str]],
+        estimated_tokens: int,
+        max_tokens: int = SECTION_MAX_COMPLETION_TOKENS,
+    ) -> Tuple[str, int, int]:
+        """
+        Run a chat completion with streaming (rate limited) and record its token usage.
+
+        Deltas are accumulated as they arrive; the final usage chunk (requested via
+        stream_options) supplies real token counts for rate limiting and cost.
+        Cache hits skip the API call entirely and report zero tokens.
+
+        Args:
+            messages: Chat messages for the request
+            estimated_tokens: Prompt token estimate, used for rate limiting and if the stream reports no usage
+            max_tokens: Cap on completion tokens (reasoning included)
+
+        Returns:
+            Tuple of (content, input_tokens, output_tokens)
+        """
+        cached = self._cache_get(messages)
+        if cached is not None:
+            return cached, 0, 0
+
+        self._wait_if_needed(estimated_tokens)
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_completion_tokens=max_tokens,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+
+        parts: List[str] = []
+        usage = None
+        finish_reason = None
+        for event in stream:
+            if event.choices:
+                delta = event.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                finish_reason = getattr(event.choices[0], "finish_reason", None) or finish_reason
+            if getattr(event, "usage", None):
+                usage = event.usage
+
+        if usage:
+            input_tokens = getattr(usage, "prompt_tokens", estimated_tokens)
+            output_tokens = getattr(usage, "completion_tokens", 0)
+        else:
+            input_tokens = estimated_tokens
+            output_tokens = 0
+        self._record_request(input_tokens, output_tokens)
+
+        content = "".join(parts)
+        if finish_reason == "length":
+            # Truncated at max_tokens: don't cache it
+            print(f"    Warning: completion hit the {max_tokens:,} token limit and was truncated")
+        else:
+            self._cache_put(messages, content)
+        return content, input_tokens, output_tokens
+
+    def _batch_chat(
+        self, prompts: List[str], system: str, max_tokens: int = SECTION_MAX_COMPLETION_TOKENS
+    ) -> Optional[List[str]]:
+        """
+        Answer several independent prompts with a single chat completion.
+
+        The prompts are sent as delimited tasks and the model returns a JSON array with
+        one answer per task, so N small passes cost one request against the RPM budget.
+
+        Args:
+            prompts: Independent user prompts sharing the same system message
+            system: System message for every prompt
+            max_tokens: Completion token cap per prompt (the request gets one per prompt)
+
+        Returns:
+            One answer per prompt (in order), or None if the reply could not be parsed
+            (callers should then fall back to one request per prompt)
+        """
+        tasks = "\n\n".join(f"=== TASK {i + 1} ===\n{prompt}" for i, prompt in enumerate(prompts))
+        messages = [
+            {"role": "system", "content": system + BATCH_CHAT_SYSTEM_SUFFIX},
+            {"role": "user", "content": BATCH_CHAT_PROMPT_TEMPLATE.format(count=len(prompts), tasks=tasks)},
+        ]
         
-        # Track for cost calculation (separate input/output)
-        self._total_input_tokens += input_tokens
-        self._total_output_tokens += output_tokens
+        estimated_tokens = self._count_message_tokens(messages)
+        content, input_tokens, output_tokens = self._complete(messages, estimated_tokens, max_tokens * len(prompts))
+        if self.verbose:
+            print(f"      ✓ Packed request for {len(prompts)} prompts completed ({input_tokens:,} input, {output_tokens:,} output tokens)")
         
-        # Clean old entries periodically (every 10 requests to avoid overhead)
-        if len(self._request_history) % 10 == 0:
-            self._clean_old_history(current_time)
+        # Remove markdown code blocks if present
+        raw = _CODE_FENCE_RE.sub("", (content or "").strip()).strip()
+        try:
+            answers = _json_loads(raw)
+        except Exception:
+            answers = None
+        if isinstance(answers, list):
+            # JSON-producing tasks are often answered with objects rather than strings
+            answers = [json.dumps(a) if isinstance(a, (dict, list)) else a for a in answers]
+        if not isinstance(answers, list) or len(answers) != len(prompts) or not all(isinstance(a, str) for a in answers):
+            if self.verbose:
+                print(f"    Warning: packed reply did not contain {len(prompts)} answers, sending prompts individually")
+            return None
+        return answers
 
     def _calculate_cost(self) -> Dict[str, Any]:
         """
@@ -467,13 +889,24 @@ class Summariser:
         if not chunks:
             return ""
         
-        # Check if we can fit all chunks in one request
-        if self._can_fit_in_single_request(chunks, base_prompt):
+        # Token cost of each chunk (format overhead + text), counted once for the fit check and batch planning
+        chunk_tokens = self._chunk_token_costs(chunks)
+        base_prompt_tokens = self._count_tokens(base_prompt)
+        # Request estimates reuse the counts above instead of re-tokenizing each assembled prompt
+        message_overhead = self._count_message_tokens([
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": ""},
+        ]) + base_prompt_tokens
+        
+        context_limit = self._get_model_context_limit()
+        
+        # Check if we can fit all chunks in one request (same budget as _can_fit_in_single_request)
+        if base_prompt_tokens + sum(chunk_tokens) + 8000 + 100 <= context_limit:
             # Try single request first
             if self.verbose:
                 print(f"    Processing {len(chunks)} chunks in single request...")
             try:
-                chunk_texts = [f"[{format_ts(c['start'])}]-[{format_ts(c['end'])}] {c['text']}" for c in chunks]
+                chunk_texts = [self._render_chunk(c) for c in chunks]
                 # Handle both {chunks} placeholder and direct formatting
                 if "{chunks}" in base_prompt:
                     prompt = base_prompt.format(chunks=chr(10).join(chunk_texts))
@@ -485,31 +918,14 @@ class Summariser:
                     {"role": "user", "content": prompt},
                 ]
                 
-                # Rate limiting: estimate tokens and wait if needed
-                estimated_tokens = self._count_message_tokens(messages)
-                self._wait_if_needed(estimated_tokens)
-                
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    # temperature=temperature,
-                )
-                
-                # Record actual token usage
-                if hasattr(response, 'usage') and response.usage:
-                    input_tokens = getattr(response.usage, 'prompt_tokens', estimated_tokens)
-                    output_tokens = getattr(response.usage, 'completion_tokens', 0)
-                else:
-                    # Fallback to estimate if usage info not available
-                    input_tokens = estimated_tokens
-                    output_tokens = 0
-                
-                self._record_request(input_tokens, output_tokens)
+                # Rate limiting: estimate tokens and wait if needed (skipped on a cache hit)
+                estimated_tokens = message_overhead + sum(chunk_tokens)
+                content, input_tokens, output_tokens = self._stream_completion(messages, estimated_tokens)
                 
                 if self.verbose:
                     print(f"    ✓ Single request completed ({input_tokens:,} input, {output_tokens:,} output tokens)")
                 
-                return response.choices[0].message.content.strip()
+                return content.strip()
             except BadRequestError as e:
                 if "context_length_exceeded" in str(e).lower():
                     if self.verbose:
@@ -522,43 +938,25 @@ class Summariser:
         # Need batching - split chunks into batches
         print(f"    Processing {len(chunks)} chunks in batches...")
         if self.verbose:
-            print(f"    Calculating batch sizes (context limit: {self._get_model_context_limit():,} tokens)...")
-        context_limit = self._get_model_context_limit()
-        base_tokens = self._count_tokens(base_prompt) + 100 + 8000  # base + system + response buffer
+            print(f"    Calculating batch sizes (context limit: {context_limit:,} tokens)...")
+        base_tokens = base_prompt_tokens + 100 + 8000  # base + system + response buffer
         max_chunk_tokens = context_limit - base_tokens
         
-        batches = []
-        current_batch = []
-        current_batch_tokens = 0
-        
-        for chunk in chunks:
-            chunk_text = chunk.get("text", "")
-            chunk_tokens = 20 + self._count_tokens(chunk_text)  # Format overhead + text
-            
-            if current_batch_tokens + chunk_tokens > max_chunk_tokens and current_batch:
-                # Start new batch
-                batches.append(current_batch)
-                current_batch = [chunk]
-                current_batch_tokens = chunk_tokens
-            else:
-                current_batch.append(chunk)
-                current_batch_tokens += chunk_tokens
-        
-        if current_batch:
-            batches.append(current_batch)
+        plan = self._plan_batches(chunk_tokens, max_chunk_tokens)
+        batches = [chunks[start:end] for start, end in plan]
+        batch_estimates = [message_overhead + sum(chunk_tokens[start:end]) for start, end in plan]
         
         print(f"    Split into {len(batches)} batches")
         if self.verbose:
             batch_sizes = [len(b) for b in batches]
             print(f"    Batch sizes: {batch_sizes}")
         
-        # Process each batch
-        batch_results = []
-        for i, batch in enumerate(batches):
+        # Process batches concurrently (bounded); results keep batch order for merging
+        def run_batch(i: int, batch: List[Dict[str, Any]]) -> str:
             if self.verbose:
                 print(f"    Processing batch {i+1}/{len(batches)} ({len(batch)} chunks)...")
             try:
-                chunk_texts = [f"[{format_ts(c['start'])}]-[{format_ts(c['end'])}] {c['text']}" for c in batch]
+                chunk_texts = [self._render_chunk(c) for c in batch]
                 # Handle both {chunks} placeholder and direct formatting
                 if "{chunks}" in base_prompt:
                     prompt = base_prompt.format(chunks=chr(10).join(chunk_texts))
@@ -570,34 +968,19 @@ class Summariser:
                     {"role": "user", "content": prompt},
                 ]
                 
-                # Rate limiting: estimate tokens and wait if needed
-                estimated_tokens = self._count_message_tokens(messages)
-                self._wait_if_needed(estimated_tokens)
-                
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    # temperature=temperature,
-                )
-                
-                # Record actual token usage
-                if hasattr(response, 'usage') and response.usage:
-                    input_tokens = getattr(response.usage, 'prompt_tokens', estimated_tokens)
-                    output_tokens = getattr(response.usage, 'completion_tokens', 0)
-                else:
-                    # Fallback to estimate if usage info not available
-                    input_tokens = estimated_tokens
-                    output_tokens = 0
-                
-                self._record_request(input_tokens, output_tokens)
+                # Rate limiting: estimate tokens and wait if needed (skipped on a cache hit)
+                content, input_tokens, output_tokens = self._stream_completion(messages, batch_estimates[i])
                 
                 if self.verbose:
                     print(f"      ✓ Batch {i+1} completed ({input_tokens:,} input, {output_tokens:,} output tokens)")
                 
-                batch_results.append(response.choices[0].message.content.strip())
+                return content.strip()
             except Exception as e:
                 print(f"    Warning: Batch {i+1}/{len(batches)} failed: {e}")
-                batch_results.append(f"(Batch {i+1} processing failed)")
+                return f"(Batch {i+1} processing failed)"
+        
+        with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_BATCHES, len(batches))) as pool:
+            batch_results = list(pool.map(run_batch, range(len(batches)), batches))
         
         # Merge results based on strategy
         if self.verbose:
@@ -607,6 +990,31 @@ class Summariser:
             print(f"    ✓ Merged result: {len(merged_result)} characters")
         return merged_result
     
+    def _plan_batches(self, chunk_tokens: List[int], max_batch_tokens: int) -> List[Tuple[int, int]]:
+        """
+        Split chunks into consecutive batches that each fit a token budget.
+        
+        Greedy packing: every batch takes as many following chunks as fit, and a chunk
+        larger than the budget gets a batch of its own. Batch ends are found by binary
+        search over cumulative token counts.
+        
+        Args:
+            chunk_tokens: Token cost of each chunk, in order
+            max_batch_tokens: Token budget per batch
+            
+        Returns:
+            (start, end) index ranges of the batches
+        """
+        prefix = [0, *accumulate(chunk_tokens)]
+        batches = []
+        start = 0
+        while start < len(chunk_tokens):
+            end = bisect.bisect_right(prefix, prefix[start] + max_batch_tokens) - 1
+            end = max(end, start + 1)
+            batches.append((start, end))
+            start = end
+        return batches
+
     def _merge_batch_results(self, batch_results: List[str], strategy: str) -> str:
         """
         Merge results from multiple batches.
@@ -640,29 +1048,14 @@ class Summariser:
                     {"role": "user", "content": HIERARCHICAL_MERGE_BASE_PROMPT.format(combined_summaries=combined)},
                 ]
                 
-                # Rate limiting: estimate tokens and wait if needed
+                # Rate limiting: estimate tokens and wait if needed (skipped on a cache hit)
                 estimated_tokens = self._count_message_tokens(messages)
-                self._wait_if_needed(estimated_tokens)
-                
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                )
-                
-                # Record actual token usage
-                if hasattr(response, 'usage') and response.usage:
-                    input_tokens = getattr(response.usage, 'prompt_tokens', estimated_tokens)
-                    output_tokens = getattr(response.usage, 'completion_tokens', 0)
-                else:
-                    input_tokens = estimated_tokens
-                    output_tokens = 0
-                
-                self._record_request(input_tokens, output_tokens)
+                content, input_tokens, output_tokens = self._stream_completion(messages, estimated_tokens)
                 
                 if self.verbose:
                     print(f"      ✓ Hierarchical merge completed ({input_tokens:,} input, {output_tokens:,} output tokens)")
                 
-                return response.choices[0].message.content.strip()
+                return content.strip()
             except Exception as e:
                 print(f"    Warning: Hierarchical merge failed: {e}, falling back to combine")
                 # Fallback to combine on error
@@ -689,45 +1082,47 @@ class Summariser:
                 if self.verbose:
                     print(f"      Generating embeddings for {len(sections)} sections...")
                 # Generate embeddings for each section
-                embedder = Embedder(api_key=os.getenv("OPENAI_API_KEY"))
+                embedder = self._get_embedder()
                 section_texts = [section[2] for section in sections]
                 
-                # Generate embeddings in batches (embedder handles this)
-                embeddings = []
-                for text in section_texts:
-                    try:
-                        embedding = embedder.embed_text(text)
-                        embeddings.append(embedding)
-                    except Exception as e:
-                        print(f"    Warning: Embedding generation failed for section: {e}")
-                        # Use empty embedding as fallback
-                        embeddings.append([])
+                # One embeddings request for all sections (identical texts are embedded once)
+                try:
+                    embeddings = embedder.embed_texts(section_texts)
+                except Exception as e:
+                    print(f"    Warning: Embedding generation failed for sections: {e}")
+                    # Use empty embeddings as fallback (every section is kept)
+                    embeddings = [[] for _ in section_texts]
                 
                 if self.verbose:
                     print(f"      Filtering duplicates using cosine similarity (threshold: 0.85)...")
-                # Calculate cosine similarity and filter duplicates
-                unique_sections = []
-                unique_indices = []  # Track indices of kept sections for embedding comparison
+                # Filter duplicates: a section is dropped if it is too similar to any section
+                # already kept. All pairwise cosine similarities come from one matmul of the
+                # normalized embedding matrix.
                 similarity_threshold = 0.85
-                
-                for i, (batch_idx, sec_idx, section_text) in enumerate(sections):
-                    if not embeddings[i]:  # Skip similarity check if embedding failed
-                        unique_sections.append(section_text)
-                        unique_indices.append(i)
-                        continue
-                    
-                    # Check similarity against all previously kept sections
-                    is_duplicate = False
-                    for kept_idx in unique_indices:
-                        if embeddings[kept_idx]:
-                            similarity = self._cosine_similarity(embeddings[i], embeddings[kept_idx])
-                            if similarity > similarity_threshold:
-                                is_duplicate = True
-                                break
-                    
-                    if not is_duplicate:
-                        unique_sections.append(section_text)
-                        unique_indices.append(i)
+                if any(len(embedding) == 0 for embedding in embeddings):
+                    # Skip similarity check if embedding failed
+                    unique_sections = section_texts
+                else:
+                    # One float32 matrix, normalized row-wise in a single pass (no per-vector calls)
+                    matrix = np.asarray(embeddings, dtype=np.float32)
+                    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                    matrix = matrix / np.where(norms > 0, norms, 1.0)
+                    kept_idx: List[int] = []
+                    if len(matrix) <= DEDUP_FULL_MATRIX_MAX:
+                        similarity = matrix @ matrix.T
+                        for i in range(len(matrix)):
+                            if not kept_idx or similarity[i, kept_idx].max() <= similarity_threshold:
+                                kept_idx.append(i)
+                    else:
+                        # Too many sections for an N x N matrix: compare each one against
+                        # the kept sections only, stored contiguously for a single matvec
+                        kept = np.empty_like(matrix)
+                        for i, vector in enumerate(matrix):
+                            n_kept = len(kept_idx)
+                            if not n_kept or (kept[:n_kept] @ vector).max() <= similarity_threshold:
+                                kept[n_kept] = vector
+                                kept_idx.append(i)
+                    unique_sections = [section_texts[i] for i in kept_idx]
                 
                 if self.verbose:
                     print(f"      ✓ Kept {len(unique_sections)}/{len(sections)} unique sections")
@@ -742,29 +1137,6 @@ class Summariser:
             # Default to combine
             return "\n\n".join(batch_results)
     
-    def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
-        """
-        Calculate cosine similarity between two vectors.
-        
-        Args:
-            vec1: First vector
-            vec2: Second vector
-            
-        Returns:
-            Cosine similarity value between -1 and 1
-        """
-        if not vec1 or not vec2 or len(vec1) != len(vec2):
-            return 0.0
-        
-        dot_product = sum(a * b for a, b in zip(vec1, vec2))
-        magnitude1 = math.sqrt(sum(a * a for a in vec1))
-        magnitude2 = math.sqrt(sum(a * a for a in vec2))
-        
-        if magnitude1 == 0 or magnitude2 == 0:
-            return 0.0
-        
-        return dot_product / (magnitude1 * magnitude2)
-    
     def extract_topics_streaming(
         self,
         coarse_chunks: List[Dict[str, Any]],
@@ -772,8 +1144,11 @@ class Summariser:
     ) -> Tuple[List[str], List[int]]:
         """
         Streaming topic extraction:
-        - iterates chunks in order
-        - assigns each chunk to an existing topic or creates a new one
+        - iterates chunks in order, classifying windows of TOPIC_CLASSIFY_CONCURRENCY chunks
+          against a snapshot of the topic list (one packed request per window)
+        - assigns each chunk to an existing topic or creates a new one, applying decisions in order
+        - a "create" decided against a stale snapshot (another topic was created since) is
+          re-classified against the current topics so near-duplicate topics aren't created
         Returns (topics, chunk_to_topic_index)
         """
         if not coarse_chunks:
@@ -782,125 +1157,175 @@ class Summariser:
         topics: List[str] = []
         chunk_to_topic: List[int] = []
 
-        for i, chunk in enumerate(coarse_chunks):
-            start = format_ts(chunk["start"])
-            end = format_ts(chunk["end"])
-            text = chunk["text"]
-
-            topics_indexed = "\n".join([f"{idx}: {t}" for idx, t in enumerate(topics)]) or "(none yet)"
-
-            prompt = TOPIC_STREAM_PROMPT.format(
-                topics_indexed=topics_indexed,
-                start=start,
-                end=end,
-                text=text,
-                title=metadata.get("title"),
-            )
+        with ThreadPoolExecutor(max_workers=TOPIC_CLASSIFY_CONCURRENCY) as pool:
+            for window_start in range(0, len(coarse_chunks), TOPIC_CLASSIFY_CONCURRENCY):
+                window = range(window_start, min(window_start + TOPIC_CLASSIFY_CONCURRENCY, len(coarse_chunks)))
+                # Topics are append-only, so a snapshot's indices stay valid after later creates
+                snapshot = list(topics)
+                # One packed request per window; per-chunk requests (in parallel) if it can't be parsed
+                decisions = self._classify_topic_window(window, coarse_chunks, snapshot, metadata)
+                if decisions is None:
+                    decisions = list(pool.map(
+                        lambda i: self._classify_topic_chunk(i, coarse_chunks[i], snapshot, metadata), window
+                    ))
+
+                for i, decision in zip(window, decisions):
+                    if decision is not None and decision.get("action") == "create" and len(topics) != len(snapshot):
+                        if self.verbose:
+                            print(f"    Re-classifying chunk {i} against {len(topics)} current topics")
+                        decision = self._classify_topic_chunk(i, coarse_chunks[i], list(topics), metadata)
+                    self._apply_topic_decision(i, decision, topics, chunk_to_topic)
 
-            messages = [
-                {"role": "system", "content": TOPIC_STREAM_SYSTEM_MESSAGE},
-                {"role": "user", "content": prompt},
-            ]
+        # If you ended with >max_topics due to any edge cases, you can merge later.
+        # If <min_topics, that's allowed by your earlier constraints ("fewer if insufficient content").
+        return topics, chunk_to_topic
 
-            estimated_tokens = self._count_message_tokens(messages)
-            self._wait_if_needed(estimated_tokens)
+    def _classify_topic_window(
+        self, window: range, coarse_chunks: List[Dict[str, Any]], topics: List[str], metadata: Dict[str, Any]
+    ) -> Optional[List[Optional[Dict[str, Any]]]]:
+        """
+        Classify a window of chunks against the same topics with one packed request (see _batch_chat).
+        
+        Args:
+            window: Indices of the chunks to classify
+            coarse_chunks: All coarse chunks
+            topics: Topic list to classify against
+            metadata: Video metadata (title)
+            
+        Returns:
+            One decision per chunk (None where a reply was malformed), or None if the
+            packed request failed and the chunks should be classified individually
+        """
+        if len(window) < 2:
+            return None
+        prompts = [self._topic_prompt(coarse_chunks[i], topics, metadata) for i in window]
+        try:
+            answers = self._batch_chat(prompts, TOPIC_STREAM_SYSTEM_MESSAGE, TOPIC_CLASSIFY_MAX_COMPLETION_TOKENS)
+        except Exception as e:
+            if self.verbose:
+                print(f"    Warning: packed topic classify failed on chunks {window.start}-{window.stop - 1}: {e}")
+            return None
+        if answers is None:
+            return None
+        return [self._parse_topic_decision(i, answer) for i, answer in zip(window, answers)]
+
+    def _topic_prompt(self, chunk: Dict[str, Any], topics: List[str], metadata: Dict[str, Any]) -> str:
+        """Topic classification prompt for one chunk against the given topics."""
+        topics_indexed = "\n".join([f"{idx}: {t}" for idx, t in enumerate(topics)]) or "(none yet)"
+
+        return TOPIC_STREAM_PROMPT.format(
+            topics_indexed=topics_indexed,
+            start=format_ts(chunk["start"]),
+            end=format_ts(chunk["end"]),
+            text=chunk["text"],
+            title=metadata.get("title"),
+        )
+
+    def _parse_topic_decision(self, i: int, content: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Parse a topic decision reply; None if it isn't a JSON object."""
+        # Remove markdown code blocks if present
+        raw = _CODE_FENCE_RE.sub("", (content or "").strip()).strip()
+        if self.verbose:
+            print(f"    Topic classify response: {raw}")
+        try:
+            decision = _json_loads(raw)
+        except Exception:
+            decision = None
+        if not isinstance(decision, dict):
+            if self.verbose:
+                print(f"    Warning: topic classify failed on chunk {i}: {raw}")
+            return None
+        return decision
 
-            try:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages
-                )
-            except Exception as e:
-                # Fallback: if we can't call the API, assign to "Main Discussion"
-                if not topics:
-                    topics = ["Main Discussion"]
-                chunk_to_topic.append(0)
-                if self.verbose:
-                    print(f"    Warning: topic classify failed on chunk {i}: {e}")
-                continue
+    def _classify_topic_chunk(
+        self, i: int, chunk: Dict[str, Any], topics: List[str], metadata: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Ask the model whether one chunk fits an existing topic or needs a new one.
+        
+        Args:
+            i: Chunk index (for log messages)
+            chunk: Coarse chunk to classify
+            topics: Topic list to classify against
+            metadata: Video metadata (title)
+            
+        Returns:
+            Parsed decision JSON, or None if the call failed or the reply was malformed
+        """
+        messages = [
+            {"role": "system", "content": TOPIC_STREAM_SYSTEM_MESSAGE},
+            {"role": "user", "content": self._topic_prompt(chunk, topics, metadata)},
+        ]
 
-            # usage accounting
-            if hasattr(response, "usage") and response.usage:
-                input_tokens = getattr(response.usage, "prompt_tokens", estimated_tokens)
-                output_tokens = getattr(response.usage, "completion_tokens", 0)
-            else:
-                input_tokens = estimated_tokens
-                output_tokens = 0
-            self._record_request(input_tokens, output_tokens)
-
-            raw = response.choices[0].message.content or ""
-            raw = response.choices[0].message.content.strip()
-            # Remove markdown code blocks if present
-            if raw.startswith("```"):
-                raw = raw.split("```")[1].split("\n", 1)[1] if "\n" in raw.split("```")[1] else raw.split("```")[2]
+        estimated_tokens = self._count_message_tokens(messages)
+        try:
+            content, _, _ = self._stream_completion(messages, estimated_tokens, TOPIC_CLASSIFY_MAX_COMPLETION_TOKENS)
+        except Exception as e:
             if self.verbose:
-                print(f"    Topic classify response: {raw}")
-            try:
-                decision = json.loads(raw)
-            except Exception:
-                # If model returns malformed JSON, do a conservative fallback
-                if not topics:
-                    topics = ["Main Discussion"]
-                chunk_to_topic.append(0)
-                if self.verbose:
-                    print(f"    Warning: topic classify failed on chunk {i}: {raw}")
-                continue
+                print(f"    Warning: topic classify failed on chunk {i}: {e}")
+            return None
 
-            action = decision.get("action")
+        return self._parse_topic_decision(i, content)
 
-            if action == "assign":
-                idx = decision.get("topic_index")
-                if isinstance(idx, int) and 0 <= idx < len(topics):
-                    if self.verbose:
-                        print(f"    Assigning chunk {i} to topic {topics[idx]}")
-                    chunk_to_topic.append(idx)
-                elif idx == -1:
-                    if self.verbose:
-                        print(f"    Chunk is not relevant to any topic")
-                        chunk_to_topic.append(-1)
-                    if self.verbose:
-                        print(f"    Assigning chunk {i} to topic -1")
-                    # if self.verbose:
-                    #     print(f"    Assigning chunk {i} to topic -1 (no topic)")
-                    # if not topics:
-                    #     topics = ["Irrelevant discussion"]
-                    # elif not "Irrelevant discussion" in topics:
-                    #     topics.append("Irrelevant discussion")
-                    #     chunk_to_topic.append(len(topics) - 1)
-                    # else:
-                    #     chunk_to_topic.append(topics.index("Irrelevant discussion"))
-                    # if self.verbose:
-                    #     print(f"    Assigning chunk {i} to topic {topics[chunk_to_topic[-1]]}")
-                else:
-                    # invalid index => fallback assign to first topic or create
-                    if topics:
-                        if self.verbose:
-                            print(f"    Assigning chunk {i} to first topic")
-                        chunk_to_topic.append(0)
-                    else:
-                        if self.verbose:
-                            print(f"   FALLBACK: Assigning chunk {i} to first topic")
-                        topics = ["Main Discussion"]
-                        chunk_to_topic.append(0)
-
-            elif action == "create":
-                name = decision.get("topic_name", "")
-                topics.append(name.strip())
-                chunk_to_topic.append(len(topics) - 1)
+    def _apply_topic_decision(
+        self, i: int, decision: Optional[Dict[str, Any]], topics: List[str], chunk_to_topic: List[int]
+    ) -> None:
+        """
+        Record one chunk's topic decision, updating topics and chunk_to_topic in place.
+        
+        Args:
+            i: Chunk index (for log messages)
+            decision: Parsed decision from _classify_topic_chunk (None if classification failed)
+            topics: Current topic list (appended to on "create")
+            chunk_to_topic: Topic index per chunk so far (one entry is appended)
+        """
+        if decision is None:
+            # Fallback: if we can't call the API or the JSON is malformed, assign to "Main Discussion"
+            if not topics:
+                topics.append("Main Discussion")
+            chunk_to_topic.append(0)
+            return
+
+        action = decision.get("action")
+
+        if action == "assign":
+            idx = decision.get("topic_index")
+            if isinstance(idx, int) and 0 <= idx < len(topics):
                 if self.verbose:
-                    print(f"    Created new topic: {name}")
-
-            else:
-                # unknown action => fallback
+                    print(f"    Assigning chunk {i} to topic {topics[idx]}")
+                chunk_to_topic.append(idx)
+            elif idx == -1:
                 if self.verbose:
-                    print(f"   FALLBACK: Unknown action: {action}")
-                if not topics:
-                    topics = ["Main Discussion"]
-                chunk_to_topic.append(0)
+                    print(f"    Chunk is not relevant to any topic")
+                chunk_to_topic.append(-1)
+                if self.verbose:
+                    print(f"    Assigning chunk {i} to topic -1")
+            else:
+                # invalid index => fallback assign to first topic or create
+                if topics:
+                    if self.verbose:
+                        print(f"    Assigning chunk {i} to first topic")
+                    chunk_to_topic.append(0)
+                else:
+                    if self.verbose:
+                        print(f"   FALLBACK: Assigning chunk {i} to first topic")
+                    topics.append("Main Discussion")
+                    chunk_to_topic.append(0)
+
+        elif action == "create":
+            name = decision.get("topic_name", "")
+            topics.append(name.strip())
+            chunk_to_topic.append(len(topics) - 1)
+            if self.verbose:
+                print(f"    Created new topic: {name}")
 
-        # If you ended with >max_topics due to any edge cases, you can merge later.
-        # If <min_topics, that's allowed by your earlier constraints ("fewer if insufficient content").
-        return topics, chunk_to_topic
+        else:
+            # unknown action => fallback
+            if self.verbose:
+                print(f"   FALLBACK: Unknown action: {action}")
+            if not topics:
+                topics.append("Main Discussion")
+            chunk_to_topic.append(0)
 
     def _extract_topics(self, coarse_chunks: List[Dict[str, Any]], metadata: Dict[str, Any]) -> Tuple[List[str], List[int]]:
         """Pass 1: Extract main topics/themes from coarse chunks."""
@@ -962,27 +1387,10 @@ All timestamps are clickable in supported markdown viewers and reference exact m
                 
                 # Rate limiting: estimate tokens and wait if needed
                 estimated_tokens = self._count_message_tokens(messages)
-                self._wait_if_needed(estimated_tokens)
-                
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    # temperature=0.4,
-                )
-                
-                # Record actual token usage
-                if hasattr(response, 'usage') and response.usage:
-                    input_tokens = getattr(response.usage, 'prompt_tokens', estimated_tokens)
-                    output_tokens = getattr(response.usage, 'completion_tokens', 0)
-                else:
-                    # Fallback to estimate if usage info not available
-                    input_tokens = estimated_tokens
-                    output_tokens = 0
-                
-                self._record_request(input_tokens, output_tokens)
+                content, input_tokens, output_tokens = self._stream_completion(messages, estimated_tokens)
                 if self.verbose:
                     print(f"    ✓ Synopsis generated ({input_tokens:,} input, {output_tokens:,} output tokens)")
-                synopsis = response.choices[0].message.content.strip()
+                synopsis = content.strip()
             else:
                 # Use batching
                 synopsis = self._summarize_with_batching(
@@ -1027,19 +1435,63 @@ All timestamps are clickable in supported markdown viewers and reference exact m
                 bullets.append(f"- [{format_ts(chunk['start'])}] {chunk['text'][:100]}...")
             return f"## Executive Synopsis\n\n{chr(10).join(bullets)}"
 
+    def _index_by_start(self, chunks: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[float]]:
+        """
+        Sort chunks by start time (stable) for range lookups with bisect.
+        
+        Returns:
+            (chunks sorted by start, their start times)
+        """
+        sorted_chunks = sorted(chunks, key=lambda c: c["start"])
+        return sorted_chunks, [c["start"] for c in sorted_chunks]
+
+    def _fine_chunks_within(
+        self, coarse_chunks: List[Dict[str, Any]], sorted_fine: List[Dict[str, Any]], fine_starts: List[float]
+    ) -> List[Dict[str, Any]]:
+        """
+        Fine chunks starting within each coarse chunk's [start, end] range, coarse chunk by coarse chunk.
+        
+        Args:
+            coarse_chunks: Coarse chunks to collect fine chunks for
+            sorted_fine: Fine chunks sorted by start (from _index_by_start)
+            fine_starts: Start times of sorted_fine
+            
+        Returns:
+            Matching fine chunks (a fine chunk in several ranges appears once per range)
+        """
+        related = []
+        for coarse_chunk in coarse_chunks:
+            lo = bisect.bisect_left(fine_starts, coarse_chunk["start"])
+            hi = bisect.bisect_right(fine_starts, coarse_chunk["end"])
+            related.extend(sorted_fine[lo:hi])
+        return related
+
+    def _group_chunks_by_topic(
+        self, coarse_chunks: List[Dict[str, Any]], topics: List[str], chunk_to_topic: List[int]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Group coarse chunks by assigned topic in one pass.
+        
+        Args:
+            coarse_chunks: Coarse chunks in time order
+            topics: Topic names
+            chunk_to_topic: Topic index per chunk (-1 for chunks with no topic)
+            
+        Returns:
+            Topic name -> its chunks in time order (every topic present, possibly empty)
+        """
+        by_index: List[List[Dict[str, Any]]] = [[] for _ in topics]
+        for chunk, topic_idx in zip(coarse_chunks, chunk_to_topic):
+            if 0 <= topic_idx < len(topics):
+                by_index[topic_idx].append(chunk)
+        return {topic: by_index[i] for i, topic in enumerate(topics)}
+
     def _build_topic_map(self, coarse_chunks: List[Dict[str, Any]], topics: List[str], chunk_to_topic: List[int]) -> str:
         """Build topic map table with Start-End, Topic label, Why it matters, Listen if..."""
         if not coarse_chunks or not topics or not chunk_to_topic:
             return "## Topic Map / Outline\n\n(No content available)"
 
-        chunk_groups = {}
-
-        for i, topic in enumerate(topics):
-            topic_chunks = []
-            for j, chunk in enumerate(coarse_chunks):
-                if chunk_to_topic[j] == i:
-                    topic_chunks.append(chunk)
-            chunk_groups[topic] = topic_chunks
+        chunk_groups = self._group_chunks_by_topic(coarse_chunks, topics, chunk_to_topic)
 
         # Build table
         table_rows = ["| Timecodes | Topic |"]
@@ -1048,26 +1500,13 @@ All timestamps are clickable in supported markdown viewers and reference exact m
         for topic, chunks in chunk_groups.items():
             if not chunks:
                 continue
-            topic_start_timestamps = []
-            topic_start_timestamps.append(format_ts(chunks[0]["start"]))
-            topic_end_timestamps = []
-            i = 1
-            while i < len(chunks):
-                if chunks[i]["start"] > chunks[i-1]["end"] + 5: # 5 seconds of overlap
-                    topic_end_timestamps.append(format_ts(chunks[i-1]["end"]))
-                    topic_start_timestamps.append(format_ts(chunks[i]["start"]))
-                i += 1
-            topic_end_timestamps.append(format_ts(chunks[-1]["end"]))
-            if len(topic_start_timestamps) != len(topic_end_timestamps):
-                print(f"    Warning: Topic {topic} has different number of start and end timestamps")
-                continue
-            else: 
-                timecode_strings = []
-                for j in range(len(topic_start_timestamps)):
-                    timecode_string = f"[{topic_start_timestamps[j]}]"
-                    timecode_strings.append(timecode_string)
-                timecode_string = ", ".join(timecode_strings)
-                table_rows.append(f"| {timecode_string} | {topic} |")
+            # A new span starts wherever a chunk begins more than 5 seconds after the previous one ends
+            starts = np.fromiter((c["start"] for c in chunks), dtype=np.float64, count=len(chunks))
+            ends = np.fromiter((c["end"] for c in chunks), dtype=np.float64, count=len(chunks))
+            gap_idx = np.flatnonzero(starts[1:] > ends[:-1] + 5)
+            span_starts = starts[np.r_[0, gap_idx + 1]]
+            timecode_string = ", ".join(f"[{format_ts(start)}]" for start in span_starts)
+            table_rows.append(f"| {timecode_string} | {topic} |")
 
         return f"## Topic Map / Outline\n\n{chr(10).join(table_rows)}"
 
@@ -1086,78 +1525,103 @@ All timestamps are clickable in supported markdown viewers and reference exact m
         sections = ["## Deep Dive Notes\n"]
 
         # Process each topic
-        chunk_groups = {}  # chunk groups contain coarse chunks
+        chunk_groups = self._group_chunks_by_topic(coarse_chunks, topics, chunk_to_topic)  # coarse chunks per topic
 
-        for i, topic in enumerate(topics):
-            topic_chunks = []
-            for j, chunk in enumerate(coarse_chunks):
-                if chunk_to_topic[j] == i:
-                    topic_chunks.append(chunk)
-            chunk_groups[topic] = topic_chunks
+        # Get related fine chunks for detail
+        # For each coarse chunk in a topic, get fine chunks that start within the chunk's time range
+        sorted_fine, fine_starts = self._index_by_start(fine_chunks)
+        related_fine = {
+            topic: self._fine_chunks_within(chunk_groups[topic], sorted_fine, fine_starts) for topic in topics
+        }
 
-        for topic_idx, topic in enumerate(topics):
-            topic_chunks = chunk_groups[topic]
-            if not topic_chunks:
-                continue
+        system_message = DEEP_DIVE_SYSTEM_MESSAGE
+        packed_sections = self._pack_deep_dive_topics(topics, chunk_groups, related_fine, system_message)
+
+        # Topics are independent, so the remaining per-topic requests run concurrently;
+        # sections keep topic order
+        def run_topic(topic_idx: int) -> Optional[str]:
+            topic = topics[topic_idx]
+            if not chunk_groups[topic]:
+                return None
+            return self._deep_dive_topic(
+                topic, chunk_groups[topic], related_fine[topic], packed_sections.get(topic_idx), raw_segments
+            )
 
-            # Get related fine chunks for detail
-            # For each coarse chunk in topic_chunks, get fine chunks that start within the chunk's time range
-            related_fine_chunks = []
-            for coarse_chunk in topic_chunks:
-                for fine_chunk in fine_chunks:
-                    if coarse_chunk["start"] <= fine_chunk["start"] <= coarse_chunk["end"]:
-                        related_fine_chunks.append(fine_chunk)
+        with ThreadPoolExecutor(max_workers=max(1, min(MAX_PARALLEL_TOPICS, len(topics)))) as pool:
+            for topic_section in pool.map(run_topic, range(len(topics))):
+                if topic_section is not None:
+                    sections.append(topic_section)
 
-            # Select chunks within token limit for this topic
-            base_prompt_template = DEEP_DIVE_BASE_PROMPT_TEMPLATE
-            base_prompt = base_prompt_template.format(topic=topic, chunks="{chunks}")
+        return "\n\n".join(sections)
 
-            # Select chunks within token limit
-            # selected_topic_chunks = self._select_chunks_within_limit(topic_chunks, base_prompt)
-            system_message = DEEP_DIVE_SYSTEM_MESSAGE
+    def _deep_dive_topic(
+        self,
+        topic: str,
+        topic_chunks: List[Dict[str, Any]],
+        related_fine_chunks: List[Dict[str, Any]],
+        packed_section: Optional[str],
+        raw_segments: List[Dict[str, Any]],
+    ) -> Optional[str]:
+        """
+        Write the deep dive section for one topic, falling back to batching or a stub on failure.
+        
+        Args:
+            topic: Topic name
+            topic_chunks: Coarse chunks assigned to the topic
+            related_fine_chunks: Fine chunks within those coarse chunks
+            packed_section: Section already answered in a packed request, if any
+            raw_segments: Original transcript segments (for timestamp verification)
+            
+        Returns:
+            Section markdown, or None if nothing could be produced
+        """
+        system_message = DEEP_DIVE_SYSTEM_MESSAGE
 
-            try:
-                # Try single request first
-                if self._can_fit_in_single_request(related_fine_chunks, base_prompt):
-                    if self.verbose:
-                        print(f"      Processing topic '{topic}' with {len(related_fine_chunks)} chunks...")
-                    chunk_content = "\n\n".join(
-                        f"[{format_ts(c['start'])}[-[{format_ts(c['end'])}] {c['text']}"
-                        for c in related_fine_chunks
-                    )
-                    # base_prompt already has {topic} filled, now fill {chunks}
-                    prompt = base_prompt.format(chunks=chunk_content)
-                    
-                    messages = [
-                        {"role": "system", "content": system_message},
-                        {"role": "user", "content": prompt},
-                    ]
-                    
-                    # Rate limiting: estimate tokens and wait if needed
-                    estimated_tokens = self._count_message_tokens(messages)
-                    self._wait_if_needed(estimated_tokens)
-                    
-                    response = self.client.chat.completions.create(
-                        model=self.model,
-                        messages=messages,
-                        # temperature=0.4,
-                    )
-                    
-                    # Record actual token usage
-                    if hasattr(response, 'usage') and response.usage:
-                        input_tokens = getattr(response.usage, 'prompt_tokens', estimated_tokens)
-                        output_tokens = getattr(response.usage, 'completion_tokens', 0)
-                    else:
-                        # Fallback to estimate if usage info not available
-                        input_tokens = estimated_tokens
-                        output_tokens = 0
-                    
-                    self._record_request(input_tokens, output_tokens)
-                    if self.verbose:
-                        print(f"      ✓ Topic '{topic}' completed ({input_tokens:,} input, {output_tokens:,} output tokens)")
-                    topic_section = response.choices[0].message.content.strip()
-                else:
-                    # Use batching if needed
+        # Select chunks within token limit for this topic
+        base_prompt_template = DEEP_DIVE_BASE_PROMPT_TEMPLATE
+        base_prompt = base_prompt_template.format(topic=topic, chunks="{chunks}")
+
+        # Select chunks within token limit
+        # selected_topic_chunks = self._select_chunks_within_limit(topic_chunks, base_prompt)
+
+        try:
+            if packed_section is not None:
+                # Answered together with other small topics
+                topic_section = packed_section
+            # Try single request first
+            elif self._can_fit_in_single_request(related_fine_chunks, base_prompt):
+                if self.verbose:
+                    print(f"      Processing topic '{topic}' with {len(related_fine_chunks)} chunks...")
+                prompt = self._deep_dive_prompt(topic, related_fine_chunks)
+                
+                messages = [
+                    {"role": "system", "content": system_message},
+                    {"role": "user", "content": prompt},
+                ]
+                
+                # Rate limiting: estimate tokens and wait if needed (skipped on a cache hit)
+                estimated_tokens = self._count_message_tokens(messages)
+                content, input_tokens, output_tokens = self._complete(messages, estimated_tokens)
+                if self.verbose:
+                    print(f"      ✓ Topic '{topic}' completed ({input_tokens:,} input, {output_tokens:,} output tokens)")
+                topic_section = content.strip()
+            else:
+                # Use batching if needed
+                topic_section = self._summarize_with_batching(
+                    topic_chunks, 
+                    base_prompt, 
+                    system_message,
+                    merge_strategy="selective", 
+                    # temperature=0.4
+                )
+            
+            # Verify timestamps
+            topic_section = self._verify_timestamps(topic_section, raw_segments)
+            return topic_section
+        except BadRequestError as e:
+            if "context_length_exceeded" in str(e).lower():
+                print(f"    Context limit exceeded for topic '{topic}', retrying with batching...")
+                try:
                     topic_section = self._summarize_with_batching(
                         topic_chunks, 
                         base_prompt, 
@@ -1165,85 +1629,94 @@ All timestamps are clickable in supported markdown viewers and reference exact m
                         merge_strategy="selective", 
                         # temperature=0.4
                     )
-                
-                # Verify timestamps
-                topic_section = self._verify_timestamps(topic_section, raw_segments)
-                sections.append(topic_section)
-            except BadRequestError as e:
-                if "context_length_exceeded" in str(e).lower():
-                    print(f"    Context limit exceeded for topic '{topic}', retrying with batching...")
-                    try:
-                        topic_section = self._summarize_with_batching(
-                            topic_chunks, 
-                            base_prompt, 
-                            system_message,
-                            merge_strategy="selective", 
-                            # temperature=0.4
-                        )
-                        topic_section = self._verify_timestamps(topic_section, raw_segments)
-                        sections.append(topic_section)
-                    except Exception as retry_error:
-                        print(f"    Warning: Deep dive generation with batching failed for topic '{topic}': {retry_error}")
-                        # Fallback
-                        first_chunk = topic_chunks[0] if topic_chunks else None
-                        if first_chunk:
-                            sections.append(
-                                f"""### {topic}
-
-**Key Claims + Reasoning:**
-- [{format_ts(first_chunk['start'])}] {first_chunk['text'][:200]}...
-
-**Examples/Stories:**
-- (Content extraction failed)
-
-**Counterpoints / Nuance:**
-- (Content extraction failed)
-
-**Practical Takeaways:**
-- (Content extraction failed)"""
-                            )
-                else:
-                    print(f"    Warning: Deep dive generation failed for topic '{topic}': {e}")
+                    topic_section = self._verify_timestamps(topic_section, raw_segments)
+                    return topic_section
+                except Exception as retry_error:
+                    print(f"    Warning: Deep dive generation with batching failed for topic '{topic}': {retry_error}")
                     # Fallback
-                    first_chunk = topic_chunks[0] if topic_chunks else None
-                    if first_chunk:
-                        sections.append(
-                            f"""### {topic}
-
-**Key Claims + Reasoning:**
-- [{format_ts(first_chunk['start'])}] {first_chunk['text'][:200]}...
-
-**Examples/Stories:**
-- (Content extraction failed)
-
-**Counterpoints / Nuance:**
-- (Content extraction failed)
-
-**Practical Takeaways:**
-- (Content extraction failed)"""
-                        )
-            except Exception as e:
+                    return self._deep_dive_fallback(topic, topic_chunks)
+            else:
                 print(f"    Warning: Deep dive generation failed for topic '{topic}': {e}")
                 # Fallback
-                first_chunk = topic_chunks[0] if topic_chunks else None
-                if first_chunk:
-                    sections.append(
-                        f"""### {topic}
-
-**Key Claims + Reasoning:**
-- [{format_ts(first_chunk['start'])}] {first_chunk['text'][:200]}...
-
-**Examples/Stories:**
-- (Content extraction failed)
+                return self._deep_dive_fallback(topic, topic_chunks)
+        except Exception as e:
+            print(f"    Warning: Deep dive generation failed for topic '{topic}': {e}")
+            # Fallback
+            return self._deep_dive_fallback(topic, topic_chunks)
+
+    def _deep_dive_fallback(self, topic: str, topic_chunks: List[Dict[str, Any]]) -> Optional[str]:
+        """Stub section for a topic whose deep dive failed (None if the topic has no chunks)."""
+        if not topic_chunks:
+            return None
+        first_chunk = topic_chunks[0]
+        return _DEEP_DIVE_FALLBACK_TEMPLATE.format(
+            topic=topic, ts=format_ts(first_chunk["start"]), text=first_chunk["text"][:200]
+        )
+
+    def _deep_dive_prompt(self, topic: str, related_fine_chunks: List[Dict[str, Any]]) -> str:
+        """Single-request deep dive prompt for one topic."""
+        chunk_content = "\n\n".join(
+            f"[{format_ts(c['start'])}[-[{format_ts(c['end'])}] {c['text']}"
+            for c in related_fine_chunks
+        )
+        return DEEP_DIVE_BASE_PROMPT_TEMPLATE.format(topic=topic, chunks=chunk_content)
+
+    def _pack_deep_dive_topics(
+        self,
+        topics: List[str],
+        chunk_groups: Dict[str, List[Dict[str, Any]]],
+        related_fine: Dict[str, List[Dict[str, Any]]],
+        system_message: str,
+    ) -> Dict[int, str]:
+        """
+        Answer small deep-dive topics in packed requests (see _batch_chat).
 
-**Counterpoints / Nuance:**
-- (Content extraction failed)
+        Topics are packed in order while their combined prompt tokens stay within
+        DEEP_DIVE_PACK_MAX_TOKENS; larger topics are left to the per-topic path.
 
-**Practical Takeaways:**
-- (Content extraction failed)"""
-                    )
+        Args:
+            topics: Topic names
+            chunk_groups: Coarse chunks per topic
+            related_fine: Fine chunks per topic
+            system_message: Deep dive system message
 
-        return "\n\n".join(sections)
+        Returns:
+            Mapping of topic index to section text, for topics answered in a packed request
+        """
+        groups: List[List[Tuple[int, str]]] = []
+        current: List[Tuple[int, str]] = []
+        current_tokens = 0
+        for topic_idx, topic in enumerate(topics):
+            if not chunk_groups[topic]:
+                continue
+            prompt = self._deep_dive_prompt(topic, related_fine[topic])
+            tokens = self._count_tokens(prompt)
+            if tokens > DEEP_DIVE_PACK_MAX_TOKENS // 2:
+                continue
+            if current and current_tokens + tokens > DEEP_DIVE_PACK_MAX_TOKENS:
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append((topic_idx, prompt))
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+
+        packed = {}
+        for group in groups:
+            if len(group) < 2:
+                continue
+            if self.verbose:
+                print(f"      Processing {len(group)} topics in one packed request...")
+            try:
+                answers = self._batch_chat([prompt for _, prompt in group], system_message)
+            except Exception as e:
+                print(f"    Warning: Packed deep dive request failed: {e}")
+                answers = None
+            if answers is None:
+                continue
+            for (topic_idx, _), answer in zip(group, answers):
+                packed[topic_idx] = answer.strip()
+        return packed
 
     def _build_frameworks(
         self,
@@ -1258,22 +1731,15 @@ All timestamps are clickable in supported markdown viewers and reference exact m
         # Look for chunks that might contain frameworks (step-by-step, numbered lists, etc.)
         framework_chunks = []
         for chunk in coarse_chunks:
-            text_lower = chunk["text"].lower()
-            if any(
-                keyword in text_lower
-                for keyword in ["step", "framework", "checklist", "process", "method", "how to", "first", "second", "third"]
-            ):
+            if _FRAMEWORK_KEYWORD_RE.search(chunk["text"]):
                 framework_chunks.append(chunk)
 
         if not framework_chunks:
             return "## Actionable Frameworks / Checklists\n\n(No frameworks found in transcript)"
 
         # Get related fine chunks for framework chunks
-        related_fine_chunks = []
-        for chunk in framework_chunks:
-            for fine_chunk in fine_chunks:
-                if chunk["start"] <= fine_chunk["start"] <= chunk["end"]:
-                    related_fine_chunks.append(fine_chunk)
+        sorted_fine, fine_starts = self._index_by_start(fine_chunks)
+        related_fine_chunks = self._fine_chunks_within(framework_chunks, sorted_fine, fine_starts)
         
 
         base_prompt = FRAMEWORK_EXTRACTION_BASE_PROMPT
@@ -1287,10 +1753,7 @@ All timestamps are clickable in supported markdown viewers and reference exact m
             if self._can_fit_in_single_request(related_fine_chunks, base_prompt):
                     if self.verbose:
                         print(f"    Extracting frameworks from {len(related_fine_chunks)} candidate chunks...")
-                    chunk_texts = "\n\n".join(
-                        f"[{format_ts(c['start'])}]-[{format_ts(c['end'])}] {c['text']}" 
-                        for c in related_fine_chunks
-                    )
+                    chunk_texts = "\n\n".join(self._render_chunk(c) for c in related_fine_chunks)
                     prompt = base_prompt.format(chunks=chunk_texts)
                     
                     messages = [
@@ -1298,29 +1761,12 @@ All timestamps are clickable in supported markdown viewers and reference exact m
                         {"role": "user", "content": prompt},
                     ]
                     
-                    # Rate limiting: estimate tokens and wait if needed
+                    # Rate limiting: estimate tokens and wait if needed (skipped on a cache hit)
                     estimated_tokens = self._count_message_tokens(messages)
-                    self._wait_if_needed(estimated_tokens)
-                    
-                    response = self.client.chat.completions.create(
-                        model=self.model,
-                        messages=messages,
-                        # temperature=0.3,
-                    )
-                    
-                    # Record actual token usage
-                    if hasattr(response, 'usage') and response.usage:
-                        input_tokens = getattr(response.usage, 'prompt_tokens', estimated_tokens)
-                        output_tokens = getattr(response.usage, 'completion_tokens', 0)
-                    else:
-                        # Fallback to estimate if usage info not available
-                        input_tokens = estimated_tokens
-                        output_tokens = 0
-                    
-                    self._record_request(input_tokens, output_tokens)
+                    content, input_tokens, output_tokens = self._complete(messages, estimated_tokens)
                     if self.verbose:
                         print(f"    ✓ Framework extraction completed ({input_tokens:,} input, {output_tokens:,} output tokens)")
-                    frameworks = response.choices[0].message.content.strip()
+                    frameworks = content.strip()
             else:
                 # Use batching if needed
                 frameworks = self._summarize_with_batching(
@@ -1377,24 +1823,20 @@ All timestamps are clickable in supported markdown viewers and reference exact m
         if not raw_segments:
             return "## Memorable Quotes\n\n(No quotes found)"
 
-        # Look for segments with quotes or memorable phrases (short segments, punctuation)
-        quote_candidates = []
-        for seg in raw_segments:
-            text = seg["text"].strip()
+        # Look for segments with quotes or memorable phrases (short segments, punctuation).
+        # Only 15 quotes are shown, so scanning stops once that many are found.
+        def is_quotable(text: str) -> bool:
             # Prefer segments that look quotable (contain quotes, are short statements, etc.)
-            if (
-                ('"' in text or "'" in text)
-                and len(text) < 200
-                and any(punct in text for punct in [".", "!", "?"])
-            ):
-                quote_candidates.append(seg)
+            return len(text) < 200 and ('"' in text or "'" in text) and any(punct in text for punct in ".!?")
+
+        quote_candidates = list(islice((seg for seg in raw_segments if is_quotable(seg["text"].strip())), 15))
 
         if not quote_candidates:
             # Fallback: use short segments
-            quote_candidates = [seg for seg in raw_segments if len(seg["text"].strip()) < 150][:10]
+            quote_candidates = list(islice((seg for seg in raw_segments if len(seg["text"].strip()) < 150), 10))
 
         quotes_section = ["## Memorable Quotes\n"]
-        for seg in quote_candidates[:15]:  # Limit to 15 quotes
+        for seg in quote_candidates:  # Limit to 15 quotes
             quote_text = seg["text"].strip()
             # Clean up the quote
             if quote_text.startswith(">>") or quote_text.startswith(">"):
@@ -1408,7 +1850,9 @@ All timestamps are clickable in supported markdown viewers and reference exact m
         if not coarse_chunks:
             return "## If you only have 15/30/60 minutes\n\n(No content available)"
 
-        total_duration = coarse_chunks[-1]["end"] if coarse_chunks else 0
+        # Coarse chunks are sequential, so their end times are sorted and can be bisected
+        chunk_ends = [c["end"] for c in coarse_chunks]
+        total_duration = chunk_ends[-1]
         duration_15 = 15 * 60
         duration_30 = 30 * 60
         duration_60 = 60 * 60
@@ -1417,7 +1861,7 @@ All timestamps are clickable in supported markdown viewers and reference exact m
 
         # 15 minute path (first portion)
         if total_duration > duration_15:
-            end_idx = next((i for i, c in enumerate(coarse_chunks) if c["end"] > duration_15), len(coarse_chunks))
+            end_idx = bisect.bisect_right(chunk_ends, duration_15)
             path_chunks = coarse_chunks[:end_idx]
             start_ts = format_ts(path_chunks[0]["start"]) if path_chunks else "00:00:00"
             end_ts = format_ts(path_chunks[-1]["end"]) if path_chunks else format_ts(duration_15)
@@ -1427,7 +1871,7 @@ All timestamps are clickable in supported markdown viewers and reference exact m
 
         # 30 minute path (first half)
         if total_duration > duration_30:
-            end_idx = next((i for i, c in enumerate(coarse_chunks) if c["end"] > duration_30), len(coarse_chunks))
+            end_idx = bisect.bisect_right(chunk_ends, duration_30)
             path_chunks = coarse_chunks[:end_idx]
             start_ts = format_ts(path_chunks[0]["start"]) if path_chunks else "00:00:00"
             end_ts = format_ts(path_chunks[-1]["end"]) if path_chunks else format_ts(duration_30)
@@ -1447,31 +1891,40 @@ All timestamps are clickable in supported markdown viewers and reference exact m
         else:
             # Full video is less than 60 minutes
             start_ts = format_ts(coarse_chunks[0]["start"]) if coarse_chunks else "00:00:00"
-            end_ts = format_ts(coarse_chunks[-1]["end"]) if coarse_chunks else "00:00:00"
+            end_ts = format_ts(total_duration)
             sections.append(f"### Full video ({format_ts(total_duration)}): [{start_ts} - {end_ts}]")
             sections.append("Complete discussion")
 
         return "\n".join(sections)
 
+    def _segment_start_times(self, raw_segments: List[Dict[str, Any]]) -> List[float]:
+        """Sorted segment start times, computed once per transcript and reused by every pass."""
+        cached = self._segment_starts
+        if cached is not None and cached[0] is raw_segments and cached[1] == len(raw_segments):
+            return cached[2]
+        starts = sorted(seg["start"] for seg in raw_segments)
+        self._segment_starts = (raw_segments, len(raw_segments), starts)
+        return starts
+
     def _verify_timestamps(self, text: str, raw_segments: List[Dict[str, Any]]) -> str:
         """
         Verify timestamps in text exist in raw_segments.
         This is a basic check - in production, could be more sophisticated.
         """
         # Extract timestamps from text (format [HH:MM:SS])
-        import re
-
-        timestamp_pattern = r"\[(\d{2}):(\d{2}):(\d{2})\]"
-        timestamps = re.findall(timestamp_pattern, text)
+        timestamps = _TIMESTAMP_RE.findall(text)
 
         # Convert timestamps to seconds
-        segment_times = [seg["start"] for seg in raw_segments]
+        segment_times = self._segment_start_times(raw_segments)
         valid_times = set()
 
         for h, m, s in timestamps:
             total_seconds = int(h) * 3600 + int(m) * 60 + int(s)
-            # Check if timestamp is within 30 seconds of any segment (for flexibility)
-            if any(abs(total_seconds - seg_time) < 30 for seg_time in segment_times):
+            # Check if timestamp is within 30 seconds of any segment (for flexibility):
+            # only the nearest segment start on either side can be
+            pos = bisect.bisect_left(segment_times, total_seconds)
+            nearest = segment_times[max(0, pos - 1):pos + 1]
+            if any(abs(total_seconds - seg_time) < 30 for seg_time in nearest):
                 valid_times.add((h, m, s))
 
         # If many invalid timestamps, return text as-is (better than corrupting content)
@@ -1489,9 +1942,8 @@ All timestamps are clickable in supported markdown viewers and reference exact m
         Returns:
             Markdown text with timestamps converted to hyperlinks
         """
-        import re
-        
-        timestamp_pattern = r"\[(\d{2}):(\d{2}):(\d{2})\]"
+        # Ensure URL separator (use & if ? already present, otherwise ?)
+        link_prefix = f"{video_url}{'&' if '?' in video_url else '?'}t="
         
         def replace_timestamp(match):
             h, m, s = match.groups()
@@ -1499,10 +1951,7 @@ All timestamps are clickable in supported markdown viewers and reference exact m
             total_seconds = int(h) * 3600 + int(m) * 60 + int(s)
             # Create hyperlink: [HH:MM:SS](url&t=seconds)
             timestamp_text = match.group(0)  # [HH:MM:SS]
-            # Ensure URL separator (use & if ? already present, otherwise ?)
-            separator = "&" if "?" in video_url else "?"
-            link_url = f"{video_url}{separator}t={total_seconds}"
-            return f"[{timestamp_text}]({link_url})"
+            return f"[{timestamp_text}]({link_prefix}{total_seconds})"
         
         # Replace all timestamps with hyperlinks
-        return re.sub(timestamp_pattern, replace_timestamp, text)
+        return _TIMESTAMP_RE.sub(replace_timestamp, text)
@@ -0,0 +1,67 @@
+"""
+Small in-memory cache with LRU eviction and per-entry expiry.
+
+Used to short-circuit repeated chat queries within a session.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a fixed time-to-live."""
+
+    def __init__(self, max_items: int = 2048, ttl_sec: float = 900):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_items: Maximum number of entries kept before evicting the least recently used
+            ttl_sec: Seconds an entry stays valid after it is stored
+        """
+        self.max_items = max_items
+        self.ttl_sec = ttl_sec
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value, or None if missing or expired
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entry if the cache is full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        self._data[key] = (time.monotonic() + self.ttl_sec, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.max_items:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -8,23 +8,119 @@ from __future__ import annotations
 
 import sqlite3
 import json
+import os
 from typing import List, Dict, Any, Optional
+import numpy as np
+
+# Try to import sqlite-vec for in-database KNN search
+try:
+    import sqlite_vec
+    SQLITE_VEC_AVAILABLE = True
+except ImportError:
+    SQLITE_VEC_AVAILABLE = False
+
+# Set POD2CHAT_USE_VEC_INDEX=0 to force the brute-force matrix search
+USE_VEC_INDEX = os.getenv("POD2CHAT_USE_VEC_INDEX", "1") == "1"
+
+# Absolute db_path -> [store, refcount] for stores opened with VectorStore.shared
+_SHARED_STORES: Dict[str, list] = {}
+
+
+def quantize_int8(embedding: Any) -> tuple[bytes, float]:
+    """
+    Symmetrically quantize an embedding to int8 with a per-vector scale.
+    
+    Args:
+        embedding: Embedding vector (list or array)
+        
+    Returns:
+        Tuple of (int8 bytes, scale) where embedding ~= int8_values * scale
+    """
+    vec = np.asarray(embedding, dtype=np.float32)
+    scale = float(np.abs(vec).max()) / 127.0 if vec.size else 0.0
+    if scale == 0.0:
+        return np.zeros(vec.shape, dtype=np.int8).tobytes(), 1.0
+    q = np.clip(np.round(vec / scale), -127, 127).astype(np.int8)
+    return q.tobytes(), scale
+
+
+def dequantize_int8(blob: bytes, scale: float) -> np.ndarray:
+    """Reconstruct a float32 embedding from int8 bytes and its scale."""
+    return np.frombuffer(blob, dtype=np.int8).astype(np.float32) * np.float32(scale)
+
+
+def fts5_quote_terms(text: str, operator: str = " ") -> str:
+    """
+    Turn free text into an FTS5 query over its words.
+    
+    Each whitespace-separated term is wrapped in double quotes (embedded quotes doubled),
+    so punctuation and FTS5 operators in user input are matched literally.
+    
+    Args:
+        text: Free-text query
+        operator: Joiner between terms; the default matches all words, " OR " matches any
+        
+    Returns:
+        FTS5 query string, empty if the text has no terms
+    """
+    return operator.join('"' + term.replace('"', '""') + '"' for term in text.split())
 
 
 class VectorStore:
     """SQLite-based vector store with FTS5 for full-text search."""
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, quantize: bool = True):
         """
         Initialize vector store with SQLite database.
         
         Args:
             db_path: Path to SQLite database file
+            quantize: Store new embeddings as int8 with a per-vector scale (4x smaller than float32);
+                otherwise store them as float32 bytes
         """
         self.db_path = db_path
+        self.quantize = quantize
+        self._shared_key: Optional[str] = None
         self.conn = sqlite3.connect(db_path)
         self.conn.row_factory = sqlite3.Row  # Return rows as dict-like objects
+        # WAL + NORMAL sync avoids an fsync per commit; temp structures stay in memory
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        # Read pages through a 256 MB memory map and keep a 64 MB page cache
+        self.conn.execute("PRAGMA mmap_size=268435456")
+        self.conn.execute("PRAGMA cache_size=-65536")
+        # (video_url, tier) -> (fingerprint, row ids, normalized embedding matrix, time spans)
+        self._matrix_cache: Dict[tuple, tuple] = {}
+        # Bumped on every insert_chunks call; upserts keep row ids, so counts alone miss updates
+        self._write_count = 0
         self.create_tables()
+        self._vec_enabled = USE_VEC_INDEX and self._load_vec_extension()
+        if self._vec_enabled:
+            self._upgrade_vec_table()
+
+    @classmethod
+    def shared(cls, db_path: str) -> "VectorStore":
+        """
+        Get a reference-counted store shared by every caller using the same database.
+        
+        Reuses the open connection and cached search matrices; the connection closes
+        when the last holder calls close().
+        
+        Args:
+            db_path: Path to SQLite database file
+            
+        Returns:
+            Shared VectorStore instance
+        """
+        key = os.path.abspath(db_path)
+        entry = _SHARED_STORES.get(key)
+        if entry is None:
+            store = cls(db_path)
+            store._shared_key = key
+            entry = _SHARED_STORES[key] = [store, 0]
+        entry[1] += 1
+        return entry[0]
 
     def create_tables(self) -> None:
         """Create chunks table and FTS5 virtual table with triggers."""
@@ -43,6 +139,7 @@ class VectorStore:
                 text TEXT NOT NULL,
                 segment_ids TEXT NOT NULL,
                 embedding BLOB,
+                emb_scale REAL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
@@ -56,6 +153,13 @@ class VectorStore:
             # Column already exists, ignore
             pass
         
+        # Add emb_scale column if it doesn't exist (NULL = float32 bytes, or JSON floats in older rows)
+        try:
+            cursor.execute("ALTER TABLE chunks ADD COLUMN emb_scale REAL")
+        except sqlite3.OperationalError:
+            # Column already exists, ignore
+            pass
+        
         # Create index on chunk_id for faster lookups
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_chunk_id ON chunks(chunk_id)
@@ -90,22 +194,158 @@ class VectorStore:
             END
         """)
         
-        # Trigger to keep FTS5 in sync when updating
+        # Update/delete triggers remove just the old row's index entry instead of
+        # rebuilding the whole FTS table; drop the rebuild-based ones older databases have
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'chunks_ad'")
+        existing = cursor.fetchone()
+        cursor.execute("DROP TRIGGER IF EXISTS chunks_au")
+        cursor.execute("DROP TRIGGER IF EXISTS chunks_ad")
+        if existing and "rebuild" in existing[0]:
+            # Rows replaced under the old triggers may have left stale index entries
+            cursor.execute("INSERT INTO chunks_fts(chunks_fts) VALUES('rebuild')")
+        
+        # Trigger to keep FTS5 in sync when an indexed column actually changes
         cursor.execute("""
-            CREATE TRIGGER IF NOT EXISTS chunks_au AFTER UPDATE ON chunks BEGIN
-                INSERT INTO chunks_fts(chunks_fts) VALUES('rebuild');
+            CREATE TRIGGER chunks_au AFTER UPDATE OF chunk_id, text, tier ON chunks
+            WHEN old.chunk_id IS NOT new.chunk_id OR old.text IS NOT new.text OR old.tier IS NOT new.tier
+            BEGIN
+                INSERT INTO chunks_fts(chunks_fts, rowid, chunk_id, text, tier)
+                VALUES ('delete', old.id, old.chunk_id, old.text, old.tier);
+                INSERT INTO chunks_fts(rowid, chunk_id, text, tier)
+                VALUES (new.id, new.chunk_id, new.text, new.tier);
             END
         """)
         
         # Trigger to keep FTS5 in sync when deleting
         cursor.execute("""
-            CREATE TRIGGER IF NOT EXISTS chunks_ad AFTER DELETE ON chunks BEGIN
-                INSERT INTO chunks_fts(chunks_fts) VALUES('rebuild');
+            CREATE TRIGGER chunks_ad AFTER DELETE ON chunks BEGIN
+                INSERT INTO chunks_fts(chunks_fts, rowid, chunk_id, text, tier)
+                VALUES ('delete', old.id, old.chunk_id, old.text, old.tier);
             END
         """)
         
         self.conn.commit()
 
+    def _load_vec_extension(self) -> bool:
+        """Load the sqlite-vec extension into this connection. Returns False if unavailable."""
+        if not SQLITE_VEC_AVAILABLE:
+            return False
+        try:
+            self.conn.enable_load_extension(True)
+            sqlite_vec.load(self.conn)
+            self.conn.enable_load_extension(False)
+            return True
+        except (AttributeError, sqlite3.Error) as e:
+            # Some Python builds ship sqlite3 without extension loading
+            print(f"    Warning: sqlite-vec unavailable, using brute-force search: {e}")
+            return False
+
+    def _vec_table_dim(self) -> Optional[int]:
+        """Embedding dimension of the vec_chunks index, or None if it doesn't exist yet."""
+        row = self.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'vec_chunks'"
+        ).fetchone()
+        if row is None:
+            return None
+        # Declared as "embedding float[<dim>] ..."
+        sql = row[0]
+        return int(sql[sql.index("float[") + 6:sql.index("]", sql.index("float["))])
+
+    def _upgrade_vec_table(self) -> None:
+        """Rebuild a vec_chunks index created before it had a tier column."""
+        row = self.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'vec_chunks'"
+        ).fetchone()
+        if row is None or "tier text" in row[0]:
+            return
+        dim = self._vec_table_dim()
+        try:
+            with self.conn:
+                self.conn.execute("DROP TABLE vec_chunks")
+                self._create_vec_table(dim)
+        except sqlite3.Error as e:
+            print(f"    Warning: vec index upgrade failed, using brute-force search: {e}")
+            self._vec_enabled = False
+
+    def _create_vec_table(self, dim: int) -> None:
+        """
+        Create the vec0 KNN index and backfill it from every embedded chunk.
+        
+        Args:
+            dim: Embedding dimension of the index
+        """
+        self.conn.execute(
+            f"CREATE VIRTUAL TABLE vec_chunks USING vec0("
+            f"embedding float[{dim}] distance_metric=cosine, video_url text, tier text)"
+        )
+        rows = self.conn.execute(
+            "SELECT id, video_url, tier, embedding, emb_scale FROM chunks WHERE embedding IS NOT NULL"
+        ).fetchall()
+        backfill = []
+        for row in rows:
+            try:
+                vec = np.asarray(self._decode_embedding(row["embedding"], row["emb_scale"]), dtype=np.float32)
+            except (json.JSONDecodeError, TypeError, ValueError):
+                continue
+            if vec.shape == (dim,):
+                backfill.append((row["id"], vec.tobytes(), row["video_url"] or "", row["tier"]))
+        self.conn.executemany(
+            "INSERT INTO vec_chunks (rowid, embedding, video_url, tier) VALUES (?, ?, ?, ?)", backfill
+        )
+
+    def _write_vec_index(self, rows: List[tuple], old_ids: List[int]) -> None:
+        """
+        Mirror freshly inserted chunks into the vec_chunks index (dual write).
+        
+        Args:
+            rows: Rows just written by insert_chunks
+            old_ids: Row ids the upsert overwrote, whose index entries are now stale
+        """
+        embedded = [row for row in rows if row[8] is not None]
+        if not embedded:
+            return
+        
+        # Last write wins for duplicate chunk_ids, matching the upsert
+        latest = {row[2]: row for row in embedded}
+        vectors = {
+            chunk_id: np.asarray(self._decode_embedding(row[8], row[9]), dtype=np.float32)
+            for chunk_id, row in latest.items()
+        }
+        dim = next(iter(vectors.values())).shape[0]
+        
+        with self.conn:
+            index_dim = self._vec_table_dim()
+            if index_dim is None:
+                # First write: the backfill picks up these rows along with any older ones
+                self._create_vec_table(dim)
+                return
+            if index_dim != dim:
+                print("    Warning: Embedding dimension differs from vec index, skipping index update")
+                return
+            if old_ids:
+                self.conn.executemany("DELETE FROM vec_chunks WHERE rowid = ?", [(i,) for i in old_ids])
+            new_ids = self._ids_for_chunk_ids(list(vectors))
+            params = []
+            for chunk_id, vec in vectors.items():
+                if chunk_id in new_ids and vec.shape == (dim,):
+                    params.append((new_ids[chunk_id], vec.tobytes(), latest[chunk_id][1], latest[chunk_id][3]))
+            self.conn.executemany(
+                "INSERT INTO vec_chunks (rowid, embedding, video_url, tier) VALUES (?, ?, ?, ?)", params
+            )
+
+    def _ids_for_chunk_ids(self, chunk_ids: List[str]) -> Dict[str, int]:
+        """Map chunk_ids to their current row ids."""
+        found = {}
+        # Stay well below SQLite's host-parameter limit
+        for i in range(0, len(chunk_ids), 500):
+            batch = chunk_ids[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+            for row in self.conn.execute(
+                f"SELECT id, chunk_id FROM chunks WHERE chunk_id IN ({placeholders})", batch
+            ):
+                found[row["chunk_id"]] = row["id"]
+        return found
+
     def insert_chunks(self, chunks_with_embeddings: List[Dict[str, Any]], video_id: str, video_url: str) -> None:
         """
         Insert chunks with embeddings into the database.
@@ -118,9 +358,7 @@ class VectorStore:
         if not chunks_with_embeddings:
             return
         
-        cursor = self.conn.cursor()
-        
-        inserted = 0
+        rows = []
         for chunk in chunks_with_embeddings:
             chunk_id = chunk.get("chunk_id")
             tier = chunk.get("tier", "fine")
@@ -130,20 +368,62 @@ class VectorStore:
             segment_ids = json.dumps(chunk.get("segment_ids", []))
             embedding = chunk.get("embedding")
             
-            # Store embedding as JSON string
-            embedding_json = json.dumps(embedding) if embedding else None
+            # Store the unit-length embedding as int8 bytes + scale, or as raw float32 bytes
+            # when not quantizing; cosine similarity is then a plain dot product
+            emb_scale = None
+            if embedding is None or not len(embedding):
+                embedding_value = None
+            else:
+                vec = np.asarray(embedding, dtype=np.float32)
+                norm = float(np.linalg.norm(vec))
+                if norm > 0:
+                    vec = vec / norm
+                if self.quantize:
+                    embedding_value, emb_scale = quantize_int8(vec)
+                else:
+                    embedding_value = vec.tobytes()
             
+            rows.append((video_id, video_url, chunk_id, tier, start, end, text, segment_ids, embedding_value, emb_scale))
+        
+        insert_sql = """
+            INSERT INTO chunks
+            (video_id, video_url, chunk_id, tier, start, end, text, segment_ids, embedding, emb_scale)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(chunk_id) DO UPDATE SET
+                video_id = excluded.video_id, video_url = excluded.video_url, tier = excluded.tier,
+                start = excluded.start, end = excluded.end, text = excluded.text,
+                segment_ids = excluded.segment_ids, embedding = excluded.embedding, emb_scale = excluded.emb_scale
+        """
+        
+        # Rows about to be overwritten; their vec index entries must go too
+        old_ids = list(self._ids_for_chunk_ids([row[2] for row in rows]).values()) if self._vec_enabled else []
+        
+        # Insert all rows in a single transaction
+        try:
+            with self.conn:
+                self.conn.executemany(insert_sql, rows)
+            inserted = len(rows)
+        except sqlite3.Error as e:
+            # Fall back to row-by-row so one bad chunk doesn't drop the whole batch
+            print(f"    Warning: Bulk insert failed ({e}), inserting chunks individually...")
+            inserted = 0
+            cursor = self.conn.cursor()
+            for row in rows:
+                try:
+                    cursor.execute(insert_sql, row)
+                    inserted += 1
+                except sqlite3.Error as row_error:
+                    print(f"    Warning: Failed to insert chunk {row[2]}: {row_error}")
+            self.conn.commit()
+        
+        if self._vec_enabled:
             try:
-                cursor.execute("""
-                    INSERT OR REPLACE INTO chunks 
-                    (video_id, video_url, chunk_id, tier, start, end, text, segment_ids, embedding)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (video_id, video_url, chunk_id, tier, start, end, text, segment_ids, embedding_json))
-                inserted += 1
+                self._write_vec_index(rows, old_ids)
             except sqlite3.Error as e:
-                print(f"    Warning: Failed to insert chunk {chunk_id}: {e}")
+                print(f"    Warning: vec index update failed, using brute-force search: {e}")
+                self._vec_enabled = False
         
-        self.conn.commit()
+        self._write_count += 1
         print(f"    Inserted {inserted}/{len(chunks_with_embeddings)} chunks into vector store")
 
     def search_text(self, query: str, video_url: Optional[str] = None, limit: int = 10, tier: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -151,7 +431,7 @@ class VectorStore:
         Search chunks using FTS5 full-text search.
         
         Args:
-            query: Search query text
+            query: Search query text (every term must match; FTS5 syntax is not interpreted)
             video_url: Optional video URL to filter results
             limit: Maximum number of results to return
             tier: Optional tier filter ('fine' or 'coarse')
@@ -161,60 +441,65 @@ class VectorStore:
         """
         cursor = self.conn.cursor()
         
-        # Build query with optional filters
-        where_clauses = ["chunks_fts MATCH ?"]
-        params = [query]
+        match_query = fts5_quote_terms(query)
+        if not match_query:
+            return []
+        # The tier filter goes into the MATCH as an FTS5 column filter
+        if tier:
+            match_query = f'tier : "{tier}" AND ({match_query})'
+        
+        # Other filters apply to the materialized matches so the MATCH always runs on the FTS index
+        where_clauses = []
+        filter_params = []
         
         if video_url:
             where_clauses.append("c.video_url = ?")
-            params.append(video_url)
-        
-        if tier:
-            where_clauses.append("chunks_fts.tier = ?")
-            params.append(tier)
+            filter_params.append(video_url)
         
-        where_clause = " AND ".join(where_clauses)
+        where_clause = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
         
         query_sql = f"""
-            SELECT c.*, bm25(chunks_fts) as bm25_score
-            FROM chunks c
-            JOIN chunks_fts ON c.id = chunks_fts.rowid
-            WHERE {where_clause}
-            ORDER BY bm25_score
+            WITH fts_matches AS (
+                SELECT rowid, bm25(chunks_fts) AS bm25_score
+                FROM chunks_fts
+                WHERE chunks_fts MATCH ?
+                ORDER BY bm25_score
+                LIMIT ?
+            )
+            SELECT c.*, fm.bm25_score
+            FROM fts_matches fm
+            JOIN chunks c ON c.id = fm.rowid
+            {where_clause}
+            ORDER BY fm.bm25_score
             LIMIT ?
         """
         
-        params.append(limit)
+        # Overfetch so filtering still leaves enough rows
+        match_limit = limit * 10 if where_clauses else limit
         
         try:
-            cursor.execute(query_sql, params)
+            cursor.execute(query_sql, [match_query, match_limit, *filter_params, limit])
             rows = cursor.fetchall()
+            if len(rows) < limit and where_clauses:
+                # The overfetch may have been filtered away; -1 lifts the cap
+                cursor.execute(query_sql, [match_query, -1, *filter_params, limit])
+                rows = cursor.fetchall()
             
             results = []
             for row in rows:
-                try:
-                    video_url = row["video_url"]
-                except (KeyError, IndexError):
-                    video_url = ""
-                
-                try:
-                    bm25_score = row["bm25_score"]
-                except (KeyError, IndexError):
-                    bm25_score = 0
-                
                 chunk_dict = {
                     "id": row["id"],
                     "video_id": row["video_id"],
-                    "video_url": video_url,
+                    "video_url": row["video_url"] or "",
                     "chunk_id": row["chunk_id"],
                     "tier": row["tier"],
                     "start": row["start"],
                     "end": row["end"],
                     "text": row["text"],
                     "segment_ids": json.loads(row["segment_ids"]) if row["segment_ids"] else [],
-                    "embedding": json.loads(row["embedding"]) if row["embedding"] else None,
+                    "embedding": self._decode_embedding(row["embedding"], row["emb_scale"]),
                     "created_at": row["created_at"],
-                    "bm25_score": bm25_score,
+                    "bm25_score": row["bm25_score"],
                 }
                 results.append(chunk_dict)
             
@@ -223,7 +508,13 @@ class VectorStore:
             print(f"    Warning: Search failed: {e}")
             return []
 
-    def search_similar(self, query_embedding: List[float], video_url: Optional[str] = None, limit: int = 30) -> List[Dict[str, Any]]:
+    def search_similar(
+        self,
+        query_embedding: List[float],
+        video_url: Optional[str] = None,
+        limit: int = 30,
+        tier: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
         """
         Search chunks using cosine similarity on embeddings.
         
@@ -231,93 +522,310 @@ class VectorStore:
             query_embedding: Query embedding vector
             video_url: Optional video URL to filter results
             limit: Maximum number of results to return
+            tier: Optional tier filter ('fine' or 'coarse')
             
         Returns:
             List of matching chunk dictionaries with similarity scores
         """
-        cursor = self.conn.cursor()
+        if limit <= 0:
+            return []
         
-        # Build query to get all chunks (with optional video_url filter)
-        if video_url:
-            cursor.execute("""
-                SELECT id, video_id, video_url, chunk_id, tier, start, end, text, segment_ids, embedding
-                FROM chunks
-                WHERE video_url = ?
-            """, (video_url,))
+        query = np.asarray(query_embedding, dtype=np.float32)
+        hits = self._search_vec_index(query, video_url, limit, tier)
+        if hits is not None:
+            return self._fetch_results(hits)
+        
+        ids, matrix, _ = self._load_matrix(video_url, tier)
+        return self._fetch_results(self._top_hits(ids, matrix, query, limit))
+    
+    def search_two_tier(
+        self,
+        query_embedding: List[float],
+        video_url: Optional[str] = None,
+        coarse_limit: int = 8,
+        limit: int = 30,
+    ) -> List[Dict[str, Any]]:
+        """
+        Search coarse chunks first, then only the fine chunks inside the best coarse windows.
+        
+        Args:
+            query_embedding: Query embedding vector
+            video_url: Optional video URL to filter results
+            coarse_limit: Number of coarse chunks whose time windows are searched for fine chunks
+            limit: Maximum number of results to return (coarse and fine combined)
+            
+        Returns:
+            List of matching chunk dictionaries with similarity scores, best first
+        """
+        if limit <= 0:
+            return []
+        
+        query = np.asarray(query_embedding, dtype=np.float32)
+        # Coarse step: KNN through the vec index when it can serve the query, else the matrix
+        coarse_hits = self._search_vec_index(query, video_url, coarse_limit, "coarse")
+        if coarse_hits is not None:
+            windows = self._spans_for_ids([row_id for row_id, _ in coarse_hits])
+        else:
+            coarse_ids, coarse_matrix, coarse_spans = self._load_matrix(video_url, "coarse")
+            coarse_hits = self._top_hits(coarse_ids, coarse_matrix, query, coarse_limit)
+            windows = coarse_spans[np.searchsorted(coarse_ids, [row_id for row_id, _ in coarse_hits])]
+        if not coarse_hits:
+            # No coarse tier to descend from; search everything
+            return self.search_similar(query_embedding, video_url=video_url, limit=limit)
+        
+        # Fine step: fine chunks overlapping any selected coarse window, scored on the cached
+        # matrix (a time-window restriction can't be expressed as one vec index KNN query)
+        fine_ids, fine_matrix, fine_spans = self._load_matrix(video_url, "fine")
+        if len(fine_ids):
+            inside = (
+                (fine_spans[:, 0, None] < windows[None, :, 1])
+                & (fine_spans[:, 1, None] > windows[None, :, 0])
+            ).any(axis=1)
+            rows = np.flatnonzero(inside)
+            fine_hits = self._top_hits(fine_ids[rows], fine_matrix[rows], query, limit)
         else:
-            cursor.execute("""
-                SELECT id, video_id, video_url, chunk_id, tier, start, end, text, segment_ids, embedding
-                FROM chunks
-            """)
+            fine_hits = []
         
-        rows = cursor.fetchall()
+        hits = sorted(coarse_hits + fine_hits, key=lambda hit: hit[1], reverse=True)[:limit]
+        return self._fetch_results(hits)
+    
+    def _spans_for_ids(self, row_ids: List[int]) -> np.ndarray:
+        """(N, 2) array of start/end times for the given row ids, in the same order."""
+        placeholders = ",".join("?" * len(row_ids))
+        spans = {
+            row["id"]: (row["start"], row["end"])
+            for row in self.conn.execute(f"SELECT id, start, end FROM chunks WHERE id IN ({placeholders})", row_ids)
+        }
+        return np.asarray([spans[row_id] for row_id in row_ids], dtype=np.float64).reshape(-1, 2)
+    
+    def _top_hits(self, ids: np.ndarray, matrix: np.ndarray, query: np.ndarray, limit: int) -> List[tuple]:
+        """
+        Rank matrix rows by cosine similarity to the query.
         
-        # Calculate cosine similarity for each chunk
-        results = []
-        for row in rows:
-            embedding_json = row["embedding"]
-            if not embedding_json:
-                continue
+        Args:
+            ids: Row ids, one per matrix row
+            matrix: Unit-length embeddings, one per row
+            query: Query embedding
+            limit: Maximum number of hits to return
             
-            try:
-                chunk_embedding = json.loads(embedding_json)
-                
-                # Calculate cosine similarity
-                similarity = self._cosine_similarity(query_embedding, chunk_embedding)
-                
-                try:
-                    video_url = row["video_url"]
-                except (KeyError, IndexError):
-                    video_url = ""
-                
-                chunk_dict = {
-                    "id": row["id"],
-                    "video_id": row["video_id"],
-                    "video_url": video_url,
-                    "chunk_id": row["chunk_id"],
-                    "tier": row["tier"],
-                    "start": row["start"],
-                    "end": row["end"],
-                    "text": row["text"],
-                    "segment_ids": json.loads(row["segment_ids"]) if row["segment_ids"] else [],
-                    "embedding": chunk_embedding,
-                    "similarity": similarity,
-                }
-                results.append(chunk_dict)
-            except (json.JSONDecodeError, TypeError) as e:
-                # Skip chunks with invalid embeddings
-                continue
+        Returns:
+            List of (row id, similarity), best first
+        """
+        if not len(ids) or limit <= 0:
+            return []
         
-        # Sort by similarity (descending) and return top N
-        results.sort(key=lambda x: x["similarity"], reverse=True)
-        return results[:limit]
+        # Rows of the matrix are unit length, so one matmul gives every cosine similarity
+        query_norm = float(np.linalg.norm(query))
+        if query.shape != (matrix.shape[1],) or query_norm == 0.0:
+            scores = np.zeros(len(ids), dtype=np.float32)
+        else:
+            scores = matrix @ (query / query_norm)
+        
+        # Partial selection of the top N, then a stable sort of just those (ties keep row order)
+        if limit < len(ids):
+            top = np.sort(np.argpartition(-scores, limit - 1)[:limit])
+        else:
+            top = np.arange(len(ids))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        
+        return [(int(ids[i]), float(scores[i])) for i in top]
+    
+    def _search_vec_index(
+        self, query: np.ndarray, video_url: Optional[str], limit: int, tier: Optional[str] = None
+    ) -> Optional[List[tuple]]:
+        """
+        KNN search through the sqlite-vec index.
+        
+        Args:
+            query: Query embedding
+            video_url: Optional video URL to filter results
+            limit: Maximum number of results to return
+            tier: Optional tier filter ('fine' or 'coarse')
+            
+        Returns:
+            List of (row id, similarity) best first, or None if the index can't serve this query
+        """
+        if not self._vec_enabled:
+            return None
+        try:
+            dim = self._vec_table_dim()
+            if dim is None or query.shape != (dim,) or not self._vec_index_complete(video_url, tier):
+                return None
+            
+            where_clauses = ["embedding MATCH ?", "k = ?"]
+            params: List[Any] = [query.tobytes(), limit]
+            if video_url:
+                where_clauses.append("video_url = ?")
+                params.append(video_url)
+            if tier:
+                where_clauses.append("tier = ?")
+                params.append(tier)
+            rows = self.conn.execute(
+                f"SELECT rowid, distance FROM vec_chunks WHERE {' AND '.join(where_clauses)}", params
+            ).fetchall()
+        except sqlite3.Error as e:
+            print(f"    Warning: vec index search failed, using brute-force search: {e}")
+            return None
+        
+        # Cosine distance = 1 - cosine similarity
+        return [(row[0], 1.0 - row[1]) for row in rows]
+    
+    def _vec_index_complete(self, video_url: Optional[str], tier: Optional[str] = None) -> bool:
+        """
+        Check that every embedded chunk for the video (and tier) is in the vec index.
+        
+        Chunks written by a store without sqlite-vec (or with the index disabled) are
+        missing from it, in which case search falls back to the brute-force matrix.
+        """
+        where_clauses = []
+        params: List[Any] = []
+        if video_url:
+            where_clauses.append("video_url = ?")
+            params.append(video_url)
+        if tier:
+            where_clauses.append("tier = ?")
+            params.append(tier)
+        index_where = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+        chunk_where = f"WHERE {' AND '.join(where_clauses + ['embedding IS NOT NULL'])}"
+        chunk_count = self.conn.execute(f"SELECT COUNT(*) FROM chunks {chunk_where}", params).fetchone()[0]
+        index_count = self.conn.execute(f"SELECT COUNT(*) FROM vec_chunks {index_where}", params).fetchone()[0]
+        return chunk_count == index_count
     
-    def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
+    def _fetch_results(self, hits: List[tuple]) -> List[Dict[str, Any]]:
         """
-        Calculate cosine similarity between two vectors.
+        Load chunk rows for ranked search hits.
         
         Args:
-            vec1: First vector
-            vec2: Second vector
+            hits: List of (row id, similarity), best first
             
         Returns:
-            Cosine similarity score (0 to 1)
+            List of chunk dictionaries with similarity scores, in hit order
         """
-        if len(vec1) != len(vec2):
-            return 0.0
+        if not hits:
+            return []
         
-        # Calculate dot product
-        dot_product = sum(a * b for a, b in zip(vec1, vec2))
+        top_ids = [row_id for row_id, _ in hits]
+        placeholders = ",".join("?" * len(top_ids))
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            SELECT id, video_id, video_url, chunk_id, tier, start, end, text, segment_ids, embedding, emb_scale
+            FROM chunks
+            WHERE id IN ({placeholders})
+        """, top_ids)
+        rows_by_id = {row["id"]: row for row in cursor.fetchall()}
         
-        # Calculate norms
-        norm1 = sum(a * a for a in vec1) ** 0.5
-        norm2 = sum(b * b for b in vec2) ** 0.5
+        results = []
+        for row_id, similarity in hits:
+            row = rows_by_id.get(row_id)
+            if row is None:
+                continue
+            results.append({
+                "id": row["id"],
+                "video_id": row["video_id"],
+                "video_url": row["video_url"] or "",
+                "chunk_id": row["chunk_id"],
+                "tier": row["tier"],
+                "start": row["start"],
+                "end": row["end"],
+                "text": row["text"],
+                "segment_ids": json.loads(row["segment_ids"]) if row["segment_ids"] else [],
+                "embedding": self._decode_embedding(row["embedding"], row["emb_scale"]),
+                "similarity": similarity,
+            })
+        
+        return results
+    
+    def _load_matrix(self, video_url: Optional[str], tier: Optional[str] = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the row ids, L2-normalized (N, d) embedding matrix and time spans for a video.
         
-        if norm1 == 0.0 or norm2 == 0.0:
-            return 0.0
+        The matrix is cached per (video_url, tier) and rebuilt only when the chunk count or
+        newest row id changes, or the table was written since (here or by another connection).
+        
+        Args:
+            video_url: Video URL to filter on, or None for all chunks
+            tier: Optional tier filter ('fine' or 'coarse')
+            
+        Returns:
+            Tuple of (row ids, float32 matrix with one unit-length embedding per row,
+            (N, 2) array of chunk start/end times)
+        """
+        where_clauses = []
+        params: List[Any] = []
+        if video_url:
+            where_clauses.append("video_url = ?")
+            params.append(video_url)
+        if tier:
+            where_clauses.append("tier = ?")
+            params.append(tier)
+        where_clause = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+        
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT COUNT(*), MAX(id) FROM chunks {where_clause}", params)
+        fingerprint = tuple(cursor.fetchone())
+        # data_version changes when another connection commits; upserts there keep count and ids
+        data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        fingerprint += (data_version, self._write_count)
+        
+        cache_key = (video_url, tier)
+        cached = self._matrix_cache.get(cache_key)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1], cached[2], cached[3]
+        
+        # Ordered by id so callers can map ids back to rows with a binary search
+        cursor.execute(f"SELECT id, start, end, embedding, emb_scale FROM chunks {where_clause} ORDER BY id", params)
+        
+        ids = []
+        spans = []
+        vectors = []
+        for row in cursor.fetchall():
+            if not row["embedding"]:
+                continue
+            try:
+                vec = np.asarray(self._decode_embedding(row["embedding"], row["emb_scale"]), dtype=np.float32)
+            except (json.JSONDecodeError, TypeError, ValueError):
+                # Skip chunks with invalid embeddings
+                continue
+            # All rows must share one dimension to stack; mismatches could never score anyway
+            if vectors and vec.shape != vectors[0].shape:
+                continue
+            ids.append(row["id"])
+            spans.append((row["start"], row["end"]))
+            vectors.append(vec)
+        
+        if vectors:
+            matrix = np.vstack(vectors)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            matrix /= norms
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        id_array = np.asarray(ids, dtype=np.int64)
+        span_array = np.asarray(spans, dtype=np.float64).reshape(-1, 2)
         
-        return dot_product / (norm1 * norm2)
+        self._matrix_cache[cache_key] = (fingerprint, id_array, matrix, span_array)
+        return id_array, matrix, span_array
     
+    def _decode_embedding(self, value: Any, emb_scale: Optional[float]) -> Optional[Any]:
+        """
+        Decode a stored embedding.
+        
+        Args:
+            value: Stored embedding (int8 bytes, float32 bytes, or a legacy JSON string)
+            emb_scale: Quantization scale for int8 embeddings, otherwise None
+            
+        Returns:
+            Embedding vector, or None if nothing is stored
+        """
+        if not value:
+            return None
+        if emb_scale is not None:
+            return dequantize_int8(value, emb_scale)
+        if isinstance(value, bytes):
+            return np.frombuffer(value, dtype=np.float32)
+        # Rows written before embeddings were stored as binary
+        return json.loads(value)
+
     def rerank_with_keywords(self, chunks: List[Dict[str, Any]], query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Re-rank chunks using FTS5 keyword matching.
@@ -335,61 +843,92 @@ class VectorStore:
         
         cursor = self.conn.cursor()
         
-        # Get keyword match scores for each chunk using FTS5 bm25 (lower/more negative = better)
-        chunk_ids = [chunk["chunk_id"] for chunk in chunks]
-        placeholders = ",".join("?" * len(chunk_ids))
+        # Get keyword match scores for each chunk using FTS5 bm25 (lower/more negative = better).
+        # The MATCH runs alone in a CTE; candidates arrive as one JSON array so the statement text
+        # (and its cached prepared statement) doesn't vary with the number of chunks. Terms are quoted
+        # and OR-joined so punctuation in the question can't break the MATCH syntax.
+        chunk_ids = json.dumps([chunk["chunk_id"] for chunk in chunks])
+        match_query = fts5_quote_terms(query, " OR ")
+        keyword_scores = {}
         
-        try:
-            cursor.execute(f"""
-                SELECT c.chunk_id, bm25(chunks_fts) as bm25_score
-                FROM chunks c
-                JOIN chunks_fts ON c.id = chunks_fts.rowid
-                WHERE chunks_fts MATCH ? AND c.chunk_id IN ({placeholders})
-            """, [query] + chunk_ids)
-            
-            keyword_scores = {row["chunk_id"]: row["bm25_score"] for row in cursor.fetchall()}
-        except sqlite3.Error:
-            # If FTS5 search fails, use similarity scores only
-            keyword_scores = {}
-        
-        # Normalize keyword scores (bm25 is negative, more negative = better)
-        if keyword_scores:
-            min_bm25 = min(keyword_scores.values())  # Most negative (best)
-            max_bm25 = max(keyword_scores.values())  # Least negative (worst)
+        if match_query:
+            try:
+                cursor.execute("""
+                    WITH fts_matches AS (
+                        SELECT rowid, bm25(chunks_fts) AS bm25_score
+                        FROM chunks_fts
+                        WHERE chunks_fts MATCH ?
+                    )
+                    SELECT c.chunk_id, fm.bm25_score
+                    FROM fts_matches fm
+                    JOIN chunks c ON c.id = fm.rowid
+                    WHERE c.chunk_id IN (SELECT value FROM json_each(?))
+                """, (match_query, chunk_ids))
+                
+                keyword_scores = {row["chunk_id"]: row["bm25_score"] for row in cursor.fetchall()}
+            except sqlite3.Error:
+                # If FTS5 search fails, use similarity scores only
+                keyword_scores = {}
+        
+        # Normalize keyword scores (bm25 is negative, more negative = better) to 0-1, higher = better;
+        # chunks without a keyword match score 0
+        bm25 = np.fromiter((keyword_scores.get(c["chunk_id"], np.inf) for c in chunks), dtype=np.float64, count=len(chunks))
+        matched = np.isfinite(bm25)
+        normalized_keyword = np.zeros(len(chunks))
+        if matched.any():
+            min_bm25 = bm25[matched].min()  # Most negative (best)
+            max_bm25 = bm25[matched].max()  # Least negative (worst)
             bm25_range = max_bm25 - min_bm25 if max_bm25 != min_bm25 else 1.0
-        else:
-            min_bm25 = 0.0
-            max_bm25 = 0.0
-            bm25_range = 1.0
-        
-        # Combine similarity and keyword scores
-        for chunk in chunks:
-            similarity_score = chunk.get("similarity", 0.0)
-            chunk_id = chunk["chunk_id"]
-            
-            if chunk_id in keyword_scores:
-                # Normalize bm25 score (invert so higher = better, range 0-1)
-                bm25_score = keyword_scores[chunk_id]
-                if bm25_range > 0:
-                    # More negative = better, so invert: (max - score) / range
-                    normalized_keyword = (max_bm25 - bm25_score) / bm25_range
-                else:
-                    normalized_keyword = 1.0
-            else:
-                normalized_keyword = 0.0
-            
-            # Weighted combination: 0.7 * similarity + 0.3 * keyword
-            combined_score = 0.7 * similarity_score + 0.3 * normalized_keyword
-            chunk["combined_score"] = combined_score
-            chunk["keyword_score"] = normalized_keyword
-        
-        # Sort by combined score (descending) and return top N
-        chunks.sort(key=lambda x: x.get("combined_score", 0.0), reverse=True)
-        return chunks[:limit]
+            normalized_keyword[matched] = (max_bm25 - bm25[matched]) / bm25_range
+        
+        # Weighted combination: 0.7 * similarity + 0.3 * keyword
+        similarity = np.fromiter((c.get("similarity", 0.0) for c in chunks), dtype=np.float64, count=len(chunks))
+        combined = 0.7 * similarity + 0.3 * normalized_keyword
+        
+        # Top N by combined score (descending, ties keep their similarity order)
+        order = np.argsort(-combined, kind="stable")[:limit]
+        reranked = []
+        for i in order.tolist():
+            chunk = chunks[i]
+            chunk["combined_score"] = float(combined[i])
+            chunk["keyword_score"] = float(normalized_keyword[i])
+            reranked.append(chunk)
+        return reranked
+
+    def preload(self, video_url: Optional[str] = None, tiers: tuple = (None,)) -> None:
+        """
+        Warm the search path for a video so the first query doesn't pay for it.
+        
+        Args:
+            video_url: Video URL that will be searched, or None for all chunks
+            tiers: Tier filters that will be searched (None = all tiers)
+        """
+        for tier in tiers:
+            # Coarse and unfiltered searches go through the vec index when it is complete;
+            # fine chunks are always scored on the matrix by search_two_tier
+            if tier != "fine":
+                try:
+                    if self._vec_enabled and self._vec_table_dim() is not None and self._vec_index_complete(video_url, tier):
+                        continue
+                except sqlite3.Error:
+                    pass
+            self._load_matrix(video_url, tier)
 
     def close(self) -> None:
-        """Close database connection."""
+        """Close database connection (shared stores close once the last holder releases them)."""
+        if self._shared_key is not None:
+            entry = _SHARED_STORES.get(self._shared_key)
+            if entry is not None:
+                entry[1] -= 1
+                if entry[1] > 0:
+                    return
+                del _SHARED_STORES[self._shared_key]
         if self.conn:
+            try:
+                # Refresh query planner statistics for the next session
+                self.conn.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
             self.conn.close()
 
     def __enter__(self):
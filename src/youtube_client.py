@@ -1,6 +1,14 @@
 from youtube_transcript_api import YouTubeTranscriptApi, FetchedTranscript
 from pytubefix import YouTube
 from typing import Dict, Any
+from ttl_cache import TTLCache
+
+# Maximum number of videos whose metadata is kept in memory, and for how long
+METADATA_CACHE_SIZE = 256
+METADATA_CACHE_TTL_SECONDS = 3600
+
+# video_id -> metadata, shared by every client in the process
+_meta_cache = TTLCache(max_items=METADATA_CACHE_SIZE, ttl_sec=METADATA_CACHE_TTL_SECONDS)
 
 
 class YoutubeClient:
@@ -16,23 +24,28 @@ class YoutubeClient:
         Get video metadata using pytubefix.
         Returns: title, channel, duration (seconds), URL
         """
+        cached = _meta_cache.get(video_id)
+        if cached is not None:
+            return dict(cached)
         try:
             if url:
                 yt = YouTube(url)
             else:
                 yt = YouTube(f"https://www.youtube.com/watch?v={video_id}")
-            return {
+            metadata = {
                 "title": yt.title,
                 "channel": yt.author,
                 "duration": yt.length,  # in seconds
                 "url": f"https://www.youtube.com/watch?v={video_id}",
             }
         except Exception as e:
-            # Fallback to basic info if pytubefix fails
+            # Fallback to basic info if pytubefix fails (not cached, so a later call can retry)
             print(f"Warning: Failed to get video metadata: {e}")
             return {
                 "title": "Unknown",
                 "channel": "Unknown",
                 "duration": 0,
                 "url": f"https://www.youtube.com/watch?v={video_id}",
-            }
\ No newline at end of file
+            }
+        _meta_cache.set(video_id, metadata)
+        return dict(metadata)
\ No newline at end of file
@@ -0,0 +1,7 @@
+"""Shared test setup."""
+
+import os
+import sys
+
+# The application modules import each other by bare name (e.g. `from chunk import ...`)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
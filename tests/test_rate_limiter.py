@@ -0,0 +1,98 @@
+"""Tests for the token-bucket rate limiter."""
+
+import asyncio
+
+import pytest
+
+import rate_limiter
+from rate_limiter import RateLimiter
+
+
+class FakeClock:
+    """Stands in for the time module; sleeping just advances the clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+
+    async def fake_async_sleep(seconds):
+        clock.sleep(seconds)
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", fake_async_sleep)
+    return clock
+
+
+def test_starts_with_full_buckets(clock):
+    limiter = RateLimiter(rpm=3, tpm=1000)
+    assert [limiter._reserve(100) for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Fourth request must wait for one request's worth of refill: 60s / 3 rpm
+    assert limiter._reserve(100) == pytest.approx(20.0)
+
+
+def test_refills_in_proportion_to_elapsed_time(clock):
+    limiter = RateLimiter(rpm=60, tpm=600)
+    assert limiter._reserve(600) == 0.0
+    clock.now += 30
+    # Half a minute restores half the token budget
+    assert limiter._reserve(400) == pytest.approx(10.0)
+    assert limiter._reserve(300) == 0.0
+
+
+def test_refill_is_capped_at_bucket_size(clock):
+    limiter = RateLimiter(rpm=60, tpm=600)
+    clock.now += 3600
+    limiter._refill()
+    assert limiter.req_bucket == 60
+    assert limiter.tok_bucket == 600
+
+
+def test_oversized_request_waits_for_a_full_bucket(clock):
+    limiter = RateLimiter(rpm=60, tpm=600)
+    assert limiter._reserve(600) == 0.0
+    # Larger than the bucket: capped to tpm, so it waits for a full refill rather than forever
+    assert limiter._reserve(10_000) == pytest.approx(60.0)
+
+
+def test_wait_for_capacity_sleeps_until_capacity(clock):
+    limiter = RateLimiter(rpm=60, tpm=600)
+    assert limiter.wait_for_capacity(600) == 0.0
+    waited = limiter.wait_for_capacity(300)
+    assert waited == pytest.approx(30.0)
+    assert sum(clock.sleeps) == pytest.approx(30.0)
+    assert limiter.tok_bucket == pytest.approx(0.0)
+
+
+def test_await_capacity_sleeps_without_blocking(clock):
+    limiter = RateLimiter(rpm=1, tpm=600)
+    asyncio.run(limiter.await_capacity(10))
+    asyncio.run(limiter.await_capacity(10))
+    assert sum(clock.sleeps) == pytest.approx(60.0)
+
+
+def test_consume_charges_extra_tokens(clock):
+    limiter = RateLimiter(rpm=60, tpm=600)
+    assert limiter._reserve(100) == 0.0
+    limiter.consume(800)
+    # Bucket is now 300 tokens in debt; 100 more need 400 tokens of refill
+    assert limiter.tok_bucket == pytest.approx(-300.0)
+    assert limiter._reserve(100) == pytest.approx(40.0)
+
+
+def test_consume_ignores_non_positive_tokens(clock):
+    limiter = RateLimiter(rpm=60, tpm=600)
+    limiter.consume(0)
+    limiter.consume(-5)
+    assert limiter.tok_bucket == 600
@@ -0,0 +1,81 @@
+"""Tests for the LRU + TTL cache."""
+
+import pytest
+
+import ttl_cache
+from ttl_cache import TTLCache
+
+
+class FakeClock:
+    """Stands in for the time module with a manually advanced clock."""
+
+    def __init__(self):
+        self.now = 500.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ttl_cache, "time", clock)
+    return clock
+
+
+def test_get_returns_stored_value(clock):
+    cache = TTLCache(max_items=4, ttl_sec=10)
+    cache.set("a", [1, 2])
+    assert cache.get("a") == [1, 2]
+    assert cache.get("missing") is None
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(max_items=4, ttl_sec=10)
+    cache.set("a", 1)
+    clock.now += 9.9
+    assert cache.get("a") == 1
+    clock.now += 0.1
+    assert cache.get("a") is None
+    # Expired entries are dropped on lookup
+    assert len(cache) == 0
+
+
+def test_set_refreshes_expiry(clock):
+    cache = TTLCache(max_items=4, ttl_sec=10)
+    cache.set("a", 1)
+    clock.now += 8
+    cache.set("a", 2)
+    clock.now += 8
+    assert cache.get("a") == 2
+
+
+def test_evicts_least_recently_used(clock):
+    cache = TTLCache(max_items=2, ttl_sec=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    # Reading "a" makes "b" the least recently used
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_overwrite_counts_as_use(clock):
+    cache = TTLCache(max_items=2, ttl_sec=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("a", 10)
+    cache.set("c", 3)
+    assert cache.get("a") == 10
+    assert cache.get("b") is None
+
+
+def test_clear(clock):
+    cache = TTLCache(max_items=2, ttl_sec=10)
+    cache.set("a", 1)
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.get("a") is None
@@ -0,0 +1,207 @@
+"""Tests for the SQLite vector store."""
+
+import numpy as np
+import pytest
+
+from vector_store import VectorStore
+
+
+def make_chunks(rng, video_url, fine=40, coarse=10, dim=16):
+    """Fine chunks every 10s and coarse chunks every 40s, with random embeddings."""
+    chunks = []
+    for i in range(fine):
+        chunks.append({
+            "chunk_id": f"{video_url}-f{i}",
+            "tier": "fine",
+            "start": i * 10.0,
+            "end": i * 10.0 + 10.0,
+            "text": f"fine chunk {i}",
+            "segment_ids": [i],
+            "embedding": rng.normal(size=dim).tolist(),
+        })
+    for i in range(coarse):
+        chunks.append({
+            "chunk_id": f"{video_url}-c{i}",
+            "tier": "coarse",
+            "start": i * 40.0,
+            "end": i * 40.0 + 40.0,
+            "text": f"coarse chunk {i}",
+            "segment_ids": list(range(4 * i, 4 * i + 4)),
+            "embedding": rng.normal(size=dim).tolist(),
+        })
+    return chunks
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = VectorStore(str(tmp_path / "chunks.db"))
+    rng = np.random.default_rng(0)
+    for video_url in ("u1", "u2"):
+        store.insert_chunks(make_chunks(rng, video_url), "vid", video_url)
+    yield store
+    store.close()
+
+
+def test_vec_index_matches_matrix_search(store):
+    if not store._vec_enabled:
+        pytest.skip("sqlite-vec is not installed or sqlite3 cannot load extensions")
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        query = rng.normal(size=16).astype(np.float32)
+        for tier in (None, "fine", "coarse"):
+            vec_hits = store._search_vec_index(query, "u1", 10, tier)
+            ids, matrix, _ = store._load_matrix("u1", tier)
+            matrix_hits = store._top_hits(ids, matrix, query, 10)
+            assert vec_hits is not None
+            assert [row_id for row_id, _ in vec_hits] == [row_id for row_id, _ in matrix_hits]
+            np.testing.assert_allclose(
+                [score for _, score in vec_hits], [score for _, score in matrix_hits], atol=1e-5
+            )
+
+
+def chunk(chunk_id, text, embedding, tier="fine"):
+    return {"chunk_id": chunk_id, "tier": tier, "start": 0.0, "end": 10.0, "text": text, "embedding": embedding}
+
+
+def search_ids(store, query, **kwargs):
+    return [result["chunk_id"] for result in store.search_text(query, **kwargs)]
+
+
+def test_upsert_keeps_row_id_and_resyncs_fts(tmp_path):
+    store = VectorStore(str(tmp_path / "chunks.db"))
+    store.insert_chunks([chunk("a", "hello world", [1.0, 0.0]), chunk("b", "other thing", [0.0, 1.0])], "vid", "u")
+    row_id = store.search_text("hello")[0]["id"]
+    
+    store.insert_chunks([chunk("a", "goodbye moon", [1.0, 0.0])], "vid", "u")
+    
+    assert store.search_text("moon")[0]["id"] == row_id
+    assert search_ids(store, "hello") == []
+    assert search_ids(store, "thing") == ["b"]
+    assert store.conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0] == 2
+    # Raises sqlite3.DatabaseError if the external-content index disagrees with the table
+    store.conn.execute("INSERT INTO chunks_fts(chunks_fts) VALUES('integrity-check')")
+    store.close()
+
+
+def test_upsert_invalidates_cached_matrix(tmp_path):
+    store = VectorStore(str(tmp_path / "chunks.db"))
+    store.insert_chunks([chunk("a", "alpha", [1.0, 0.0]), chunk("b", "beta", [0.0, 1.0])], "vid", "u")
+    assert store.search_similar([1.0, 0.0], video_url="u", limit=1)[0]["chunk_id"] == "a"
+    
+    # Same row count and ids, new embedding
+    store.insert_chunks([chunk("a", "alpha", [-1.0, 0.0])], "vid", "u")
+    
+    assert store.search_similar([1.0, 0.0], video_url="u", limit=1)[0]["chunk_id"] == "b"
+    store.close()
+
+
+def test_update_and_delete_keep_fts_in_sync(tmp_path):
+    store = VectorStore(str(tmp_path / "chunks.db"))
+    store.insert_chunks([chunk("a", "alpha", [1.0, 0.0]), chunk("b", "beta", [0.0, 1.0])], "vid", "u")
+    
+    with store.conn:
+        store.conn.execute("UPDATE chunks SET text = 'zebra' WHERE chunk_id = 'b'")
+    assert search_ids(store, "zebra") == ["b"]
+    assert search_ids(store, "beta") == []
+    
+    with store.conn:
+        store.conn.execute("DELETE FROM chunks WHERE chunk_id = 'b'")
+    assert search_ids(store, "zebra") == []
+    store.conn.execute("INSERT INTO chunks_fts(chunks_fts) VALUES('integrity-check')")
+    store.close()
+
+
+def test_rebuild_triggers_are_replaced_on_open(tmp_path):
+    db_path = str(tmp_path / "chunks.db")
+    store = VectorStore(db_path)
+    store.insert_chunks([chunk("a", "alpha", [1.0, 0.0])], "vid", "u")
+    with store.conn:
+        store.conn.execute("DROP TRIGGER chunks_ad")
+        store.conn.execute(
+            "CREATE TRIGGER chunks_ad AFTER DELETE ON chunks BEGIN "
+            "INSERT INTO chunks_fts(chunks_fts) VALUES('rebuild'); END"
+        )
+    store.close()
+    
+    store = VectorStore(db_path)
+    triggers = store.conn.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger'").fetchall()
+    assert not any("rebuild" in row[0] for row in triggers)
+    assert search_ids(store, "alpha") == ["a"]
+    store.close()
+
+
+def test_search_two_tier_descends_into_best_coarse_windows(store):
+    query = np.random.default_rng(2).normal(size=16)
+    coarse = store.search_similar(query, video_url="u1", tier="coarse", limit=3)
+    windows = [(c["start"], c["end"]) for c in coarse]
+    
+    results = store.search_two_tier(query, video_url="u1", coarse_limit=3, limit=12)
+    
+    assert len(results) <= 12
+    assert all(r["video_url"] == "u1" for r in results)
+    scores = [r["similarity"] for r in results]
+    assert scores == sorted(scores, reverse=True)
+    coarse_ids = {c["chunk_id"] for c in coarse}
+    for r in results:
+        if r["tier"] == "coarse":
+            assert r["chunk_id"] in coarse_ids
+        else:
+            assert any(r["start"] < end and r["end"] > start for start, end in windows)
+    # Every fine chunk inside the windows is a candidate, so the best of them must be returned
+    fine_in_windows = [
+        f for f in store.search_similar(query, video_url="u1", tier="fine", limit=100)
+        if any(f["start"] < end and f["end"] > start for start, end in windows)
+    ]
+    assert fine_in_windows[0]["chunk_id"] in {r["chunk_id"] for r in results}
+
+
+def test_search_two_tier_same_with_and_without_vec_index(store):
+    if not store._vec_enabled:
+        pytest.skip("sqlite-vec is not installed or sqlite3 cannot load extensions")
+    rng = np.random.default_rng(3)
+    for _ in range(10):
+        query = rng.normal(size=16)
+        with_index = [r["chunk_id"] for r in store.search_two_tier(query, video_url="u2", coarse_limit=3, limit=10)]
+        store._vec_enabled = False
+        without_index = [r["chunk_id"] for r in store.search_two_tier(query, video_url="u2", coarse_limit=3, limit=10)]
+        store._vec_enabled = True
+        assert with_index == without_index
+
+
+def test_search_two_tier_without_coarse_chunks_searches_everything(tmp_path):
+    store = VectorStore(str(tmp_path / "chunks.db"))
+    rng = np.random.default_rng(4)
+    store.insert_chunks(make_chunks(rng, "u", coarse=0), "vid", "u")
+    query = rng.normal(size=16)
+    
+    expected = [r["chunk_id"] for r in store.search_similar(query, video_url="u", limit=5)]
+    assert [r["chunk_id"] for r in store.search_two_tier(query, video_url="u", limit=5)] == expected
+    store.close()
+
+
+def test_search_results_keep_segment_ids(store):
+    text_hit = store.search_text("coarse", video_url="u1", tier="coarse", limit=1)[0]
+    similar_hit = store.search_similar(np.ones(16), video_url="u1", tier="coarse", limit=1)[0]
+    for result in (text_hit, similar_hit):
+        index = int(result["chunk_id"].rsplit("-c", 1)[1])
+        expected = list(range(4 * index, 4 * index + 4))
+        assert type(result) is dict
+        assert result["segment_ids"] == expected
+
+
+def test_rerank_with_keywords_handles_punctuation(tmp_path):
+    store = VectorStore(str(tmp_path / "chunks.db"))
+    chunks = [
+        chunk("b", "something else", [0.0, 1.0]),
+        chunk("c", "the other one", [0.0, 1.0]),
+        chunk("a", "the alpha plan", [1.0, 0.0]),
+    ]
+    store.insert_chunks(chunks, "vid", "u")
+    candidates = [dict(c, similarity=0.5) for c in chunks]
+    
+    # Unquoted, this is an FTS5 syntax error and the keyword scores are silently dropped
+    reranked = store.rerank_with_keywords(candidates, 'what\'s the "alpha-plan": (AND) NEAR?', limit=3)
+    
+    assert reranked[0]["chunk_id"] == "a"
+    assert reranked[0]["keyword_score"] > 0
+    store.close()
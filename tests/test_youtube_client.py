@@ -0,0 +1,60 @@
+"""Tests for the YouTube metadata cache."""
+
+import pytest
+
+pytest.importorskip("pytubefix")
+pytest.importorskip("youtube_transcript_api")
+
+import youtube_client
+from youtube_client import YoutubeClient
+
+
+class FakeYouTube:
+    """Stands in for pytubefix.YouTube, counting how often a video is looked up."""
+
+    calls = 0
+
+    def __init__(self, url):
+        FakeYouTube.calls += 1
+        self.title = "A talk"
+        self.author = "A channel"
+        self.length = 1234
+
+
+@pytest.fixture
+def fake_youtube(monkeypatch):
+    FakeYouTube.calls = 0
+    monkeypatch.setattr(youtube_client, "YouTube", FakeYouTube)
+    youtube_client._meta_cache.clear()
+    yield FakeYouTube
+    youtube_client._meta_cache.clear()
+
+
+def test_metadata_cache_is_shared_across_clients(fake_youtube):
+    first = YoutubeClient().get_video_metadata("abc123")
+    # index_video builds a new client per call; it still hits the cache
+    second = YoutubeClient().get_video_metadata("abc123")
+    
+    assert fake_youtube.calls == 1
+    assert second == first == {
+        "title": "A talk",
+        "channel": "A channel",
+        "duration": 1234,
+        "url": "https://www.youtube.com/watch?v=abc123",
+    }
+    
+    # Callers get their own copy
+    second["title"] = "changed"
+    assert YoutubeClient().get_video_metadata("abc123")["title"] == "A talk"
+
+
+def test_failed_lookup_is_not_cached(fake_youtube, monkeypatch):
+    def broken(url):
+        raise RuntimeError("offline")
+    
+    monkeypatch.setattr(youtube_client, "YouTube", broken)
+    assert YoutubeClient().get_video_metadata("abc123")["title"] == "Unknown"
+    
+    monkeypatch.setattr(youtube_client, "YouTube", fake_youtube)
+    assert YoutubeClient().get_video_metadata("abc123")["title"] == "A talk"
+    assert fake_youtube.calls == 1